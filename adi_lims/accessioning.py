@@ -0,0 +1,248 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Bulk accessioning.
+
+Registers a whole batch of Samples (for example a camp drive) in one
+transaction: the batch reserves a block of S-##### numbers with a single
+locked update on tabSeries, links are validated with one IN query per
+doctype, panels are expanded from the cached panel map into Lab Test
+Result rows, and Samples and results are written with multi-row INSERTs.
+
+Each Sample is still built as a document and run through the hooks and
+checks `insert` runs (before_insert, validate, before_save and the field
+validation), so controller and doc_event validation applies to bulk rows
+too. The insert doc_events themselves run in batch form: the
+`sample_batch_insert` hooks (storage occupancy, search index, dashboard
+cache, listing counts, realtime delta) are called once with every new
+Sample.
+"""
+
+import frappe
+from frappe import _
+from frappe.utils import getdate, now, nowdate
+
+from adi_lims.catalog import format_reference_range, get_age_group, get_catalog
+from adi_lims.lookup import CACHED_DOCTYPES, get_many
+from adi_lims.panels import get_panel_tests
+from adi_lims.worklist import STATUS_UI_MAP
+
+SAMPLE_SERIES_PREFIX = "S-"
+SAMPLE_SERIES_DIGITS = 5
+INSERT_CHUNK_SIZE = 5000
+MAX_BATCH_SIZE = 20000
+
+SAMPLE_FIELDS = (
+	"name",
+	"sample_name",
+	"sample_type",
+	"collection_date",
+	"received_date",
+	"patient",
+	"storage_location",
+	"status",
+	"owner",
+	"modified_by",
+	"creation",
+	"modified",
+)
+RESULT_FIELDS = (
+	"name",
+	"parent",
+	"parenttype",
+	"parentfield",
+	"idx",
+	"lab_test",
+	"unit",
+	"reference_range",
+	"status",
+	"owner",
+	"modified_by",
+	"creation",
+	"modified",
+)
+
+
+def reserve_series(prefix, count):
+	"""Reserve `count` consecutive numbers of a naming series; returns the first one."""
+	current = frappe.db.sql("select `current` from `tabSeries` where `name` = %s for update", prefix)
+	if not current:
+		frappe.db.sql("insert into `tabSeries` (`name`, `current`) values (%s, 0)", prefix)
+		current = ((0,),)
+	frappe.db.sql("update `tabSeries` set `current` = `current` + %s where `name` = %s", (count, prefix))
+	return frappe.utils.cint(current[0][0]) + 1
+
+
+def _existing(doctype, names):
+	if not names:
+		return set()
+	if doctype in CACHED_DOCTYPES:
+		return set(get_many(doctype, names, ["name"]))
+	return set(frappe.get_all(doctype, filters={"name": ("in", list(names))}, pluck="name"))
+
+
+def validate_batch(samples):
+	"""Validate a batch of sample dicts; raises with every problem listed at once."""
+	if not samples:
+		frappe.throw(_("No samples to accession"))
+	if len(samples) > MAX_BATCH_SIZE:
+		frappe.throw(_("At most {0} samples can be accessioned in one batch").format(MAX_BATCH_SIZE))
+
+	errors = []
+	for idx, sample in enumerate(samples):
+		for fieldname in ("sample_name", "sample_type"):
+			if not sample.get(fieldname):
+				errors.append(_("Row {0}: {1} is required").format(idx + 1, fieldname))
+		status = sample.get("status") or "Received"
+		if status not in STATUS_UI_MAP:
+			errors.append(_("Row {0}: invalid status {1}").format(idx + 1, status))
+
+	links = {
+		"Sample Type": {s.get("sample_type") for s in samples if s.get("sample_type")},
+		"Patient": {s.get("patient") for s in samples if s.get("patient")},
+		"Storage Location": {s.get("storage_location") for s in samples if s.get("storage_location")},
+		"Lab Test Panel": {panel for s in samples for panel in s.get("panels") or []},
+		"Lab Test": {test for s in samples for test in s.get("lab_tests") or []},
+	}
+	for doctype, names in links.items():
+		for missing in sorted(names - _existing(doctype, names)):
+			errors.append(_("{0} {1} not found").format(_(doctype), missing))
+
+	if errors:
+		frappe.throw("<br>".join(errors), title=_("Accessioning failed"))
+
+
+def build_sample_doc(sample, name, user, timestamp, today):
+	"""An in-memory Sample run through the same hooks and checks `insert` would run, without saving it."""
+	doc = frappe.new_doc("Sample")
+	doc.update(
+		{
+			"name": name,
+			"sample_name": sample.sample_name,
+			"sample_type": sample.sample_type,
+			"collection_date": getdate(sample.collection_date or today),
+			"received_date": getdate(sample.received_date or today),
+			"patient": sample.patient,
+			"storage_location": sample.storage_location,
+			"status": sample.status or "Received",
+			"owner": user,
+			"modified_by": user,
+			"creation": timestamp,
+			"modified": timestamp,
+		}
+	)
+	# links were checked for the whole batch in validate_batch
+	for method in ("before_insert", "before_validate", "validate", "before_save"):
+		doc.run_method(method)
+	doc._validate()
+	return doc
+
+
+def build_sample_docs(samples, first, user, timestamp, today):
+	"""Validated docs for the batch; raises with every row's error listed at once."""
+	docs, errors = [], []
+	for offset, sample in enumerate(samples):
+		name = f"{SAMPLE_SERIES_PREFIX}{first + offset:0{SAMPLE_SERIES_DIGITS}d}"
+		try:
+			docs.append(build_sample_doc(sample, name, user, timestamp, today))
+		except frappe.ValidationError as e:
+			frappe.clear_last_message()
+			errors.append(_("Row {0}: {1}").format(offset + 1, e))
+	if errors:
+		frappe.throw("<br>".join(errors), title=_("Accessioning failed"))
+	return docs
+
+
+def accession_samples(samples):
+	"""Create Samples and their Lab Test Result rows in bulk.
+
+	Each sample is a dict with Sample fields plus optional `panels` (Lab Test
+	Panel names) and `lab_tests` (Lab Test names). Returns the new sample names.
+	"""
+	frappe.has_permission("Sample", "create", throw=True)
+	samples = [frappe._dict(sample) for sample in samples]
+	validate_batch(samples)
+
+	catalog = get_catalog()
+	panel_tests = get_panel_tests(list({panel for s in samples for panel in s.panels or []}))
+	patients = get_many("Patient", [s.patient for s in samples], ["gender", "dob"])
+
+	first = reserve_series(SAMPLE_SERIES_PREFIX, len(samples))
+	timestamp, user, today = now(), frappe.session.user, nowdate()
+	docs = build_sample_docs(samples, first, user, timestamp, today)
+
+	result_rows, counters = [], {"total": len(docs)}
+	for doc, sample in zip(docs, samples, strict=True):
+		counters[doc.status] = counters.get(doc.status, 0) + 1
+		patient = patients.get(doc.patient) or frappe._dict()
+		age_group = get_age_group(patient.dob)
+		lab_tests = [test.lab_test for panel in sample.panels or [] for test in panel_tests[panel]]
+		lab_tests += sample.lab_tests or []
+		# a test ordered twice (e.g. in two panels) is only run once
+		lab_tests = list(dict.fromkeys(lab_tests))
+		for idx, lab_test in enumerate(lab_tests, start=1):
+			normal_range = catalog.get_normal_range(lab_test, patient.gender, age_group)
+			result_rows.append(
+				(
+					frappe.generate_hash(length=10),
+					doc.name,
+					"Sample",
+					"sample_test_results",
+					idx,
+					lab_test,
+					normal_range.unit if normal_range else None,
+					format_reference_range(normal_range) if normal_range else None,
+					"Pending",
+					user,
+					user,
+					timestamp,
+					timestamp,
+				)
+			)
+
+	frappe.db.bulk_insert(
+		"Sample",
+		SAMPLE_FIELDS,
+		[tuple(doc.get(field) for field in SAMPLE_FIELDS) for doc in docs],
+		chunk_size=INSERT_CHUNK_SIZE,
+	)
+	if result_rows:
+		frappe.db.bulk_insert("Lab Test Result", RESULT_FIELDS, result_rows, chunk_size=INSERT_CHUNK_SIZE)
+
+	after_batch_insert(docs, counters)
+	return [doc.name for doc in docs]
+
+
+def after_batch_insert(docs, counters):
+	"""Run the `sample_batch_insert` hooks, the batch form of Sample's insert doc_events, once."""
+	batch = frappe._dict(doctype="Sample", rows=docs, counters=counters)
+	for method in frappe.get_hooks("sample_batch_insert"):
+		frappe.get_attr(method)(batch)
+
+
+def create_patients(patients):
+	"""Insert a batch of Patients in one transaction; returns their names.
+
+	Patient belongs to the healthcare app, whose controller does more on insert
+	than this app can safely replay, so each one is a full `insert`; the batch
+	saves the per-record request and commit. Every row's error is reported at
+	once, and the caller rolls the whole batch back if any row fails.
+	"""
+	frappe.has_permission("Patient", "create", throw=True)
+	if not patients:
+		frappe.throw(_("No patients to create"))
+	if len(patients) > MAX_BATCH_SIZE:
+		frappe.throw(_("At most {0} patients can be created in one batch").format(MAX_BATCH_SIZE))
+
+	names, errors = [], []
+	for idx, data in enumerate(patients):
+		try:
+			doc = frappe.new_doc("Patient")
+			doc.update(data)
+			names.append(doc.insert().name)
+		except frappe.ValidationError as e:
+			frappe.clear_last_message()
+			errors.append(_("Row {0}: {1}").format(idx + 1, e))
+	if errors:
+		frappe.throw("<br>".join(errors), title=_("Patient creation failed"))
+	return names
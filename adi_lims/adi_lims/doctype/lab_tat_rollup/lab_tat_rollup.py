@@ -0,0 +1,8 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+from frappe.model.document import Document
+
+
+class LabTATRollup(Document):
+	pass
@@ -6,5 +6,10 @@ from __future__ import unicode_literals
 import frappe
 from frappe.model.document import Document
 
+from adi_lims.sample_status import validate_transition
+from adi_lims.tat import set_sample_result_timestamps
+
 class Sample(Document):
-	pass
+	def validate(self):
+		validate_transition(self)
+		set_sample_result_timestamps(self)
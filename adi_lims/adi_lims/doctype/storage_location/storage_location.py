@@ -0,0 +1,13 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+from frappe.utils.nestedset import NestedSet
+
+
+class StorageLocation(NestedSet):
+	# lft/rgt let adi_lims.storage read a whole Freezer -> Rack -> Box subtree in one query
+	nsm_parent_field = "parent_location"
+
+	def on_trash(self):
+		# a top-level location (a room or freezer) is an ordinary record here, not a fixed root
+		super().on_trash(allow_root_deletion=True)
@@ -5,34 +5,101 @@
 from __future__ import unicode_literals
 import frappe
 
+from adi_lims.accessioning import accession_samples, create_patients
+from adi_lims.archive import get_listing_with_archive
+from adi_lims.bootstrap import (
+    bootstrap_response,
+    get_appointment_list,
+    get_pending_reports as get_pending_lab_tests,
+    get_recent_activity as get_recent_samples,
+)
+from adi_lims.catalog import get_age_group, get_catalog
+from adi_lims.cumulative import get_patient_cumulative as get_cumulative_results
+from adi_lims.dashboard import get_dashboard_stats
+from adi_lims.ingestion import enqueue_ingestion
+from adi_lims.labels import print_labels, render_labels
+from adi_lims.listing import get_listing
+from adi_lims.lookup import get_many
+from adi_lims.perf import get_perf_stats, instrument, record_page_timing as record_client_timing
+from adi_lims.phlebotomy import get_slot_availability, plan_routes
+from adi_lims.reports import (
+    enqueue_daily_batch,
+    get_batch_file,
+    get_batch_status,
+    get_cached_report,
+    get_report_metrics,
+    get_report_status,
+)
+from adi_lims.realtime import get_delta_rows as get_changed_rows
+from adi_lims.qc import (
+    get_held_results,
+    get_levey_jennings,
+    record_control_results,
+    reset_control_series,
+    set_control_target,
+)
+from adi_lims.results import bulk_update_results
+from adi_lims.sample_status import transition_samples
+from adi_lims.search import search
+from adi_lims.storage import allocate_samples, get_subtree_occupancy
+from adi_lims.tat import get_tat_percentiles
+from adi_lims.verification import claim_next_batch, release_claims, verify_batch
+from adi_lims.worklist import get_worklist_page
+
 @frappe.whitelist()
+@instrument
 def get_doctype_counts():
     """
     Returns counts for key LIMS doctypes for the dashboard.
     """
+    sample_counts = get_dashboard_stats()["samples"]
     counts = {
-        "total_samples": frappe.db.count("Sample"),
-        "samples_in_progress": frappe.db.count("Sample", {"status": "In-Progress"}),
-        "reports_pending": frappe.db.count("Sample", {"status": "In-Progress"}) # Placeholder for actual reports logic
+        "total_samples": sample_counts["total"],
+        "samples_in_progress": sample_counts["In-Progress"],
+        "reports_pending": sample_counts["In-Progress"] # Placeholder for actual reports logic
     }
     return counts
 
 @frappe.whitelist()
+@instrument
+def get_lims_dashboard_stats():
+    """
+    Returns all Sample status counts and Collection Appointment buckets
+    in one call. Served from a short-lived cache.
+    """
+    return get_dashboard_stats()
+
+@frappe.whitelist()
+@instrument
+def get_delta_rows(doctype, names):
+    """
+    Returns the current rows for names announced in an `adi_lims_delta` realtime
+    message (Sample, Lab Test Result or Collection Appointment), read with the
+    caller's permissions; rows the caller cannot read are left out.
+    """
+    return get_changed_rows(doctype, frappe.parse_json(names))
+
+@frappe.whitelist(methods=["GET"])
+def get_lims_bootstrap():
+    """
+    Returns everything the LIMS dashboard shows on open in one response:
+    stats, recent activity, appointments, phlebotomy queue and pending reports.
+    Sent gzipped with an ETag; a request with a matching If-None-Match gets a 304.
+    """
+    return bootstrap_response()
+
+@frappe.whitelist()
+@instrument
 def get_recent_activity():
     """
     Returns a list of recent activities for the dashboard.
     This is a placeholder and should be replaced with actual activity logging.
     """
     # For now, return static data or simple recent sample updates
-    activities = frappe.get_list(
-        "Sample",
-        fields=["name", "sample_name", "status", "modified"],
-        limit=5,
-        order_by="modified desc"
-    )
-    return activities
+    return get_recent_samples()
 
 @frappe.whitelist()
+@instrument
 def create_new_patient(data):
     """
     Creates a new Patient document.
@@ -50,6 +117,7 @@ def create_new_patient(data):
         return {"status": "error", "message": str(e)}
 
 @frappe.whitelist()
+@instrument
 def create_new_sample(data):
     """
     Creates a new Sample document.
@@ -65,79 +133,134 @@ def create_new_sample(data):
         frappe.log_error(frappe.get_traceback(), "create_new_sample")
         return {"status": "error", "message": str(e)}
 
-@frappe.whitelist()
-def get_patients_for_listing(filters=None, start=0, page_len=20):
+@frappe.whitelist(methods=["POST"])
+@instrument
+def create_patients_bulk(patients):
     """
-    Returns a list of patients for the patient management view.
-    Filters and pagination can be applied.
+    Creates a batch of Patients in one transaction.
+    Expects a list of Patient field dictionaries; none are created if any fails.
     """
-    if filters is None:
-        filters = {}
+    try:
+        names = create_patients(frappe.parse_json(patients))
+        frappe.db.commit()
+        return {"status": "success", "message": f"{len(names)} patients created", "names": names}
+    except Exception as e:
+        frappe.db.rollback()
+        frappe.log_error(frappe.get_traceback(), "create_patients_bulk")
+        return {"status": "error", "message": str(e)}
 
-    patients = frappe.get_list(
-        "Patient",
-        filters=filters,
-        fields=["name", "first_name", "last_name", "gender", "dob", "mobile_no"],
-        start=start,
-        page_length=page_len,
-        order_by="creation desc"
-    )
-    total_count = frappe.db.count("Patient", filters=filters)
-    return {"data": patients, "total_count": total_count}
+@frappe.whitelist(methods=["POST"])
+@instrument
+def accession_samples_bulk(samples):
+    """
+    Creates a batch of Samples with their Lab Test Results in one transaction.
+    Each entry holds Sample fields plus optional `panels` and `lab_tests` lists.
+    """
+    try:
+        names = accession_samples(frappe.parse_json(samples))
+        frappe.db.commit()
+        return {"status": "success", "message": f"{len(names)} samples created", "names": names}
+    except Exception as e:
+        frappe.db.rollback()
+        frappe.log_error(frappe.get_traceback(), "accession_samples_bulk")
+        return {"status": "error", "message": str(e)}
 
 @frappe.whitelist()
-def get_samples_for_listing(filters=None, start=0, page_len=20):
+@instrument
+def get_patients_for_listing(filters=None, start=0, page_len=20, cursor=None, count="exact"):
     """
-    Returns a list of samples for the sample management view.
-    Filters and pagination can be applied.
+    Returns a page of patients for the patient management view.
+    Filters and keyset pagination can be applied.
+    Pass the returned `next_cursor` back to fetch the following page.
+    `count` is "exact" (cached per filter), "estimate" or empty to skip the total.
+    `start` is a deprecated offset, kept for callers that do not pass a cursor.
     """
-    if filters is None:
-        filters = {}
-
-    samples = frappe.get_list(
-        "Sample",
+    return get_listing(
+        "Patient",
+        fields=["name", "first_name", "last_name", "gender", "dob", "mobile_no"],
         filters=filters,
-        fields=["name", "sample_name", "sample_type", "collection_date", "received_date", "status"],
+        cursor=cursor,
+        page_len=page_len,
+        count=count,
         start=start,
-        page_length=page_len,
-        order_by="creation desc"
     )
-    total_count = frappe.db.count("Sample", filters=filters)
-    return {"data": samples, "total_count": total_count}
 
 @frappe.whitelist()
-def get_samples_for_result_entry():
+@instrument
+def get_samples_for_listing(filters=None, start=0, page_len=20, cursor=None, count="exact", include_archived=0):
+    """
+    Returns a page of samples for the sample management view.
+    Filters and keyset pagination can be applied.
+    Pass the returned `next_cursor` back to fetch the following page.
+    `count` is "exact" (cached per filter), "estimate" or empty to skip the total.
+    `start` is a deprecated offset, kept for callers that do not pass a cursor.
+    With `include_archived=1`, archived samples are listed too, flagged with `archived`
+    (cursor pagination only).
+    """
+    fields = ["name", "sample_name", "sample_type", "collection_date", "received_date", "status"]
+    if frappe.utils.cint(include_archived):
+        return get_listing_with_archive(
+            "Sample", fields=fields, filters=filters, cursor=cursor, page_len=page_len, count=count
+        )
+    return get_listing(
+        "Sample", fields=fields, filters=filters, cursor=cursor, page_len=page_len, count=count, start=start
+    )
+
+@frappe.whitelist()
+@instrument
+def get_samples_for_result_entry(page_len=20):
     """
     Returns samples with status 'In-Progress' and their associated Lab Test Results
     for result entry.
+    Reference ranges missing on a result are resolved from the Lab Test catalog
+    using the patient's gender and age group.
     """
     samples = frappe.get_list(
         "Sample",
         filters={"status": "In-Progress"},
-        fields=["name", "sample_name", "status"],
-        limit=20, # Limit for performance, can be paginated later
+        fields=["name", "sample_name", "sample_type", "patient", "status"],
+        limit=frappe.utils.cint(page_len) or 20,
         order_by="modified asc"
     )
+    if not samples:
+        return samples
 
+    patients = get_many(
+        "Patient", [sample.patient for sample in samples], ["first_name", "last_name", "gender", "dob"]
+    )
+
+    results_by_sample = {}
+    for test_result in frappe.get_all(
+        "Lab Test Result",
+        filters={
+            "parenttype": "Sample",
+            "parent": ("in", [sample.name for sample in samples]),
+            "status": ("in", ["Pending", "Completed"]), # Include completed for review/edit
+        },
+        fields=["name", "parent", "lab_test", "result_value", "numeric_result_value", "unit", "reference_range", "status", "analyst"],
+        order_by="creation asc"
+    ):
+        results_by_sample.setdefault(test_result.pop("parent"), []).append(test_result)
+
+    catalog = get_catalog()
     for sample in samples:
-        sample.sample_test_results = frappe.get_list(
-            "Lab Test Result",
-            filters={"parent": sample.name, "status": ("in", ["Pending", "Completed"])}, # Include completed for review/edit
-            fields=["name", "lab_test", "result_value", "numeric_result_value", "unit", "reference_range", "status", "analyst"],
-            order_by="creation asc"
-        )
-        # Fetch reference range if not already set (e.g. from Lab Test DocType)
+        patient = patients.get(sample.patient)
+        gender = age_group = None
+        if patient:
+            sample.patient_name = f"{patient.first_name} {patient.last_name or ''}".strip()
+            gender = patient.gender
+            age_group = get_age_group(patient.dob)
+
+        sample.sample_test_results = results_by_sample.get(sample.name, [])
         for test_result in sample.sample_test_results:
             if not test_result.reference_range and test_result.lab_test:
-                lab_test_doc = frappe.get_doc("Lab Test", test_result.lab_test)
-                if lab_test_doc and lab_test_doc.normal_ranges:
-                    # Simple pick for now, ideally match based on gender/age_group
-                    test_result.reference_range = f"{lab_test_doc.normal_ranges[0].min_value or ''} - {lab_test_doc.normal_ranges[0].max_value or ''} {lab_test_doc.normal_ranges[0].unit or ''}"
+                test_result.reference_range = catalog.get_reference_range(test_result.lab_test, gender, age_group)
     return samples
 
 
 
 @frappe.whitelist()
+@instrument
 def create_dummy_sample_with_tests():
     """
     Creates a dummy sample with pre-defined lab tests for demonstration purposes.
@@ -162,8 +285,9 @@ def create_dummy_sample_with_tests():
 
         # Create some Lab Tests if they don't exist
         test_names = ["CBC", "Lipid Profile", "Glucose (Random)"]
+        existing_tests = set(frappe.get_all("Lab Test", filters={"name": ("in", test_names)}, pluck="name"))
         for test_name in test_names:
-            if not frappe.db.exists("Lab Test", test_name):
+            if test_name not in existing_tests:
                 frappe.get_doc({
                     "doctype": "Lab Test",
                     "test_name": test_name,
@@ -209,6 +333,7 @@ def create_dummy_sample_with_tests():
         return {"status": "error", "message": str(e)}
 
 @frappe.whitelist()
+@instrument
 def update_test_result(test_result_name, result_value):
     """
     Updates the result_value and status of a Lab Test Result.
@@ -223,6 +348,10 @@ def update_test_result(test_result_name, result_value):
             doc.numeric_result_value = None
         
         doc.status = "Completed" # Mark as completed upon entry
+        # a new value needs a new verification, also after a rejection
+        doc.verification_status = "Pending"
+        doc.verifier = None
+        doc.verified_on = None
         doc.save(ignore_permissions=True)
         frappe.db.commit()
         return {"status": "success", "message": "Test result updated successfully"}
@@ -231,7 +360,38 @@ def update_test_result(test_result_name, result_value):
         return {"status": "error", "message": str(e)}
 
 
+@frappe.whitelist(methods=["POST"])
+@instrument
+def bulk_update_test_results(results, instrument=None, qc_run=None):
+    """
+    Saves a batch of test results (e.g. an analyzer run) in one transaction.
+    `results` is a list of (test_result_name, result_value) pairs or dicts,
+    or the same as JSON / CSV text. Invalid rows are returned in `errors`
+    and do not stop the rest of the batch. `instrument` and `qc_run` name the
+    analytical run, whose QC must be accepted before the results can be verified.
+    """
+    try:
+        response = bulk_update_results(results, instrument=instrument, qc_run=qc_run)
+        frappe.db.commit()
+        return {"status": "success", **response}
+    except Exception as e:
+        frappe.db.rollback()
+        frappe.log_error(frappe.get_traceback(), "bulk_update_test_results")
+        return {"status": "error", "message": str(e)}
+
+
+@frappe.whitelist(methods=["POST"])
+@instrument
+def ingest_instrument_file(file_url, file_format=None, instrument=None, qc_run=None):
+    """
+    Queues a background import of an uploaded analyzer export (ASTM, HL7 or CSV).
+    Pass the `instrument` and `qc_run` that produced it to hold the results on QC.
+    Progress is published on the `adi_lims_ingestion_progress` realtime event.
+    """
+    return enqueue_ingestion(file_url, fmt=file_format, instrument=instrument, qc_run=qc_run)
+
 @frappe.whitelist()
+@instrument
 def get_sample_stats():
     """
     Returns counts for sample statuses.
@@ -241,106 +401,44 @@ def get_sample_stats():
     - Processing -> Analyzed (or In-Progress if analyzed not used)
     - Rejected -> Rejected
     """
+    sample_counts = get_dashboard_stats()["samples"]
     stats = {
-        "pending_accession": frappe.db.count("Sample", {"status": "Received"}),
-        "accessioned": frappe.db.count("Sample", {"status": "In-Progress"}),
-        "processing": frappe.db.count("Sample", {"status": "Analyzed"}),
-        "rejected": frappe.db.count("Sample", {"status": "Rejected"})
+        "pending_accession": sample_counts["Received"],
+        "accessioned": sample_counts["In-Progress"],
+        "processing": sample_counts["Analyzed"],
+        "rejected": sample_counts["Rejected"]
     }
     return stats
 
 @frappe.whitelist()
-def get_sample_worklist(status=None):
+@instrument
+def get_sample_worklist(status=None, cursor=None, page_len=50):
     """
-    Returns a list of samples for the worklist.
+    Returns a page of samples for the worklist with patient and test info.
+    Pass the returned `next_cursor` back to fetch the following page.
     """
-    filters = {}
-    if status == "Pending":
-        filters["status"] = "Received"
-    elif status and status != "All":
-        filters["status"] = status
-
-    samples = frappe.get_list(
-        "Sample",
-        filters=filters,
-        fields=["name", "sample_name", "patient", "collection_date", "status"],
-        order_by="creation desc"
-    )
-
-    # Enhance sample data with patient details and test info
-    for sample in samples:
-        # Fetch Patient Details
-        if sample.patient:
-            patient = frappe.db.get_value("Patient", sample.patient, ["first_name", "last_name"], as_dict=True)
-            if patient:
-                 sample.patient_name = f"{patient.first_name} {patient.last_name or ''}".strip()
-            sample.patient_uhid = sample.patient
-        
-        # Fetch Test Info
-        tests = frappe.get_all("Lab Test Result", filters={"parent": sample.name}, fields=["lab_test"])
-        sample.test_info = ", ".join([d.lab_test for d in tests])
-
-        # Format Status for UI
-        if sample.status == "Received":
-            sample.ui_status = "Pending"
-            sample.status_color = "orange"
-        elif sample.status == "In-Progress":
-            sample.ui_status = "Accessioned"
-            sample.status_color = "blue"
-        elif sample.status == "Analyzed":
-            sample.ui_status = "Processing"
-            sample.status_color = "purple"
-        elif sample.status == "Rejected":
-            sample.ui_status = "Rejected"
-            sample.status_color = "red"
-        else:
-            sample.ui_status = sample.status
-            sample.status_color = "gray"
-
-    return samples
+    return get_worklist_page(status=status, cursor=cursor, page_len=page_len)
 
 @frappe.whitelist()
+@instrument
 def get_appointments():
     """
     Returns list of upcoming Collection Appointments with detailed info.
     """
     if frappe.db.exists("DocType", "Collection Appointment"):
-        return frappe.get_list(
-            "Collection Appointment",
-            fields=[
-                "name", 
-                "patient_name", 
-                "patient", 
-                "appointment_date", 
-                "appointment_time", 
-                "status",
-                "collection_type"
-            ],
-            filters={
-                "status": ["!=", "Cancelled"]
-            },
-            limit=20,
-            order_by="appointment_date asc, appointment_time asc"
-        )
+        return get_appointment_list("appointments")
     return []
 
 @frappe.whitelist()
+@instrument
 def get_appointment_stats():
     """
     Returns statistics for the Appointment Dashboard based on Collection Appointment.
     """
-    if not frappe.db.exists("DocType", "Collection Appointment"):
-        return {"scheduled_today": 0, "pending_collection": 0, "completed": 0}
-
-    today = frappe.utils.nowdate()
-    
-    return {
-        "scheduled_today": frappe.db.count("Collection Appointment", {"appointment_date": today, "status": "Scheduled"}),
-        "pending_collection": frappe.db.count("Collection Appointment", {"status": "Scheduled", "appointment_date": ["<=", today]}),
-        "completed": frappe.db.count("Collection Appointment", {"status": ["in", ["Completed"]]})
-    }
+    return get_dashboard_stats()["appointments"]
 
 @frappe.whitelist()
+@instrument
 def create_dummy_collection_appointment():
     """
     Creates a dummy Collection Appointment for testing.
@@ -369,45 +467,50 @@ def create_dummy_collection_appointment():
         return {"status": "error", "message": str(e)}
 
 @frappe.whitelist()
+@instrument
 def get_phlebotomy_queue():
     """
     Returns list of scheduled Collection Appointments for Phlebotomy Queue.
     """
     if frappe.db.exists("DocType", "Collection Appointment"):
-        return frappe.get_list(
-            "Collection Appointment",
-            fields=[
-                "name", 
-                "patient_name", 
-                "patient", 
-                "appointment_time", 
-                "collection_type"
-            ],
-            filters={
-                "status": "Scheduled"
-            },
-            limit=20,
-            order_by="appointment_date asc, appointment_time asc"
-        )
+        return get_appointment_list("phlebotomy_queue")
     return []
 
+@frappe.whitelist(methods=["POST"])
+@instrument
+def plan_phlebotomy_routes(date=None, assistants=None):
+    """
+    Assigns the day's scheduled home collections to phlebotomists and orders each route.
+    `assistants` is a list of Users; defaults to `adi_lims_phlebotomists` in site config.
+    """
+    try:
+        plan = plan_routes(date or frappe.utils.nowdate(), frappe.parse_json(assistants) if assistants else None)
+        frappe.db.commit()
+        return {"status": "success", "message": f"{plan['appointments']} appointments routed", "plan": plan}
+    except Exception as e:
+        frappe.db.rollback()
+        frappe.log_error(frappe.get_traceback(), "plan_phlebotomy_routes")
+        return {"status": "error", "message": str(e)}
+
+@frappe.whitelist()
+@instrument
+def get_collection_slots(date=None):
+    """
+    Returns capacity, booked and free count of every collection slot of the day.
+    """
+    frappe.has_permission("Collection Appointment", "read", throw=True)
+    return get_slot_availability(date or frappe.utils.nowdate())
+
 @frappe.whitelist()
+@instrument
 def get_pending_reports():
     """
-    Returns list of completed lab tests ready for reporting.
+    Returns the samples whose results are all verified, ready for reporting.
     """
-    # Assuming standard Lab Test doc status or custom status 'Completed'
-    filters = {"docstatus": 1} if frappe.db.get_value("DocType", "Lab Test", "is_submittable") else {"status": "Completed"}
-    
-    return frappe.get_list(
-        "Lab Test",
-        filters=filters,
-        fields=["name", "patient_name", "template_name", "creation"], 
-        # Using 'template_name' or 'test_name' depending on schema. 'template_name' is standard in Healthcare.
-        limit=20,
-    )
+    return get_pending_lab_tests()
 
 @frappe.whitelist()
+@instrument
 def create_dummy_appointment():
     """
     Creates a dummy patient appointment for testing.
@@ -469,21 +572,351 @@ def create_dummy_appointment():
         return {"status": "error", "message": str(e)}
 
 @frappe.whitelist()
-def get_appointments_for_listing(filters=None, start=0, page_len=20):
+@instrument
+def get_appointments_for_listing(filters=None, start=0, page_len=20, cursor=None, count="exact"):
     """
-    Returns a list of patient appointments for the appointments view.
-    Filters and pagination can be applied.
+    Returns a page of patient appointments for the appointments view.
+    Filters and keyset pagination can be applied.
+    Pass the returned `next_cursor` back to fetch the following page.
+    `count` is "exact" (cached per filter), "estimate" or empty to skip the total.
+    `start` is a deprecated offset, kept for callers that do not pass a cursor.
     """
-    if filters is None:
-        filters = {}
-
-    appointments = frappe.get_list(
+    return get_listing(
         "Patient Appointment",
-        filters=filters,
         fields=["name", "patient", "appointment_date", "appointment_time", "status", "practitioner"],
+        filters=filters,
+        cursor=cursor,
+        page_len=page_len,
+        count=count,
         start=start,
-        page_length=page_len,
-        order_by="appointment_date desc, appointment_time desc"
     )
-    total_count = frappe.db.count("Patient Appointment", filters=filters)
-    return {"data": appointments, "total_count": total_count}
+
+@frappe.whitelist()
+@instrument
+def get_storage_occupancy(location):
+    """
+    Returns capacity, occupancy and free space of a storage location
+    including everything stored below it.
+    """
+    frappe.has_permission("Storage Location", "read", throw=True)
+    return get_subtree_occupancy(location)
+
+@frappe.whitelist(methods=["POST"])
+@instrument
+def allocate_sample_storage(samples, location=None, near=None):
+    """
+    Places a list of samples into the nearest boxes with free space.
+    `location` limits the search to a freezer, rack or room; `near` is the box to start from.
+    """
+    try:
+        allocation = allocate_samples(frappe.parse_json(samples), location=location, near=near)
+        frappe.db.commit()
+        return {"status": "success", "message": f"{len(allocation)} samples allocated", "allocation": allocation}
+    except Exception as e:
+        frappe.db.rollback()
+        frappe.log_error(frappe.get_traceback(), "allocate_sample_storage")
+        return {"status": "error", "message": str(e)}
+
+@frappe.whitelist()
+@instrument
+def get_tat_report(from_date, to_date, stage="Total", department=None, lab_test=None, group_by=None):
+    """
+    Returns turnaround time in minutes (count, mean, max, p50/p90/p95) for a date range,
+    read from the Lab TAT Rollup table. `group_by` may be "department" or "lab_test".
+    """
+    frappe.has_permission("Lab TAT Rollup", "read", throw=True)
+    return get_tat_percentiles(
+        from_date, to_date, stage=stage, department=department, lab_test=lab_test, group_by=group_by
+    )
+
+@frappe.whitelist()
+@instrument
+def search_lims(query, doctypes=None, limit=20, typeahead=0, include_archived=0):
+    """
+    Ranked search over patients (name, UHID, mobile number) and samples
+    (S-number, sample name, patient). Pass `typeahead=1` from search-as-you-type
+    boxes to get recently active patients first, `include_archived=1` to search
+    archived samples as well.
+    """
+    return search(
+        query,
+        doctypes=doctypes,
+        limit=limit,
+        typeahead=frappe.utils.cint(typeahead),
+        include_archived=frappe.utils.cint(include_archived),
+    )
+
+@frappe.whitelist()
+@instrument
+def get_sample_report(sample):
+    """
+    Returns {"status": "ready"} when the PDF report of the sample is cached and current,
+    otherwise queues it for rendering and returns {"status": "queued"}.
+    Fetch a ready report with `download_sample_report`.
+    """
+    return get_report_status(sample)
+
+@frappe.whitelist()
+def download_sample_report(sample):
+    """
+    Streams the cached PDF report of a sample.
+    """
+    report = get_cached_report(sample)
+    if not report:
+        frappe.throw("Report is not ready yet, request it with get_sample_report")
+    frappe.local.response.filename, frappe.local.response.filecontent = report
+    frappe.local.response.type = "pdf"
+
+@frappe.whitelist(methods=["POST"])
+@instrument
+def render_daily_reports(date=None):
+    """
+    Renders the reports of every sample verified on `date` (default today) in the
+    background and merges them into one PDF. Progress is published on `adi_lims_report_batch`.
+    """
+    frappe.has_permission("Sample", "read", throw=True)
+    return enqueue_daily_batch(date)
+
+@frappe.whitelist()
+@instrument
+def get_report_batch(batch_id):
+    """
+    Returns the status and throughput metrics of a daily report batch.
+    """
+    frappe.has_permission("Sample", "read", throw=True)
+    return get_batch_status(batch_id)
+
+@frappe.whitelist()
+def download_report_batch(batch_id):
+    """
+    Streams the merged PDF of a finished daily report batch.
+    """
+    frappe.has_permission("Sample", "read", throw=True)
+    report = get_batch_file(batch_id)
+    if not report:
+        frappe.throw("Report batch is not ready yet")
+    frappe.local.response.filename, frappe.local.response.filecontent = report
+    frappe.local.response.type = "pdf"
+
+@frappe.whitelist(methods=["POST"])
+@instrument
+def get_verification_queue(limit=50, department=None, lab_test=None):
+    """
+    Claims the next batch of completed results awaiting verification for the
+    current user, oldest first. Rows claimed by other verifiers are skipped,
+    not waited on; a claim lapses after 15 minutes.
+    """
+    results = claim_next_batch(limit=limit, department=department, lab_test=lab_test)
+    frappe.db.commit()
+    return results
+
+@frappe.whitelist(methods=["POST"])
+@instrument
+def verify_test_results(results, action="Verify", notes=None):
+    """
+    Verifies (or, with action="Reject", sends back for rerun) a list of
+    Lab Test Result names in one transaction. Rows that are locked, claimed by
+    another verifier or no longer pending are returned as `skipped`.
+    """
+    try:
+        response = verify_batch(frappe.parse_json(results), action=action, notes=notes)
+        frappe.db.commit()
+        return {
+            "status": "success",
+            "message": f"{len(response['processed'])} results processed, {len(response['skipped'])} skipped",
+            **response,
+        }
+    except Exception as e:
+        frappe.db.rollback()
+        frappe.log_error(frappe.get_traceback(), "verify_test_results")
+        return {"status": "error", "message": str(e)}
+
+@frappe.whitelist(methods=["POST"])
+@instrument
+def release_verification_claims(results=None):
+    """
+    Gives back the current user's claimed results, all of them or the listed ones.
+    """
+    release_claims(frappe.parse_json(results) if results else None)
+    frappe.db.commit()
+    return {"status": "success"}
+
+@frappe.whitelist(methods=["POST"])
+@instrument
+def transition_sample_status(status, samples=None, filters=None, expected=None):
+    """
+    Moves a batch of samples (a list of names, or list filters) to `status` in one
+    transaction. Samples the state machine does not allow to move, or that another
+    user changed since `expected` ({name: modified}), are returned, not overwritten.
+    """
+    try:
+        response = transition_samples(
+            status,
+            samples=frappe.parse_json(samples) if samples else None,
+            filters=frappe.parse_json(filters) if filters else None,
+            expected=frappe.parse_json(expected) if expected else None,
+        )
+        frappe.db.commit()
+        skipped = len(response["invalid"]) + len(response["conflicts"]) + len(response["not_found"])
+        return {
+            "status": "success",
+            "message": f"{len(response['transitioned'])} samples moved to {status}, {skipped} skipped",
+            **response,
+        }
+    except Exception as e:
+        frappe.db.rollback()
+        frappe.log_error(frappe.get_traceback(), "transition_sample_status")
+        return {"status": "error", "message": str(e)}
+
+@frappe.whitelist(methods=["POST"])
+@instrument
+def record_qc_results(results):
+    """
+    Records a batch of control results (lab_test, instrument, control_level, qc_run,
+    value) and applies the Westgard rules; runs that violate a rejection rule are
+    Rejected and their patient results held from verification.
+    """
+    try:
+        response = record_control_results(frappe.parse_json(results))
+        frappe.db.commit()
+        return {
+            "status": "success",
+            "message": f"{len(response['recorded'])} control results recorded, {len(response['rejected_runs'])} runs rejected",
+            **response,
+        }
+    except Exception as e:
+        frappe.db.rollback()
+        frappe.log_error(frappe.get_traceback(), "record_qc_results")
+        return {"status": "error", "message": str(e)}
+
+@frappe.whitelist(methods=["POST"])
+@instrument
+def set_qc_target(lab_test, instrument, control_level, mean=None, sd=None):
+    """
+    Sets the target mean and SD a control series is scored against; leave both empty
+    to score against the rolling window instead.
+    """
+    try:
+        set_control_target(
+            lab_test,
+            instrument,
+            control_level,
+            mean=None if mean in (None, "") else mean,
+            sd=None if sd in (None, "") else sd,
+        )
+        frappe.db.commit()
+        return {"status": "success", "message": f"Target updated for {lab_test} {control_level}"}
+    except Exception as e:
+        frappe.db.rollback()
+        frappe.log_error(frappe.get_traceback(), "set_qc_target")
+        return {"status": "error", "message": str(e)}
+
+@frappe.whitelist(methods=["POST"])
+@instrument
+def reset_qc_series(lab_test, instrument, control_level, mean=None, sd=None):
+    """
+    Starts a control series afresh for a new control lot, forgetting its rolling
+    window and recent z-scores; pass the lot's mean and SD to score against them.
+    """
+    try:
+        reset_control_series(
+            lab_test,
+            instrument,
+            control_level,
+            mean=None if mean in (None, "") else mean,
+            sd=None if sd in (None, "") else sd,
+        )
+        frappe.db.commit()
+        return {"status": "success", "message": f"Series reset for {lab_test} {control_level}"}
+    except Exception as e:
+        frappe.db.rollback()
+        frappe.log_error(frappe.get_traceback(), "reset_qc_series")
+        return {"status": "error", "message": str(e)}
+
+@frappe.whitelist()
+@instrument
+def get_qc_chart(lab_test, instrument, control_level, limit=100):
+    """
+    Returns the Levey-Jennings points of a control series, oldest first.
+    """
+    return get_levey_jennings(lab_test, instrument, control_level, limit=limit)
+
+@frappe.whitelist()
+@instrument
+def get_qc_held_results(lab_test=None, instrument=None, qc_run=None, limit=500):
+    """
+    Returns completed results held from verification by a rejected or unevaluated QC run.
+    """
+    return get_held_results(lab_test=lab_test, instrument=instrument, qc_run=qc_run, limit=limit)
+
+@frappe.whitelist(methods=["POST"])
+@instrument
+def print_sample_labels(printer, samples=None, from_sample=None, to_sample=None, label_format="zpl"):
+    """
+    Sends tube labels to a printer configured in `adi_lims_label_printers`.
+    Pass a list of samples, or `from_sample` and `to_sample` for a whole accession batch.
+    """
+    try:
+        response = print_labels(
+            printer,
+            samples=frappe.parse_json(samples) if samples else None,
+            from_sample=from_sample,
+            to_sample=to_sample,
+            fmt=label_format,
+        )
+        return {"status": "success", "message": f"{response['labels']} labels sent to {printer}", **response}
+    except Exception as e:
+        frappe.log_error(frappe.get_traceback(), "print_sample_labels")
+        return {"status": "error", "message": str(e)}
+
+@frappe.whitelist()
+def download_sample_labels(samples=None, from_sample=None, to_sample=None, label_format="pdf"):
+    """
+    Streams tube labels as a PDF (or ZPL) file.
+    """
+    frappe.local.response.filename, frappe.local.response.filecontent = render_labels(
+        samples=frappe.parse_json(samples) if samples else None,
+        from_sample=from_sample,
+        to_sample=to_sample,
+        fmt=label_format,
+    )
+    frappe.local.response.type = "download"
+
+@frappe.whitelist()
+@instrument
+def get_patient_cumulative(patient, lab_tests=None, from_date=None, to_date=None):
+    """
+    Returns the patient's numeric results over time, per lab test, for trend views:
+    `times` (epoch milliseconds) and `values` arrays plus unit and reference range.
+    """
+    return get_cumulative_results(
+        patient,
+        lab_tests=frappe.parse_json(lab_tests) if lab_tests else None,
+        from_date=from_date,
+        to_date=to_date,
+    )
+
+@frappe.whitelist()
+def get_lims_report_metrics():
+    """
+    Returns report rendering throughput: renders, cache hits and average render time.
+    """
+    frappe.only_for("System Manager")
+    return get_report_metrics()
+
+@frappe.whitelist()
+def get_lims_perf_stats():
+    """
+    Returns per-endpoint timings, query counts and N+1 reports collected
+    when `adi_lims_perf_instrumentation` is enabled in site config.
+    """
+    frappe.only_for("System Manager")
+    return get_perf_stats()
+
+@frappe.whitelist(methods=["POST"])
+def record_page_timing(metric, ms):
+    """
+    Records a timing measured by a LIMS desk page (e.g. `adilims.first_paint`)
+    when `adi_lims_perf_instrumentation` is enabled; a no-op otherwise.
+    """
+    record_client_timing(metric, ms)
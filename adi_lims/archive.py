@@ -0,0 +1,254 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Sample archive.
+
+Disposed and Analyzed samples untouched for longer than the retention window
+(site config `adi_lims_archive_after_days`, default 365) are moved with their
+Lab Test Result rows into archive tables with the same columns as the live
+ones. The move runs in keyset-ordered chunks, each one an
+INSERT ... SELECT followed by a DELETE and a commit, so the live tables stay
+bounded without long locks. Samples still occupying a storage location are
+left alone.
+
+Archived rows are read through the same filters and permissions as the live
+doctype: `frappe.get_list(..., run=0)` builds the query, which is then pointed
+at the archive table. Their search index entries move to a separate
+ref_doctype, so live searches never see them.
+"""
+
+import frappe
+from frappe import _
+from frappe.utils import add_days, cint, now_datetime
+
+from adi_lims.dashboard import invalidate_dashboard_stats
+from adi_lims.listing import (
+	COUNT_CACHE_TTL,
+	COUNT_EXACT,
+	DEFAULT_PAGE_LENGTH,
+	encode_cursor,
+	get_cursor_filters,
+	get_filter_hash,
+	get_filter_list,
+	get_listing,
+	get_page_length,
+	invalidate_listing_counts,
+)
+from adi_lims.search import set_archived
+
+ARCHIVE_TABLES = {
+	"Sample": "__lims_archive_sample",
+	"Lab Test Result": "__lims_archive_lab_test_result",
+}
+ARCHIVABLE_STATUSES = ("Disposed", "Analyzed")
+DEFAULT_RETENTION_DAYS = 365
+ARCHIVE_CHUNK_SIZE = 1000
+
+ARCHIVE_COUNT_GENERATION_KEY = "adi_lims:archive_count_generation"
+
+
+def setup_archive_tables():
+	"""Create the archive tables and add any column the live tables gained since.
+
+	Runs after migrate: DDL commits implicitly, so it must not run mid-request.
+	"""
+	for doctype, table in ARCHIVE_TABLES.items():
+		frappe.db.sql(f"create table if not exists `{table}` like `tab{doctype}`")
+		archived = {column for column, _type in _get_columns(table)}
+		for column, column_type in _get_columns(f"tab{doctype}"):
+			if column not in archived:
+				frappe.db.sql(f"alter table `{table}` add column `{column}` {column_type}")
+
+
+def _get_columns(table):
+	return frappe.db.sql(
+		"""
+		select column_name, column_type
+		from information_schema.columns
+		where table_schema = database() and table_name = %s
+		order by ordinal_position
+		""",
+		table,
+	)
+
+
+def archive_tables_exist():
+	existing = frappe.db.sql(
+		"""
+		select count(*) from information_schema.tables
+		where table_schema = database() and table_name in %s
+		""",
+		[list(ARCHIVE_TABLES.values())],
+	)
+	return existing[0][0] == len(ARCHIVE_TABLES)
+
+
+def get_retention_days():
+	return cint(frappe.conf.get("adi_lims_archive_after_days")) or DEFAULT_RETENTION_DAYS
+
+
+# Moving rows
+
+
+def _move_rows(doctype, condition, values, to_archive=True):
+	"""Copy the rows matching `condition` between the live and archive table, then delete them."""
+	live, archive = f"tab{doctype}", ARCHIVE_TABLES[doctype]
+	source, target = (live, archive) if to_archive else (archive, live)
+	columns = ", ".join(f"`{column}`" for column, _type in _get_columns(live))
+	frappe.db.sql(
+		f"insert into `{target}` ({columns}) select {columns} from `{source}` where {condition}", values
+	)
+	frappe.db.sql(f"delete from `{source}` where {condition}", values)
+
+
+def _move_samples(names, to_archive=True):
+	# children first, while the parent rows are still locked in place
+	_move_rows(
+		"Lab Test Result",
+		"parenttype = 'Sample' and parent in %(names)s",
+		{"names": names},
+		to_archive=to_archive,
+	)
+	_move_rows("Sample", "name in %(names)s", {"names": names}, to_archive=to_archive)
+	set_archived("Sample", names, archived=to_archive)
+
+
+def get_archivable_samples(cutoff, after="", limit=ARCHIVE_CHUNK_SIZE):
+	"""Lock and return the next chunk of samples due for archiving, in name order."""
+	return frappe.db.sql_list(
+		"""
+		select name
+		from `tabSample`
+		where name > %(after)s
+			and status in %(statuses)s
+			and modified < %(cutoff)s
+			and (status = 'Disposed' or ifnull(storage_location, '') = '')
+		order by name
+		limit %(limit)s
+		for update
+		""",
+		{"after": after, "statuses": ARCHIVABLE_STATUSES, "cutoff": cutoff, "limit": limit},
+	)
+
+
+def archive_samples(retention_days=None, chunk_size=ARCHIVE_CHUNK_SIZE, progress=None):
+	"""Move every aged sample to the archive, committing per chunk; daily job entry point.
+
+	Returns the number of samples archived.
+	"""
+	if not archive_tables_exist():
+		return 0
+	cutoff = add_days(now_datetime(), -(cint(retention_days) or get_retention_days()))
+	archived, last_name = 0, ""
+	while True:
+		names = get_archivable_samples(cutoff, after=last_name, limit=chunk_size)
+		if not names:
+			break
+		_move_samples(names)
+		frappe.db.commit()
+		archived += len(names)
+		last_name = names[-1]
+		if progress:
+			progress(archived)
+
+	if archived:
+		_invalidate_counts()
+	return archived
+
+
+def restore_samples(names):
+	"""Move archived samples and their results back into the live tables."""
+	frappe.has_permission("Sample", "write", throw=True)
+	names = frappe.db.sql_list(
+		f"select name from `{ARCHIVE_TABLES['Sample']}` where name in %s for update", [list(names)]
+	)
+	if names:
+		_move_samples(names, to_archive=False)
+		_invalidate_counts()
+	return names
+
+
+def _invalidate_counts():
+	invalidate_listing_counts(frappe._dict(doctype="Sample"))
+	invalidate_dashboard_stats()
+	frappe.cache().set_value(ARCHIVE_COUNT_GENERATION_KEY, frappe.generate_hash(length=10))
+
+
+# Reading
+
+
+def get_archive_query(doctype, **kwargs):
+	"""SQL of `frappe.get_list(doctype, **kwargs)` reading from the archive table instead."""
+	query = frappe.get_list(doctype, run=0, **kwargs)
+	return query.replace(f"`tab{doctype}`", f"`{ARCHIVE_TABLES[doctype]}`")
+
+
+def get_archived_rows(doctype, fields, filters=None, **kwargs):
+	return frappe.db.sql(get_archive_query(doctype, fields=fields, filters=filters, **kwargs), as_dict=True)
+
+
+def get_archived_count(doctype, filters):
+	generation = frappe.cache().get_value(ARCHIVE_COUNT_GENERATION_KEY) or 0
+	key = f"adi_lims:archive_count:{doctype}:{generation}:{get_filter_hash(doctype, filters)}"
+	total_count = frappe.cache().get_value(key)
+	if total_count is None:
+		total_count = cint(
+			get_archived_rows(doctype, ["count(*) as total_count"], filters=filters, order_by="")[
+				0
+			].total_count
+		)
+		frappe.cache().set_value(key, total_count, expires_in_sec=COUNT_CACHE_TTL)
+	return total_count
+
+
+def get_listing_with_archive(
+	doctype, fields, filters=None, cursor=None, page_len=DEFAULT_PAGE_LENGTH, count=COUNT_EXACT
+):
+	"""`get_listing` over the live and the archive table, merged on (creation, name).
+
+	Every row carries `archived` (0 or 1); cursors and totals span both tables.
+	"""
+	if doctype not in ARCHIVE_TABLES:
+		frappe.throw(_("{0} has no archive").format(doctype))
+
+	response = get_listing(doctype, fields, filters=filters, cursor=cursor, page_len=page_len, count=count)
+	page_len = get_page_length(page_len)
+	filters = get_filter_list(frappe.parse_json(filters) if filters else [])
+	fields = fields if "creation" in fields else [*fields, "creation"]
+
+	archive_filters, or_filters = get_cursor_filters(filters, cursor) if cursor else (filters, None)
+	archived = get_archived_rows(
+		doctype,
+		fields,
+		filters=archive_filters,
+		or_filters=or_filters,
+		order_by="creation desc, name desc",
+		limit_page_length=page_len + 1,
+	)
+
+	for row in response["data"]:
+		row.archived = 0
+	for row in archived:
+		row.archived = 1
+	rows = sorted(response["data"] + archived, key=lambda row: (row.creation, row.name), reverse=True)
+
+	has_more = bool(response["next_cursor"]) or len(rows) > page_len
+	response["data"] = rows = rows[:page_len]
+	response["next_cursor"] = encode_cursor(rows[-1].creation, rows[-1].name) if has_more and rows else None
+	if "total_count" in response:
+		if response["count_is_estimate"]:
+			response["total_count"] += get_estimated_archive_count(doctype)
+		else:
+			response["total_count"] += get_archived_count(doctype, filters)
+	return response
+
+
+def get_estimated_archive_count(doctype):
+	rows = frappe.db.sql(
+		"""
+		select table_rows from information_schema.tables
+		where table_schema = database() and table_name = %s
+		""",
+		(ARCHIVE_TABLES[doctype],),
+	)
+	return cint(rows[0][0]) if rows else 0
@@ -0,0 +1,79 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Helpers shared by the benchmark scripts.
+
+Benchmarks seed synthetic data inside the current transaction and roll it back
+when they finish, so they can be run against a development site with:
+
+	bench --site <site> execute adi_lims.benchmarks.<module>.run --kwargs "{...}"
+"""
+
+import time
+from contextlib import contextmanager
+
+import frappe
+
+
+@contextmanager
+def count_queries():
+	"""Count the SQL statements issued through `frappe.db.sql` inside the block."""
+	counter = {"queries": 0}
+	original_sql = frappe.db.sql
+
+	def sql(*args, **kwargs):
+		counter["queries"] += 1
+		return original_sql(*args, **kwargs)
+
+	frappe.db.sql = sql
+	try:
+		yield counter
+	finally:
+		del frappe.db.sql
+
+
+@contextmanager
+def timer():
+	"""Measure wall time of the block in milliseconds."""
+	result = {"ms": 0.0}
+	start = time.perf_counter()
+	try:
+		yield result
+	finally:
+		result["ms"] = (time.perf_counter() - start) * 1000
+
+
+def make_names(prefix, count, start=0):
+	return [f"{prefix}{i:08d}" for i in range(start, start + count)]
+
+
+def seed_rows(doctype, fields, values):
+	"""Bulk insert rows with standard metadata filled in."""
+	now = frappe.utils.now()
+	user = frappe.session.user
+	fields = ["creation", "modified", "owner", "modified_by", *fields]
+	frappe.db.bulk_insert(doctype, fields, [(now, now, user, user, *row) for row in values])
+
+
+def report(title, rows):
+	"""Print rows of dicts as a fixed-width table and return them."""
+	print(title)
+	if rows:
+		columns = list(rows[0])
+		print("  ".join(f"{c:>14}" for c in columns))
+		for row in rows:
+			print("  ".join(f"{_format(row[c]):>14}" for c in columns))
+	return rows
+
+
+def _format(value):
+	if isinstance(value, float):
+		return f"{value:.2f}"
+	return str(value)
+
+
+def cleanup(doctypes):
+	"""Delete seeded rows for benchmarks whose code under test commits."""
+	for doctype in doctypes:
+		frappe.db.delete(doctype, {"name": ("like", "BENCH-%")})
+	frappe.db.commit()
@@ -0,0 +1,90 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Accessioning benchmark: per-document insert vs bulk accessioning.
+
+	bench --site <site> execute adi_lims.benchmarks.accessioning.run \
+		--kwargs "{'samples': 5000, 'tests_per_panel': 10}"
+"""
+
+import frappe
+
+from adi_lims.accessioning import accession_samples
+from adi_lims.benchmarks import count_queries, report, seed_rows, timer
+from adi_lims.benchmarks.result_entry import seed_lab_tests
+from adi_lims.catalog import invalidate_catalog
+
+PANEL = "BENCH-PANEL"
+
+
+def seed_panel(tests_per_panel):
+	seed_lab_tests(tests_per_panel)
+	seed_rows("Lab Test Panel", ["name", "panel_name"], [(PANEL, PANEL)])
+	seed_rows(
+		"Lab Test Panel Item",
+		["name", "parent", "parenttype", "parentfield", "idx", "lab_test"],
+		[
+			(f"{PANEL}-{i}", PANEL, "Lab Test Panel", "lab_tests", i + 1, f"BENCH-TEST-{i}")
+			for i in range(tests_per_panel)
+		],
+	)
+	seed_rows("Sample Type", ["name", "sample_type_name"], [("BENCH-ST", "Blood")])
+	invalidate_catalog()
+
+
+def insert_one_by_one(samples, tests_per_panel):
+	"""Insert documents the way create_new_sample / create_dummy_sample_with_tests do."""
+	for i in range(samples):
+		sample = frappe.get_doc(
+			{
+				"doctype": "Sample",
+				"sample_name": f"Bench {i}",
+				"sample_type": "BENCH-ST",
+				"collection_date": frappe.utils.nowdate(),
+				"received_date": frappe.utils.nowdate(),
+				"status": "Received",
+			}
+		).insert(ignore_permissions=True)
+		for j in range(tests_per_panel):
+			frappe.get_doc(
+				{
+					"doctype": "Lab Test Result",
+					"parenttype": "Sample",
+					"parentfield": "sample_test_results",
+					"parent": sample.name,
+					"lab_test": f"BENCH-TEST-{j}",
+					"status": "Pending",
+				}
+			).insert(ignore_permissions=True)
+
+
+def insert_bulk(samples):
+	accession_samples(
+		[{"sample_name": f"Bench {i}", "sample_type": "BENCH-ST", "panels": [PANEL]} for i in range(samples)]
+	)
+
+
+def run(samples=1000, tests_per_panel=10):
+	rows = []
+	try:
+		for method, insert in (
+			("per-document", lambda: insert_one_by_one(samples, tests_per_panel)),
+			("bulk", lambda: insert_bulk(samples)),
+		):
+			seed_panel(tests_per_panel)
+			with count_queries() as counter, timer() as elapsed:
+				insert()
+			rows.append(
+				{
+					"method": method,
+					"samples": samples,
+					"queries": counter["queries"],
+					"ms": elapsed["ms"],
+					"samples_per_sec": samples / (elapsed["ms"] / 1000) if elapsed["ms"] else 0.0,
+				}
+			)
+			frappe.db.rollback()
+		return report(f"Accessioning {samples} samples x {tests_per_panel} tests", rows)
+	finally:
+		frappe.db.rollback()
+		invalidate_catalog()
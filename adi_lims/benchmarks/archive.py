@@ -0,0 +1,82 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Archive benchmark: sample listing and status counts before and after archiving.
+
+Needs the archive tables (created by `bench migrate`). Everything runs in one
+rolled-back transaction, so the archived rows are only delete-marked in the
+live tables while the second round runs: the "live only" numbers understate
+the gain of a committed archive.
+
+	bench --site <site> execute adi_lims.benchmarks.archive.run \
+		--kwargs "{'samples': 100000, 'aged_ratio': 0.8}"
+"""
+
+import frappe
+
+from adi_lims.api import get_sample_stats, get_samples_for_listing
+from adi_lims.archive import archive_samples, archive_tables_exist
+from adi_lims.benchmarks import count_queries, report, timer
+from adi_lims.benchmarks.worklist import seed
+from adi_lims.dashboard import invalidate_dashboard_stats
+from adi_lims.listing import invalidate_listing_counts
+
+RESULTS_PER_SAMPLE = 5
+
+
+def measure(label, repeat):
+	"""Uncached listing (first page and a filtered page with exact count) and status counts."""
+	rows = []
+	steps = (
+		("listing", lambda: get_samples_for_listing(page_len=50)),
+		("listing Received", lambda: get_samples_for_listing(filters={"status": "Received"}, page_len=50)),
+		("sample stats", get_sample_stats),
+	)
+	for step, call in steps:
+		total_ms = queries = 0
+		for _i in range(repeat):
+			invalidate_listing_counts(frappe._dict(doctype="Sample"))
+			invalidate_dashboard_stats()
+			with count_queries() as counter, timer() as elapsed:
+				call()
+			total_ms += elapsed["ms"]
+			queries = counter["queries"]
+		rows.append({"tables": label, "step": step, "queries": queries, "avg_ms": total_ms / repeat})
+	return rows
+
+
+def run(samples=20000, aged_ratio=0.8, repeat=5):
+	"""Seed `samples`, age `aged_ratio` of them, time the reads, archive, time again; rolls back."""
+	if not archive_tables_exist():
+		frappe.throw("Archive tables are missing, run bench migrate first")
+	try:
+		seed(samples, RESULTS_PER_SAMPLE, statuses=("Disposed", "Analyzed", "Analyzed", "Received"))
+		aged = int(samples * aged_ratio)
+		frappe.db.sql(
+			"""
+			update `tabSample`
+			set modified = now() - interval 2 year, storage_location = null
+			where name like 'BENCH-S-%%' and status in ('Disposed', 'Analyzed')
+			order by name
+			limit %s
+			""",
+			aged,
+		)
+
+		rows = measure("live + aged", repeat)
+		with timer() as elapsed:
+			# archive_samples commits per chunk; keep everything in this transaction
+			frappe.db.commit = lambda *args, **kwargs: None
+			try:
+				archived = archive_samples(retention_days=365)
+			finally:
+				del frappe.db.commit
+		rows.append(
+			{"tables": "archiving", "step": f"{archived} samples", "queries": 0, "avg_ms": elapsed["ms"]}
+		)
+		rows.extend(measure("live only", repeat))
+		return report(f"Archive: {samples} samples x {RESULTS_PER_SAMPLE} results", rows)
+	finally:
+		frappe.db.rollback()
+		invalidate_listing_counts(frappe._dict(doctype="Sample"))
+		invalidate_dashboard_stats()
@@ -0,0 +1,65 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Bootstrap benchmark: the adilims page's opening calls one by one vs get_lims_bootstrap.
+
+bench --site <site> execute adi_lims.benchmarks.bootstrap.run --kwargs "{'samples': 5000}"
+"""
+
+import gzip
+
+import frappe
+
+from adi_lims import api
+from adi_lims.benchmarks import count_queries, report, timer
+from adi_lims.benchmarks.worklist import seed
+from adi_lims.bootstrap import get_bootstrap
+from adi_lims.dashboard import invalidate_dashboard_stats
+
+SEPARATE_CALLS = (
+	api.get_doctype_counts,
+	api.get_recent_activity,
+	api.get_sample_stats,
+	api.get_appointment_stats,
+	api.get_appointments,
+	api.get_phlebotomy_queue,
+	api.get_pending_reports,
+)
+
+
+def _payload_bytes(*results):
+	body = b"".join(frappe.as_json({"message": result}, indent=None).encode() for result in results)
+	return len(body), len(gzip.compress(body, compresslevel=6))
+
+
+def run(samples=5000, repeat=10):
+	"""Seed `samples` samples, time both ways with a cold stats cache; rolls back."""
+	try:
+		seed(samples, 1)
+		rows = []
+		for method in ("separate", "bootstrap"):
+			total_ms = queries = 0
+			for _i in range(repeat):
+				invalidate_dashboard_stats()
+				with count_queries() as counter, timer() as elapsed:
+					if method == "separate":
+						results = [call() for call in SEPARATE_CALLS]
+					else:
+						results = [get_bootstrap()]
+				total_ms += elapsed["ms"]
+				queries = counter["queries"]
+			raw, compressed = _payload_bytes(*results)
+			rows.append(
+				{
+					"method": method,
+					"round_trips": len(results),
+					"queries": queries,
+					"avg_ms": total_ms / repeat,
+					"bytes": raw,
+					"gzip_bytes": compressed,
+				}
+			)
+		return report(f"Bootstrap: {samples} samples", rows)
+	finally:
+		frappe.db.rollback()
+		invalidate_dashboard_stats()
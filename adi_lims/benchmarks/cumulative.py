@@ -0,0 +1,51 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Cumulative results benchmark: one patient's history cold, cached and caught up.
+
+bench --site <site> execute adi_lims.benchmarks.cumulative.run --kwargs "{'visits': 40, 'tests': 20}"
+"""
+
+import frappe
+
+from adi_lims.benchmarks import count_queries, report, timer
+from adi_lims.benchmarks.worklist import seed
+from adi_lims.cumulative import _entries, clear_cache, get_patient_cumulative
+
+YEARS = 10
+
+
+def run(visits=40, tests=20, repeat=20):
+	"""Seed `visits` samples of `tests` results spread over ten years for one patient; rolls back."""
+	try:
+		seed(visits, tests, patients=1, statuses=("Analyzed",))
+		frappe.db.sql(
+			f"""
+			update `tabLab Test Result`
+			set status = 'Completed', numeric_result_value = round(rand() * 100, 2),
+				completed_on = now() - interval (cast(substring(parent, 9) as unsigned) * {YEARS * 365} div {visits}) day
+			where name like 'BENCH-S-%%'
+			"""
+		)
+		patient = frappe.db.get_value("Sample", {"name": ("like", "BENCH-S-%")}, "patient")
+		key = (frappe.local.site, patient)
+
+		rows = []
+		for step in ("cold", "cached", "catch-up"):
+			total_ms = queries = 0
+			for _i in range(repeat):
+				if step == "cold":
+					clear_cache()
+				elif step == "catch-up":
+					# as if another worker had written one of the results
+					_entries[key][0].version = -1
+				with count_queries() as counter, timer() as elapsed:
+					history = get_patient_cumulative(patient)
+				total_ms += elapsed["ms"]
+				queries = counter["queries"]
+			points = sum(len(series["values"]) for series in history["tests"].values())
+			rows.append({"step": step, "points": points, "queries": queries, "avg_ms": total_ms / repeat})
+		return report(f"Cumulative: {visits} visits x {tests} tests over {YEARS} years", rows)
+	finally:
+		frappe.db.rollback()
+		clear_cache()
@@ -0,0 +1,53 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Flagging benchmark: results flagged per second, inline and in the nightly pass.
+
+bench --site <site> execute adi_lims.benchmarks.flagging.run --kwargs "{'results': 50000}"
+"""
+
+import frappe
+
+from adi_lims.benchmarks import count_queries, report, timer
+from adi_lims.benchmarks.result_entry import seed_lab_tests
+from adi_lims.benchmarks.worklist import seed
+from adi_lims.catalog import invalidate_catalog
+from adi_lims.flagging import flag_results
+
+RESULTS_PER_SAMPLE = 5
+
+
+def run(results=10000):
+	"""Seed `results` completed rows with values around their normal range, flag them and roll back."""
+	try:
+		seed_lab_tests(RESULTS_PER_SAMPLE)
+		seed(max(results // RESULTS_PER_SAMPLE, 1), RESULTS_PER_SAMPLE, statuses=("Analyzed",))
+		frappe.db.sql(
+			"""
+			update `tabLab Test Result`
+			set status = 'Completed', numeric_result_value = round(rand() * 30, 2),
+				result_value = numeric_result_value
+			where name like 'BENCH-S-%%'
+			"""
+		)
+		invalidate_catalog()
+		names = frappe.get_all("Lab Test Result", filters={"name": ("like", "BENCH-S-%")}, pluck="name")
+
+		rows = []
+		for label, delta_check in (("range + delta", True), ("range only", False)):
+			with count_queries() as counter, timer() as elapsed:
+				flags = flag_results(names, delta_check=delta_check)
+			rows.append(
+				{
+					"mode": label,
+					"results": len(names),
+					"abnormal": sum(flag != "Normal" for flag in flags.values()),
+					"queries": counter["queries"],
+					"ms": elapsed["ms"],
+					"rows_per_sec": len(names) / (elapsed["ms"] / 1000) if elapsed["ms"] else 0.0,
+				}
+			)
+		return report("Abnormal flagging", rows)
+	finally:
+		frappe.db.rollback()
+		invalidate_catalog()
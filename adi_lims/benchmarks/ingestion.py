@@ -0,0 +1,89 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Instrument file ingestion benchmark and fixture generator.
+
+	bench --site <site> execute adi_lims.benchmarks.ingestion.run \
+		--kwargs "{'samples': 200000, 'tests_per_sample': 10, 'fmt': 'astm'}"
+
+`generate_fixture` can also be used on its own to write multi-GB files; it
+streams records to disk and never holds the file in memory.
+"""
+
+import os
+import random
+import resource
+import tempfile
+
+from adi_lims.benchmarks import cleanup, report, timer
+from adi_lims.benchmarks.result_entry import seed_lab_tests
+from adi_lims.benchmarks.worklist import seed
+from adi_lims.catalog import invalidate_catalog
+from adi_lims.ingestion import ingest_file
+
+SEEDED_DOCTYPES = ("Lab Test Result", "Sample", "Patient", "Lab Test Normal Range", "Lab Test")
+
+
+def iter_fixture_lines(sample_names, test_codes, fmt):
+	if fmt == "csv":
+		yield "sample_id,test_code,result_value\n"
+	elif fmt == "astm":
+		yield "H|\\^&|||BENCH^1.0\n"
+
+	for i, sample in enumerate(sample_names):
+		values = [f"{random.uniform(1, 300):.2f}" for _code in test_codes]
+		if fmt == "csv":
+			for code, value in zip(test_codes, values, strict=True):
+				yield f"{sample},{code},{value}\n"
+		elif fmt == "astm":
+			yield f"P|{i + 1}\nO|1|{sample}||^^^ALL\n"
+			for j, (code, value) in enumerate(zip(test_codes, values, strict=True), start=1):
+				yield f"R|{j}|^^^{code}|{value}|g/dL||N||F\n"
+		else:
+			yield f"MSH|^~\\&|BENCH|LAB|||20250101000000||ORU^R01|{i}|P|2.5\rOBR|1||{sample}\r"
+			for j, (code, value) in enumerate(zip(test_codes, values, strict=True), start=1):
+				yield f"OBX|{j}|NM|{code}||{value}|g/dL|||||F\r"
+
+	if fmt == "astm":
+		yield "L|1|N\n"
+
+
+def generate_fixture(path, sample_names, test_codes, fmt="astm"):
+	"""Write an instrument export for the given samples and tests, streaming to disk."""
+	with open(path, "w", newline="") as f:
+		f.writelines(iter_fixture_lines(sample_names, test_codes, fmt))
+	return os.path.getsize(path)
+
+
+def run(samples=10000, tests_per_sample=10, fmt="astm", chunk_size=5000):
+	"""Seed pending results, ingest a generated file for them and clean up."""
+	path = os.path.join(tempfile.gettempdir(), f"adi_lims_bench.{fmt}")
+	try:
+		seed_lab_tests(tests_per_sample)
+		seed(samples, tests_per_sample, statuses=("In-Progress",))
+		invalidate_catalog()
+		sample_names = (f"BENCH-S-{i:08d}" for i in range(samples))
+		size = generate_fixture(path, sample_names, [f"BENCH-TEST-{j}" for j in range(tests_per_sample)], fmt)
+
+		with timer() as elapsed:
+			stats = ingest_file(path, fmt=fmt, chunk_size=chunk_size)
+
+		return report(
+			f"Ingestion ({fmt})",
+			[
+				{
+					"file_mb": size / 1024 / 1024,
+					"records": stats["records"],
+					"updated": stats["updated"],
+					"unmatched": stats["unmatched"],
+					"seconds": elapsed["ms"] / 1000,
+					"records_per_sec": stats["records"] / (elapsed["ms"] / 1000) if elapsed["ms"] else 0.0,
+					"peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+				}
+			],
+		)
+	finally:
+		cleanup(SEEDED_DOCTYPES)
+		invalidate_catalog()
+		if os.path.exists(path):
+			os.remove(path)
@@ -0,0 +1,37 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Label benchmark: ZPL and PDF labels per second, streamed to a local fake printer.
+
+bench --site <site> execute adi_lims.benchmarks.labels.run --kwargs "{'labels': 1000}"
+"""
+
+import frappe
+
+from adi_lims.benchmarks import count_queries, make_names, report, timer
+from adi_lims.benchmarks.worklist import seed
+from adi_lims.labels import FORMATS, ZPL, FakePrinter, SocketSink, get_label_rows, stream_labels
+
+RESULTS_PER_SAMPLE = 4
+
+
+def run(labels=1000):
+	"""Fetch the label data of `labels` seeded samples and print them in each format; rolls back."""
+	try:
+		seed(labels, RESULTS_PER_SAMPLE, statuses=("Received",))
+		names = make_names("BENCH-S-", labels)
+
+		rows = []
+		with FakePrinter() as printer:
+			for fmt in FORMATS:
+				with count_queries() as counter, timer() as elapsed:
+					label_rows = get_label_rows(from_sample=names[0], to_sample=names[-1])
+					result = stream_labels(label_rows, fmt, SocketSink(printer.address))
+				printer.wait_for(sum(row["bytes"] for row in rows) + result["bytes"])
+				result.update(queries=counter["queries"], total_ms=elapsed["ms"])
+				result["labels_per_sec"] = len(label_rows) / (elapsed["ms"] / 1000) if elapsed["ms"] else 0.0
+				rows.append(result)
+			rows[FORMATS.index(ZPL)]["printer_labels"] = printer.labels
+		return report(f"Labels: {labels} samples", rows)
+	finally:
+		frappe.db.rollback()
@@ -0,0 +1,69 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Listing benchmark: OFFSET pagination with a full count vs keyset cursors.
+
+	bench --site <site> execute adi_lims.benchmarks.listing.run \
+		--kwargs "{'samples': 200000, 'pages': [1, 5000]}"
+"""
+
+import frappe
+
+from adi_lims.benchmarks import count_queries, report, timer
+from adi_lims.benchmarks.worklist import seed
+from adi_lims.listing import encode_cursor, get_listing, invalidate_listing_counts
+
+SAMPLE = frappe._dict(doctype="Sample")
+FIELDS = ["name", "sample_name", "sample_type", "collection_date", "received_date", "status"]
+
+
+def offset_page(page, page_len):
+	"""The listing as it was before keyset pagination."""
+	data = frappe.get_list(
+		"Sample", fields=FIELDS, start=(page - 1) * page_len, page_length=page_len, order_by="creation desc"
+	)
+	return {"data": data, "total_count": frappe.db.count("Sample")}
+
+
+def cursor_for_page(page, page_len):
+	"""Cursor a client would hold after walking to `page` (computed outside the timings)."""
+	if page <= 1:
+		return None
+	row = frappe.get_all(
+		"Sample",
+		fields=["creation", "name"],
+		order_by="creation desc, name desc",
+		start=(page - 1) * page_len - 1,
+		page_length=1,
+	)
+	return encode_cursor(row[0].creation, row[0].name) if row else None
+
+
+def run(samples=100000, page_len=20, pages=(1, 5000), count="exact"):
+	try:
+		seed(samples, 0)
+		rows = []
+		for page in pages:
+			with count_queries() as counter, timer() as elapsed:
+				offset_page(page, page_len)
+			rows.append(
+				{"method": "offset", "page": page, "queries": counter["queries"], "ms": elapsed["ms"]}
+			)
+
+			cursor = cursor_for_page(page, page_len)
+			invalidate_listing_counts(SAMPLE)
+			for attempt in ("cold", "warm"):
+				with count_queries() as counter, timer() as elapsed:
+					get_listing("Sample", FIELDS, cursor=cursor, page_len=page_len, count=count)
+				rows.append(
+					{
+						"method": f"keyset/{attempt}",
+						"page": page,
+						"queries": counter["queries"],
+						"ms": elapsed["ms"],
+					}
+				)
+		return report(f"Sample listing: {samples} rows, page_len {page_len}", rows)
+	finally:
+		frappe.db.rollback()
+		invalidate_listing_counts(SAMPLE)
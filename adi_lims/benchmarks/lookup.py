@@ -0,0 +1,45 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Lookup benchmark: patient rows for a page of samples, cold, from the LRU and from the request memo.
+
+bench --site <site> execute adi_lims.benchmarks.lookup.run --kwargs "{'samples': 200, 'patients': 20}"
+"""
+
+import frappe
+
+from adi_lims.benchmarks import count_queries, report, timer
+from adi_lims.benchmarks.worklist import seed
+from adi_lims.lookup import _lru, get_many
+
+FIELDS = ["first_name", "last_name", "gender", "dob"]
+
+
+def run(samples=200, patients=20, repeat=100):
+	"""Resolve the patients of `samples` samples `repeat` times per layer; rolls back."""
+	try:
+		seed(samples, 0, patients=patients)
+		names = frappe.get_all("Sample", filters={"name": ("like", "BENCH-S-%")}, pluck="patient")
+
+		rows = []
+		for layer in ("database", "lru", "memo"):
+			with count_queries() as counter, timer() as elapsed:
+				for _i in range(repeat):
+					if layer == "database":
+						_lru.clear()
+					if layer != "memo":
+						frappe.local.adi_lims_lookup = {}
+					get_many("Patient", names, FIELDS)
+			rows.append(
+				{
+					"layer": layer,
+					"lookups": repeat,
+					"queries": counter["queries"],
+					"avg_ms": elapsed["ms"] / repeat,
+				}
+			)
+		return report(f"Lookup: {samples} samples, {patients} patients", rows)
+	finally:
+		frappe.db.rollback()
+		frappe.local.adi_lims_lookup = {}
+		_lru.clear()
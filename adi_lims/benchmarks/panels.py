@@ -0,0 +1,41 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Panel expansion benchmark: catalog queries for ordering a panel, cold vs warm.
+
+	bench --site <site> execute adi_lims.benchmarks.panels.run \
+		--kwargs "{'samples': 500, 'tests_per_panel': 30}"
+"""
+
+import frappe
+
+from adi_lims.benchmarks import count_queries, report, timer
+from adi_lims.benchmarks.accessioning import PANEL, seed_panel
+from adi_lims.catalog import invalidate_catalog
+from adi_lims.panels import PANEL_MAP_KEY, get_panel_tests, rebuild_panels
+
+
+def expand(samples):
+	"""Expand the panel once per ordered sample, as an order-entry screen would."""
+	for _i in range(samples):
+		get_panel_tests([PANEL])
+
+
+def run(samples=500, tests_per_panel=30):
+	rows = []
+	try:
+		seed_panel(tests_per_panel)
+		# bump the map version so worker LRUs are cold, then drop the Redis entry too
+		rebuild_panels([PANEL])
+		frappe.cache().hdel(PANEL_MAP_KEY, PANEL)
+		for attempt in ("cold", "warm"):
+			with count_queries() as counter, timer() as elapsed:
+				expand(samples)
+			rows.append(
+				{"attempt": attempt, "samples": samples, "queries": counter["queries"], "ms": elapsed["ms"]}
+			)
+		return report(f"Panel expansion: {tests_per_panel}-test panel x {samples} samples", rows)
+	finally:
+		frappe.db.rollback()
+		frappe.cache().hdel(PANEL_MAP_KEY, PANEL)
+		invalidate_catalog()
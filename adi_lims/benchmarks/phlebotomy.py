@@ -0,0 +1,101 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Route planning benchmark on a synthetic day of home collections.
+
+	bench --site <site> execute adi_lims.benchmarks.phlebotomy.run \
+		--kwargs "{'appointments': 5000, 'assistants': 60}"
+"""
+
+import random
+
+import frappe
+
+from adi_lims.benchmarks import count_queries, make_names, report, seed_rows, timer
+from adi_lims.phlebotomy import (
+	HOME_COLLECTION,
+	SCHEDULED,
+	SLOT_INDEX_KEY,
+	get_slot_availability,
+	is_slot_available,
+	plan_routes,
+)
+
+CITIES = {"Bengaluru": (12.97, 77.59), "Mysuru": (12.30, 76.64), "Chennai": (13.08, 80.27)}
+
+
+def seed(appointments, date, with_coordinates=0.7):
+	"""Scatter appointments over a few cities and pincodes, most with coordinates."""
+	rows = []
+	for name in make_names("BENCH-APP-", appointments):
+		city = random.choice(list(CITIES))
+		lat, lon = CITIES[city]
+		pincode = f"5600{random.randint(1, 99):02d}"
+		has_coordinates = random.random() < with_coordinates
+		rows.append(
+			(
+				name,
+				city,
+				pincode,
+				date,
+				f"{random.randint(7, 17):02d}:{random.choice((0, 30)):02d}:00",
+				HOME_COLLECTION,
+				SCHEDULED,
+				lat + random.uniform(-0.1, 0.1) if has_coordinates else 0,
+				lon + random.uniform(-0.1, 0.1) if has_coordinates else 0,
+			)
+		)
+	seed_rows(
+		"Collection Appointment",
+		[
+			"name",
+			"city",
+			"pincode",
+			"appointment_date",
+			"appointment_time",
+			"collection_type",
+			"status",
+			"latitude",
+			"longitude",
+		],
+		rows,
+	)
+
+
+def run(appointments=5000, assistants=50, date="2099-01-01"):
+	"""Plan routes for `appointments`, check slot availability, and roll back."""
+	try:
+		seed(appointments, date)
+		users = [f"bench-phlebotomist-{i}@example.com" for i in range(assistants)]
+
+		rows = []
+		with count_queries() as counter, timer() as elapsed:
+			plan = plan_routes(date, users, commit=False)
+		late = sum(route["late"] for route in plan["routes"].values())
+		rows.append(
+			{
+				"step": "plan",
+				"appointments": plan["appointments"],
+				"late": late,
+				"queries": counter["queries"],
+				"ms": elapsed["ms"],
+			}
+		)
+
+		get_slot_availability(date)  # build the slot index
+		with count_queries() as counter, timer() as elapsed:
+			for _i in range(1000):
+				is_slot_available(date, "10:30:00")
+		rows.append(
+			{
+				"step": "1000 slot checks",
+				"appointments": appointments,
+				"late": 0,
+				"queries": counter["queries"],
+				"ms": elapsed["ms"],
+			}
+		)
+		return report("Phlebotomy routing", rows)
+	finally:
+		frappe.db.rollback()
+		frappe.cache().delete_value(SLOT_INDEX_KEY.format(date))
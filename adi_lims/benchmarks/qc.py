@@ -0,0 +1,63 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""QC benchmark: recording control points in batches through the Westgard engine.
+
+bench --site <site> execute adi_lims.benchmarks.qc.run --kwargs "{'points': 20000, 'series': 50}"
+"""
+
+import random
+
+import frappe
+
+from adi_lims import qc
+from adi_lims.benchmarks import count_queries, report, timer
+
+LEVELS = ("Low", "Normal", "High")
+
+
+def _points(count, series, batch_index, rng):
+	points = []
+	for i in range(count):
+		s = (batch_index * count + i) % series
+		points.append(
+			{
+				"lab_test": f"BENCH-QC-T{s // len(LEVELS):04d}",
+				"instrument": "BENCH-QC-I1",
+				"control_level": LEVELS[s % len(LEVELS)],
+				"qc_run": f"BENCH-QC-R{batch_index:06d}",
+				"value": rng.gauss(100, 5),
+			}
+		)
+	return points
+
+
+def run(points=20000, series=50, batch_size=2000):
+	"""Record `points` control points over `series` series, `batch_size` per call; rolls back."""
+	rng = random.Random(0)
+	try:
+		qc.setup_qc_tables()
+		rows = []
+		batches = max(points // batch_size, 1)
+		total_ms = queries = rejected_runs = 0
+		for batch_index in range(batches):
+			batch = _points(batch_size, series, batch_index, rng)
+			with count_queries() as counter, timer() as elapsed:
+				response = qc.record_control_results(batch)
+			total_ms += elapsed["ms"]
+			queries += counter["queries"]
+			rejected_runs += len(response["rejected_runs"])
+		recorded = batches * batch_size
+		rows.append(
+			{
+				"points": recorded,
+				"batches": batches,
+				"queries/batch": queries / batches,
+				"avg_batch_ms": total_ms / batches,
+				"points/sec": recorded / (total_ms / 1000) if total_ms else 0.0,
+				"rejected_runs": rejected_runs,
+			}
+		)
+		return report(f"QC: {recorded} control points over {series} series", rows)
+	finally:
+		frappe.db.rollback()
@@ -0,0 +1,45 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Report benchmark: PDFs per second cold, and from the rendered-report cache.
+
+bench --site <site> execute adi_lims.benchmarks.reports.run --kwargs "{'samples': 200}"
+"""
+
+import os
+
+import frappe
+
+from adi_lims.benchmarks import count_queries, report, timer
+from adi_lims.benchmarks.worklist import seed
+from adi_lims.reports import render_samples
+
+RESULTS_PER_SAMPLE = 8
+
+
+def run(samples=100):
+	"""Render the reports of `samples` seeded samples twice, then remove the files and roll back."""
+	paths = {}
+	try:
+		seed(samples, RESULTS_PER_SAMPLE, statuses=("Analyzed",))
+		names = frappe.get_all("Sample", filters={"name": ("like", "BENCH-S-%")}, pluck="name")
+
+		rows = []
+		for label in ("cold", "cached"):
+			with count_queries() as counter, timer() as elapsed:
+				paths = render_samples(names)
+			rows.append(
+				{
+					"run": label,
+					"reports": len(paths),
+					"queries": counter["queries"],
+					"ms": elapsed["ms"],
+					"reports_per_sec": len(paths) / (elapsed["ms"] / 1000) if elapsed["ms"] else 0.0,
+				}
+			)
+		return report("Sample reports", rows)
+	finally:
+		frappe.db.rollback()
+		for path in paths.values():
+			if os.path.exists(path):
+				os.remove(path)
@@ -0,0 +1,81 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Result entry benchmark: query count must not grow with the page size.
+
+	bench --site <site> execute adi_lims.benchmarks.result_entry.run \
+		--kwargs "{'page_sizes': [20, 200]}"
+"""
+
+import frappe
+
+from adi_lims.api import get_samples_for_result_entry
+from adi_lims.benchmarks import count_queries, report, seed_rows, timer
+from adi_lims.benchmarks.worklist import seed
+from adi_lims.catalog import invalidate_catalog
+
+GENDERS = ("Male", "Female", "Both")
+
+
+def seed_lab_tests(count):
+	seed_rows(
+		"Lab Test",
+		["name", "test_name", "department"],
+		[(f"BENCH-TEST-{i}", f"BENCH-TEST-{i}", "Hematology") for i in range(count)],
+	)
+	seed_rows(
+		"Lab Test Normal Range",
+		[
+			"name",
+			"parent",
+			"parenttype",
+			"parentfield",
+			"idx",
+			"gender",
+			"age_group",
+			"min_value",
+			"max_value",
+			"unit",
+		],
+		[
+			(
+				f"BENCH-TEST-{i}-{j}",
+				f"BENCH-TEST-{i}",
+				"Lab Test",
+				"normal_ranges",
+				j + 1,
+				gender,
+				"Adult",
+				10 + j,
+				20 + j,
+				"g/dL",
+			)
+			for i in range(count)
+			for j, gender in enumerate(GENDERS)
+		],
+	)
+
+
+def run(page_sizes=(20, 200), results_per_sample=5):
+	try:
+		seed_lab_tests(results_per_sample)
+		seed(max(page_sizes), results_per_sample, statuses=("In-Progress",))
+		invalidate_catalog()
+		get_samples_for_result_entry(page_len=1)  # warm the catalog
+
+		rows = []
+		for page_len in page_sizes:
+			with count_queries() as counter, timer() as elapsed:
+				samples = get_samples_for_result_entry(page_len=page_len)
+			rows.append(
+				{
+					"page_len": page_len,
+					"samples": len(samples),
+					"queries": counter["queries"],
+					"ms": elapsed["ms"],
+				}
+			)
+		return report("Result entry", rows)
+	finally:
+		frappe.db.rollback()
+		invalidate_catalog()
@@ -0,0 +1,49 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Bulk result entry benchmark: results saved per second for one analyzer run.
+
+bench --site <site> execute adi_lims.benchmarks.results.run --kwargs "{'results': 20000}"
+"""
+
+import random
+
+import frappe
+
+from adi_lims.benchmarks import count_queries, report, timer
+from adi_lims.benchmarks.worklist import seed
+from adi_lims.results import bulk_update_results
+
+RESULTS_PER_SAMPLE = 10
+
+
+def run(results=10000, text_ratio=0.05):
+	"""Seed `results` pending rows, save them all in one batch and roll back."""
+	try:
+		seed(max(results // RESULTS_PER_SAMPLE, 1), RESULTS_PER_SAMPLE, statuses=("In-Progress",))
+		names = frappe.get_all("Lab Test Result", filters={"name": ("like", "BENCH-S-%")}, pluck="name")[
+			:results
+		]
+		payload = [
+			(name, "Positive" if random.random() < text_ratio else f"{random.uniform(1, 300):.2f}")
+			for name in names
+		]
+
+		with count_queries() as counter, timer() as elapsed:
+			response = bulk_update_results(payload)
+
+		return report(
+			"Bulk result entry",
+			[
+				{
+					"results": len(payload),
+					"updated": response["updated"],
+					"errors": len(response["errors"]),
+					"queries": counter["queries"],
+					"ms": elapsed["ms"],
+					"rows_per_sec": len(payload) / (elapsed["ms"] / 1000) if elapsed["ms"] else 0.0,
+				}
+			],
+		)
+	finally:
+		frappe.db.rollback()
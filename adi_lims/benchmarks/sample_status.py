@@ -0,0 +1,138 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Sample status stress test: many workers moving overlapping batches at once.
+
+Each worker thread opens its own connection and repeatedly moves a random
+batch of a shared pool of samples to a random status, committing each batch.
+Afterwards every sample's winning moves must chain from its seeded status to
+its final one, with no status left twice (two workers winning the same move).
+
+	bench --site <site> execute adi_lims.benchmarks.sample_status.run \
+		--kwargs "{'samples': 2000, 'workers': 16}"
+
+The workers commit, so the seeded rows are deleted at the end instead of
+rolled back.
+"""
+
+import random
+import threading
+
+import frappe
+
+from adi_lims import sample_status
+from adi_lims.benchmarks import cleanup, report, timer
+from adi_lims.benchmarks.worklist import seed
+
+INITIAL_STATUS = "Received"
+
+
+def _worker(site, sites_path, user, names, batches, batch_size, seed_value, stats):
+	frappe.init(site=site, sites_path=sites_path)
+	frappe.connect()
+	frappe.set_user(user)
+	rng = random.Random(seed_value)
+	try:
+		for _i in range(batches):
+			status = rng.choice(list(sample_status.TRANSITIONS))
+			batch = rng.sample(names, batch_size)
+			try:
+				response = sample_status.transition_samples(status, samples=batch)
+				frappe.db.commit()
+			except Exception:
+				frappe.db.rollback()
+				stats["errors"] += 1
+				continue
+			for outcome in ("transitioned", "conflicts", "invalid", "unchanged"):
+				stats[outcome] += len(response[outcome])
+	finally:
+		frappe.destroy()
+
+
+def _check(names, moves):
+	"""Names whose recorded moves do not form one chain from INITIAL_STATUS to their final status."""
+	by_sample = {}
+	for name, from_status, to_status in moves:
+		by_sample.setdefault(name, []).append((from_status, to_status))
+	final = dict(
+		frappe.get_all("Sample", filters={"name": ("in", names)}, fields=["name", "status"], as_list=True)
+	)
+
+	broken = []
+	for name in names:
+		steps = by_sample.get(name, [])
+		following = dict(steps)
+		if len(following) != len(steps):
+			# the same status was left twice: two workers won the same move
+			broken.append(name)
+			continue
+		status, seen = INITIAL_STATUS, 0
+		while status in following:
+			status, seen = following[status], seen + 1
+		if status != final.get(name) or seen != len(steps):
+			broken.append(name)
+	return broken
+
+
+def run(samples=1000, workers=8, batches=50, batch_size=50):
+	"""Seed and commit `samples` Received samples, let `workers` threads race over them, then delete them."""
+	moves, lock = [], threading.Lock()
+	original = sample_status.after_transition
+
+	def record(status, rows, timestamp):
+		def keep():
+			with lock:
+				moves.extend((row.name, row.status, status) for row in rows)
+
+		# only moves that the worker's commit made durable count
+		frappe.db.after_commit.add(keep)
+		return original(status, rows, timestamp)
+
+	try:
+		seed(samples, 1, statuses=(INITIAL_STATUS,))
+		frappe.db.commit()
+		names = frappe.get_all("Sample", filters={"name": ("like", "BENCH-S-%")}, pluck="name")
+
+		sample_status.after_transition = record
+		stats = [
+			frappe._dict(transitioned=0, conflicts=0, invalid=0, unchanged=0, errors=0)
+			for _i in range(workers)
+		]
+		threads = [
+			threading.Thread(
+				target=_worker,
+				args=(
+					frappe.local.site,
+					frappe.local.sites_path,
+					frappe.session.user,
+					names,
+					batches,
+					min(batch_size, len(names)),
+					i,
+					stats[i],
+				),
+			)
+			for i in range(workers)
+		]
+		with timer() as elapsed:
+			for thread in threads:
+				thread.start()
+			for thread in threads:
+				thread.join()
+
+		totals = {key: sum(stat[key] for stat in stats) for key in stats[0]}
+		broken = _check(names, moves)
+		return report(
+			f"Sample status: {workers} workers x {batches} batches of {batch_size} over {samples} samples",
+			[
+				{
+					**totals,
+					"moves/sec": totals["transitioned"] / (elapsed["ms"] / 1000) if elapsed["ms"] else 0.0,
+					"total_ms": elapsed["ms"],
+					"broken": len(broken),
+				}
+			],
+		)
+	finally:
+		sample_status.after_transition = original
+		cleanup(["Lab Test Result", "Sample", "Patient"])
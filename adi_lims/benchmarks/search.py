@@ -0,0 +1,50 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Search benchmark: index build rate and query latency for typical front desk searches.
+
+bench --site <site> execute adi_lims.benchmarks.search.run --kwargs "{'patients': 100000}"
+"""
+
+import frappe
+
+from adi_lims.benchmarks import count_queries, make_names, report, seed_rows, timer
+from adi_lims.search import index_rows, search, setup_search_table
+
+FIRST_NAMES = ("Asha", "Ravi", "Meera", "Arjun", "Fatima", "John", "Priya", "Sanjay")
+LAST_NAMES = ("Sharma", "Iyer", "Khan", "Das", "Patel", "Reddy", "Nair", "Singh")
+
+
+def run(patients=20000, queries=("sha", "asha sharma", "9876500", "bench pat 00000123", "pat-0000012")):
+	"""Seed and index `patients`, time each query and roll back."""
+	setup_search_table()
+	frappe.db.commit()
+	try:
+		names = make_names("BENCH-PAT-", patients)
+		rows = [
+			{
+				"name": name,
+				"first_name": FIRST_NAMES[i % len(FIRST_NAMES)],
+				"last_name": LAST_NAMES[(i // len(FIRST_NAMES)) % len(LAST_NAMES)],
+				"mobile_no": f"98765{i:05d}",
+			}
+			for i, name in enumerate(names)
+		]
+		seed_rows("Patient", list(rows[0]), [tuple(row.values()) for row in rows])
+
+		results = []
+		with count_queries() as counter, timer() as elapsed:
+			index_rows("Patient", rows)
+		results.append(
+			{"query": "(index)", "hits": patients, "queries": counter["queries"], "ms": elapsed["ms"]}
+		)
+
+		for query in queries:
+			with count_queries() as counter, timer() as elapsed:
+				hits = search(query, doctypes=["Patient"])
+			results.append(
+				{"query": query, "hits": len(hits), "queries": counter["queries"], "ms": elapsed["ms"]}
+			)
+		return report(f"Search: {patients} patients", results)
+	finally:
+		frappe.db.rollback()
@@ -0,0 +1,102 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Storage benchmark: subtree occupancy and bulk allocation on a seeded freezer tree.
+
+	bench --site <site> execute adi_lims.benchmarks.storage.run \
+		--kwargs "{'freezers': 20, 'racks': 10, 'boxes': 20, 'samples': 960}"
+"""
+
+import frappe
+
+from adi_lims.benchmarks import count_queries, report, seed_rows, timer
+from adi_lims.benchmarks.worklist import seed
+from adi_lims.storage import allocate_samples, get_subtree_occupancy
+
+BOX_CAPACITY = 81
+
+
+def seed_tree(freezers, racks, boxes):
+	"""Seed BENCH- freezers, racks and boxes with lft/rgt set as a nested set would."""
+	rows, counter = [], [0]
+
+	def add(name, parent, location_type, capacity, children):
+		counter[0] += 1
+		lft = counter[0]
+		for child in children:
+			add(*child)
+		counter[0] += 1
+		rows.append((name, name, parent, location_type, capacity, 0, lft, counter[0]))
+
+	for f in range(freezers):
+		freezer = f"BENCH-F{f:03d}"
+		add(
+			freezer,
+			None,
+			"Freezer",
+			0,
+			[
+				(
+					f"{freezer}-R{r:02d}",
+					freezer,
+					"Rack",
+					0,
+					[
+						(f"{freezer}-R{r:02d}-B{b:02d}", f"{freezer}-R{r:02d}", "Box", BOX_CAPACITY, [])
+						for b in range(boxes)
+					],
+				)
+				for r in range(racks)
+			],
+		)
+	seed_rows(
+		"Storage Location",
+		[
+			"name",
+			"location_name",
+			"parent_location",
+			"location_type",
+			"capacity",
+			"current_occupancy",
+			"lft",
+			"rgt",
+		],
+		rows,
+	)
+
+
+def run(freezers=10, racks=10, boxes=20, samples=960):
+	"""Allocate `samples` into one freezer, then read its occupancy; rolls back."""
+	try:
+		seed_tree(freezers, racks, boxes)
+		seed(samples, 0, statuses=("Received",))
+		names = frappe.get_all(
+			"Sample", filters={"name": ("like", "BENCH-S-%")}, pluck="name", order_by="name"
+		)
+		freezer = f"BENCH-F{freezers // 2:03d}"
+
+		rows = []
+		with count_queries() as counter, timer() as elapsed:
+			allocation = allocate_samples(names, location=freezer, near=f"{freezer}-R00-B00")
+		rows.append(
+			{
+				"step": "allocate",
+				"samples": len(allocation),
+				"queries": counter["queries"],
+				"ms": elapsed["ms"],
+			}
+		)
+
+		with count_queries() as counter, timer() as elapsed:
+			occupancy = get_subtree_occupancy(freezer)
+		rows.append(
+			{
+				"step": "occupancy",
+				"samples": occupancy["occupancy"],
+				"queries": counter["queries"],
+				"ms": elapsed["ms"],
+			}
+		)
+		return report(f"Storage: {freezers * racks * boxes} boxes", rows)
+	finally:
+		frappe.db.rollback()
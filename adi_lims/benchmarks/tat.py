@@ -0,0 +1,64 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""TAT benchmark: rollup build rate and percentile query time.
+
+bench --site <site> execute adi_lims.benchmarks.tat.run --kwargs "{'samples': 20000, 'days': 30}"
+"""
+
+import frappe
+from frappe.utils import add_days, getdate
+
+from adi_lims.benchmarks import count_queries, report, timer
+from adi_lims.benchmarks.result_entry import seed_lab_tests
+from adi_lims.benchmarks.worklist import seed
+from adi_lims.catalog import invalidate_catalog
+from adi_lims.tat import TOTAL, get_tat_percentiles, rebuild_buckets
+
+RESULTS_PER_SAMPLE = 5
+
+
+def run(samples=10000, days=30):
+	"""Spread completed and verified results over `days`, roll them up, query, and roll back."""
+	try:
+		seed_lab_tests(RESULTS_PER_SAMPLE)
+		seed(samples, RESULTS_PER_SAMPLE, statuses=("Analyzed",))
+		invalidate_catalog()
+		start = getdate(add_days(getdate(), -days))
+		frappe.db.sql(
+			"""
+			update `tabSample`
+			set collection_date = date_sub(curdate(), interval floor(rand() * %s) day)
+			where name like 'BENCH-S-%%'
+			""",
+			days,
+		)
+		frappe.db.sql("update `tabSample` set received_date = collection_date where name like 'BENCH-S-%%'")
+		frappe.db.sql(
+			"""
+			update `tabLab Test Result` r
+			inner join `tabSample` s on s.name = r.parent
+			set r.status = 'Verified',
+				r.completed_on = timestampadd(minute, floor(60 + rand() * 1440), s.received_date),
+				r.verified_on = timestampadd(minute, floor(15 + rand() * 240), r.completed_on)
+			where r.name like 'BENCH-S-%%'
+			"""
+		)
+		results = samples * RESULTS_PER_SAMPLE
+
+		rows = []
+		with count_queries() as counter, timer() as elapsed:
+			rollup_rows = rebuild_buckets(start, add_days(getdate(), 2))
+		rows.append(
+			{"step": "rollup", "rows": rollup_rows, "queries": counter["queries"], "ms": elapsed["ms"]}
+		)
+
+		with count_queries() as counter, timer() as elapsed:
+			get_tat_percentiles(start, getdate(), stage=TOTAL, group_by="department")
+		rows.append(
+			{"step": "percentiles", "rows": results, "queries": counter["queries"], "ms": elapsed["ms"]}
+		)
+		return report(f"TAT: {results} results over {days} days", rows)
+	finally:
+		frappe.db.rollback()
+		invalidate_catalog()
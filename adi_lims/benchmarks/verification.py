@@ -0,0 +1,51 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Verification benchmark: claim the queue in batches and verify each batch.
+
+	bench --site <site> execute adi_lims.benchmarks.verification.run \
+		--kwargs "{'results': 20000, 'batch_size': 200}"
+"""
+
+import frappe
+
+from adi_lims.benchmarks import count_queries, report, timer
+from adi_lims.benchmarks.worklist import seed
+from adi_lims.verification import claim_next_batch, verify_batch
+
+RESULTS_PER_SAMPLE = 5
+
+
+def run(results=5000, batch_size=100, batches=10):
+	"""Seed `results` completed rows, claim and verify `batches` batches and roll back."""
+	try:
+		seed(max(results // RESULTS_PER_SAMPLE, 1), RESULTS_PER_SAMPLE, statuses=("Analyzed",))
+		frappe.db.sql(
+			"""
+			update `tabLab Test Result`
+			set status = 'Completed', verification_status = 'Pending', completed_on = now()
+			where name like 'BENCH-S-%%'
+			"""
+		)
+
+		rows = []
+		for batch in range(1, batches + 1):
+			with count_queries() as claim_counter, timer() as claim_elapsed:
+				claimed = claim_next_batch(limit=batch_size)
+			if not claimed:
+				break
+			with count_queries() as verify_counter, timer() as verify_elapsed:
+				response = verify_batch([row.name for row in claimed])
+			rows.append(
+				{
+					"batch": batch,
+					"results": len(response["processed"]),
+					"claim_queries": claim_counter["queries"],
+					"claim_ms": claim_elapsed["ms"],
+					"verify_queries": verify_counter["queries"],
+					"verify_ms": verify_elapsed["ms"],
+				}
+			)
+		return report(f"Verification: batches of {batch_size}", rows)
+	finally:
+		frappe.db.rollback()
@@ -0,0 +1,77 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Worklist benchmark: seeds N samples x M results and walks the worklist pages.
+
+	bench --site <site> execute adi_lims.benchmarks.worklist.run \
+		--kwargs "{'samples': 40000, 'results_per_sample': 5, 'pages': 10}"
+"""
+
+import frappe
+
+from adi_lims.benchmarks import count_queries, make_names, report, seed_rows, timer
+from adi_lims.worklist import get_worklist_page
+
+STATUSES = ("Received", "In-Progress", "Analyzed", "Rejected")
+
+
+def seed(samples, results_per_sample, patients=None, statuses=STATUSES):
+	patients = patients or max(samples // 10, 1)
+	patient_names = make_names("BENCH-PAT-", patients)
+	if frappe.db.table_exists("Patient"):
+		seed_rows(
+			"Patient",
+			["name", "first_name", "last_name"],
+			[(name, "Bench", name[-6:]) for name in patient_names],
+		)
+
+	sample_names = make_names("BENCH-S-", samples)
+	seed_rows(
+		"Sample",
+		["name", "sample_name", "sample_type", "collection_date", "received_date", "patient", "status"],
+		[
+			(
+				name,
+				name,
+				"Blood",
+				frappe.utils.nowdate(),
+				frappe.utils.nowdate(),
+				patient_names[i % patients],
+				statuses[i % len(statuses)],
+			)
+			for i, name in enumerate(sample_names)
+		],
+	)
+	seed_rows(
+		"Lab Test Result",
+		["name", "parent", "parenttype", "parentfield", "idx", "lab_test", "status"],
+		[
+			(f"{sample}-{j}", sample, "Sample", "sample_test_results", j + 1, f"BENCH-TEST-{j}", "Pending")
+			for sample in sample_names
+			for j in range(results_per_sample)
+		],
+	)
+
+
+def run(samples=1000, results_per_sample=5, page_len=50, pages=5, status="All"):
+	"""Seed data, fetch `pages` consecutive worklist pages and roll everything back."""
+	try:
+		seed(samples, results_per_sample)
+		rows, cursor = [], None
+		for page in range(1, pages + 1):
+			with count_queries() as counter, timer() as elapsed:
+				result = get_worklist_page(status=status, cursor=cursor, page_len=page_len)
+			rows.append(
+				{
+					"page": page,
+					"rows": len(result["data"]),
+					"queries": counter["queries"],
+					"ms": elapsed["ms"],
+				}
+			)
+			cursor = result["next_cursor"]
+			if not cursor:
+				break
+		return report(f"Worklist: {samples} samples x {results_per_sample} results", rows)
+	finally:
+		frappe.db.rollback()
@@ -0,0 +1,187 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Everything the adilims page shows on open, in one response.
+
+`get_bootstrap` composes the dashboard's initial data so the page needs one
+round trip instead of one per widget:
+
+- the Sample status and Collection Appointment counts, from the shared
+  (cached) dashboard stats that the count and stats endpoints also read;
+- the upcoming schedule and the phlebotomy queue, from one UNION over the
+  same permission-checked Collection Appointment query;
+- recent sample activity and the reports waiting to be printed.
+
+Each section is read on its own: one that fails (a missing doctype, no
+permission) is logged and left out of the payload, and the page loads it
+from its own endpoint instead, so one widget cannot blank the others.
+
+`bootstrap_response` serves it as JSON with an ETag derived from the
+content, gzipped when the client accepts it. A GET carrying a matching
+If-None-Match gets an empty 304, so an unchanged dashboard only costs the
+queries, not the transfer.
+"""
+
+import gzip
+import hashlib
+
+import frappe
+from frappe.utils import add_days, now_datetime
+from werkzeug.wrappers import Response
+
+from adi_lims.dashboard import get_dashboard_stats
+from adi_lims.listing import get_permission_condition
+from adi_lims.lookup import get_many
+
+LIST_LIMIT = 20
+# a report stays on the "ready to print" list for this long after its last verification
+PENDING_REPORT_DAYS = 7
+MIN_COMPRESS_BYTES = 1024
+
+APPOINTMENT_FIELDS = [
+	"name",
+	"patient_name",
+	"patient",
+	"appointment_date",
+	"appointment_time",
+	"status",
+	"collection_type",
+]
+APPOINTMENT_ORDER = "appointment_date asc, appointment_time asc"
+APPOINTMENT_FILTERS = {
+	"appointments": {"status": ["!=", "Cancelled"]},
+	"phlebotomy_queue": {"status": "Scheduled"},
+}
+
+
+def get_appointment_list(section, run=1):
+	"""The upcoming schedule or the phlebotomy queue (or, with run=0, its SQL)."""
+	return frappe.get_list(
+		"Collection Appointment",
+		fields=APPOINTMENT_FIELDS,
+		filters=APPOINTMENT_FILTERS[section],
+		limit=LIST_LIMIT,
+		order_by=APPOINTMENT_ORDER,
+		run=run,
+	)
+
+
+def get_appointment_lists():
+	"""Both appointment lists in one statement."""
+	if not frappe.db.exists("DocType", "Collection Appointment"):
+		return {section: [] for section in APPOINTMENT_FILTERS}
+
+	lists = {section: [] for section in APPOINTMENT_FILTERS}
+	union = " union all ".join(
+		f"select {frappe.db.escape(section)} as section, t.* from ({get_appointment_list(section, run=0)}) t"
+		for section in APPOINTMENT_FILTERS
+	)
+	# the order inside the derived tables does not survive the union
+	rows = frappe.db.sql(
+		f"select * from ({union}) lists order by section, appointment_date, appointment_time",
+		as_dict=True,
+	)
+	for row in rows:
+		lists[row.pop("section")].append(row)
+	return lists
+
+
+def get_recent_activity():
+	return frappe.get_list(
+		"Sample",
+		fields=["name", "sample_name", "status", "modified"],
+		limit=5,
+		order_by="modified desc",
+	)
+
+
+def get_pending_reports():
+	"""Samples whose results are all verified, latest verification first: the reports ready to print.
+
+	Only samples with a result verified in the last PENDING_REPORT_DAYS are
+	considered, so the query reads recent results instead of the whole table.
+	"""
+	# no alias on tabSample: the permission condition refers to it by table name
+	conditions = [
+		"`tabSample`.status not in ('Rejected', 'Disposed')",
+		"""`tabSample`.name in (
+			select parent from `tabLab Test Result`
+			where parenttype = 'Sample' and verified_on >= %(since)s
+		)""",
+	]
+	permission_condition = get_permission_condition("Sample")
+	if permission_condition:
+		conditions.append(permission_condition.replace("%", "%%"))
+
+	rows = frappe.db.sql(
+		f"""
+		select
+			`tabSample`.name, `tabSample`.sample_name, `tabSample`.patient, `tabSample`.creation,
+			max(r.verified_on) as verified_on,
+			group_concat(r.lab_test order by r.idx separator ', ') as test_name
+		from `tabSample`
+		join `tabLab Test Result` r on r.parent = `tabSample`.name and r.parenttype = 'Sample'
+		where {" and ".join(conditions)}
+		group by `tabSample`.name
+		having sum(r.status != 'Verified') = 0
+		order by verified_on desc
+		limit %(limit)s
+		""",
+		{"since": add_days(now_datetime(), -PENDING_REPORT_DAYS), "limit": LIST_LIMIT},
+		as_dict=True,
+	)
+
+	patients = get_many("Patient", [row.patient for row in rows if row.patient], ["first_name", "last_name"])
+	for row in rows:
+		patient = patients.get(row.patient)
+		if patient:
+			row.patient_name = f"{patient.first_name or ''} {patient.last_name or ''}".strip()
+	return rows
+
+
+def get_bootstrap_stats():
+	stats = get_dashboard_stats()
+	return {"samples": stats["samples"], "appointments": stats["appointments"]}
+
+
+# key in the payload -> reader; get_appointment_lists fills two keys at once
+BOOTSTRAP_SECTIONS = {
+	"stats": get_bootstrap_stats,
+	"recent_activity": get_recent_activity,
+	"pending_reports": get_pending_reports,
+	None: get_appointment_lists,
+}
+
+
+def get_bootstrap():
+	"""Every section that could be read; failures are logged and listed in `failed`."""
+	payload, failed = {}, []
+	for key, reader in BOOTSTRAP_SECTIONS.items():
+		try:
+			value = reader()
+		except Exception:
+			frappe.log_error(title=f"adi_lims bootstrap: {reader.__name__}")
+			failed.append(reader.__name__)
+			continue
+		if key:
+			payload[key] = value
+		else:
+			payload.update(value)
+	payload["failed"] = failed
+	return payload
+
+
+def bootstrap_response():
+	"""`get_bootstrap` as a conditional, compressed JSON response shaped like any frappe.call result."""
+	body = frappe.as_json({"message": get_bootstrap()}, indent=None).encode()
+	etag = hashlib.md5(body).hexdigest()
+	headers = {"ETag": f'"{etag}"', "Cache-Control": "private, no-cache", "Vary": "Accept-Encoding"}
+
+	request = getattr(frappe.local, "request", None)
+	if request is not None and etag in request.if_none_match:
+		return Response(status=304, headers=headers)
+
+	if len(body) >= MIN_COMPRESS_BYTES and request is not None and "gzip" in request.accept_encodings:
+		body = gzip.compress(body, compresslevel=6)
+		headers["Content-Encoding"] = "gzip"
+	return Response(body, status=200, content_type="application/json", headers=headers)
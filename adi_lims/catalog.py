@@ -0,0 +1,151 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""In-process Lab Test catalog.
+
+Every Lab Test and its Lab Test Normal Range rows are loaded with one query and
+indexed by (lab_test, gender, age_group), so reference ranges for a whole page
+of results resolve in memory. Each worker keeps its own copy; a version key in
+Redis, bumped from doc_events on Lab Test, tells workers to reload.
+"""
+
+import frappe
+from frappe.utils import date_diff, getdate
+
+from adi_lims.perf import record_cache
+
+CATALOG_VERSION_KEY = "adi_lims:lab_test_catalog_version"
+
+ANY_GENDER = "both"
+ANY_AGE_GROUP = ""
+
+# (upper bound in years, exclusive) -> age group label used in Lab Test Normal Range
+AGE_GROUPS = (
+	(1, "Infant"),
+	(13, "Child"),
+	(18, "Adolescent"),
+	(65, "Adult"),
+)
+ELDERLY_AGE_GROUP = "Elderly"
+
+_catalog = {}
+
+
+class LabTestCatalog:
+	def __init__(self, rows, version):
+		self.version = version
+		self.tests = {}
+		self.range_index = {}
+
+		for row in rows:
+			test = self.tests.setdefault(
+				row.lab_test,
+				frappe._dict(
+					name=row.lab_test,
+					test_code=row.test_code,
+					department=row.department,
+					delta_check_percent=row.delta_check_percent,
+					normal_ranges=[],
+				),
+			)
+			if row.idx is None:
+				continue
+
+			normal_range = frappe._dict(
+				gender=row.gender,
+				age_group=row.age_group,
+				min_value=row.min_value,
+				max_value=row.max_value,
+				critical_low=row.critical_low,
+				critical_high=row.critical_high,
+				unit=row.unit,
+				normal_text=row.normal_text,
+			)
+			test.normal_ranges.append(normal_range)
+			# first matching row wins, same as the order shown on the form
+			self.range_index.setdefault(
+				(row.lab_test, _normalize(row.gender) or ANY_GENDER, _normalize(row.age_group)), normal_range
+			)
+
+	def get_test(self, lab_test):
+		return self.tests.get(lab_test)
+
+	def get_normal_range(self, lab_test, gender=None, age_group=None):
+		"""Return the best matching normal range for a patient, most specific first."""
+		gender, age_group = _normalize(gender), _normalize(age_group)
+		for key in (
+			(lab_test, gender, age_group),
+			(lab_test, ANY_GENDER, age_group),
+			(lab_test, gender, ANY_AGE_GROUP),
+			(lab_test, ANY_GENDER, ANY_AGE_GROUP),
+		):
+			normal_range = self.range_index.get(key)
+			if normal_range:
+				return normal_range
+
+		test = self.tests.get(lab_test)
+		if test and test.normal_ranges:
+			return test.normal_ranges[0]
+
+	def get_reference_range(self, lab_test, gender=None, age_group=None):
+		"""Return the normal range formatted for display, e.g. "10.0 - 20.0 g/dL"."""
+		normal_range = self.get_normal_range(lab_test, gender, age_group)
+		if not normal_range:
+			return None
+		return format_reference_range(normal_range)
+
+
+def _normalize(value):
+	return (value or "").strip().lower()
+
+
+def format_reference_range(normal_range):
+	# Float columns default to 0, so a range without bounds reads as 0 - 0, not None
+	if not normal_range.min_value and not normal_range.max_value and normal_range.normal_text:
+		return normal_range.normal_text
+	return (
+		f"{normal_range.min_value or ''} - {normal_range.max_value or ''} {normal_range.unit or ''}".strip()
+	)
+
+
+def get_age_group(dob, on_date=None):
+	"""Map a date of birth to the age group label used in Lab Test Normal Range."""
+	if not dob:
+		return None
+	years = date_diff(on_date or getdate(), dob) / 365.25
+	for upper_bound, label in AGE_GROUPS:
+		if years < upper_bound:
+			return label
+	return ELDERLY_AGE_GROUP
+
+
+def get_catalog():
+	"""Return the catalog for the current site, reloading it if it was invalidated."""
+	version = frappe.cache().get_value(CATALOG_VERSION_KEY)
+	catalog = _catalog.get(frappe.local.site)
+	record_cache(hit=catalog is not None and catalog.version == version)
+	if catalog is None or catalog.version != version:
+		catalog = _catalog[frappe.local.site] = LabTestCatalog(_load_rows(), version)
+	return catalog
+
+
+def _load_rows():
+	return frappe.db.sql(
+		"""
+		select
+			lt.name as lab_test, lt.test_code, lt.department, lt.delta_check_percent,
+			nr.idx, nr.gender, nr.age_group, nr.min_value, nr.max_value,
+			nr.critical_low, nr.critical_high, nr.unit, nr.normal_text
+		from `tabLab Test` lt
+		left join `tabLab Test Normal Range` nr
+			on nr.parent = lt.name and nr.parenttype = 'Lab Test'
+		order by lt.name, nr.idx
+		""",
+		as_dict=True,
+	)
+
+
+def invalidate_catalog(doc=None, method=None, *args):
+	"""doc_events hook: force every worker to reload the catalog on next use."""
+	frappe.cache().set_value(CATALOG_VERSION_KEY, frappe.generate_hash(length=10))
+	_catalog.pop(frappe.local.site, None)
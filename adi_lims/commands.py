@@ -0,0 +1,93 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+import click
+from frappe.commands import get_site, pass_context
+
+
+@click.command("lims-perf-stats")
+@click.option("--reset", is_flag=True, default=False, help="Clear the collected counters")
+@pass_context
+def lims_perf_stats(context, reset=False):
+	"""Show per-endpoint timings collected by the adi_lims API instrumentation."""
+	import frappe
+
+	from adi_lims.perf import get_perf_stats, reset_perf_stats
+
+	frappe.init(site=get_site(context))
+	frappe.connect()
+	try:
+		if reset:
+			reset_perf_stats()
+			click.echo("LIMS performance counters cleared")
+			return
+
+		stats = get_perf_stats()
+		click.echo(f"{'endpoint':<60} {'calls':>7} {'avg ms':>9} {'queries':>8} {'sql ms':>9} {'N+1':>5}")
+		for endpoint, row in sorted(stats["endpoints"].items(), key=lambda item: -item[1]["avg_ms"]):
+			click.echo(
+				f"{endpoint:<60} {row['calls']:>7} {row['avg_ms']:>9.1f} {row['avg_queries']:>8.1f} "
+				f"{row['avg_sql_ms']:>9.1f} {row['n_plus_one_calls']:>5}"
+			)
+		for endpoint, row in sorted(stats["endpoints"].items()):
+			if "target_ms" in row:
+				click.echo(f"{endpoint}: {row['within_target']:.0%} within the {row['target_ms']} ms target")
+		for report in stats["n_plus_one"][:10]:
+			click.echo(f"N+1 in {report['endpoint']} ({report['count']}x): {report['query']}")
+	finally:
+		frappe.destroy()
+
+
+@click.command("lims-tat-backfill")
+@click.option("--from-date", required=True, help="First day to roll up (YYYY-MM-DD)")
+@click.option("--to-date", help="Last day to roll up, defaults to today")
+@click.option("--chunk-days", type=int, default=7, help="Days rebuilt and committed at a time")
+@pass_context
+def lims_tat_backfill(context, from_date, to_date=None, chunk_days=7):
+	"""Rebuild Lab TAT Rollup rows for a date range, a chunk of days at a time."""
+	import frappe
+
+	from adi_lims.tat import backfill_tat_rollups
+
+	frappe.init(site=get_site(context))
+	frappe.connect()
+	try:
+		rows = backfill_tat_rollups(
+			from_date,
+			to_date,
+			chunk_days=chunk_days,
+			progress=lambda start, end, rows: click.echo(f"{start} .. {end}: {rows} rollup rows"),
+		)
+		click.echo(f"Done, {rows} rollup rows written")
+	finally:
+		frappe.destroy()
+
+
+@click.command("lims-archive-samples")
+@click.option(
+	"--retention-days",
+	type=int,
+	help="Archive samples untouched for this many days (default from site config)",
+)
+@click.option("--chunk-size", type=int, default=1000, help="Samples moved and committed at a time")
+@pass_context
+def lims_archive_samples(context, retention_days=None, chunk_size=1000):
+	"""Move aged Disposed and Analyzed samples and their results into the archive tables."""
+	import frappe
+
+	from adi_lims.archive import archive_samples
+
+	frappe.init(site=get_site(context))
+	frappe.connect()
+	try:
+		archived = archive_samples(
+			retention_days=retention_days,
+			chunk_size=chunk_size,
+			progress=lambda archived: click.echo(f"{archived} samples archived"),
+		)
+		click.echo(f"Done, {archived} samples archived")
+	finally:
+		frappe.destroy()
+
+
+commands = [lims_perf_stats, lims_tat_backfill, lims_archive_samples]
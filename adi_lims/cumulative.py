@@ -0,0 +1,305 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Patient cumulative results.
+
+A patient's numeric results (Completed or Verified, live and archived) are
+held per worker as columns: for each lab test a sorted float64 array of
+completion times and one of values, so a trend is a slice of two arrays.
+
+Entries are built lazily with one query and kept in an LRU bounded by the
+bytes of its arrays (site config `adi_lims_cumulative_cache_mb`). Writes to
+a patient's results bump a version in a Redis hash after commit; a reader
+with an older version re-reads only the rows modified since its last sync
+and patches them into the arrays. Deletions and patient changes bump the
+hash's epoch instead, which makes readers rebuild.
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+
+import frappe
+import numpy as np
+from frappe.utils import cint, get_datetime, now_datetime
+
+from adi_lims.archive import ARCHIVE_TABLES, archive_tables_exist
+from adi_lims.catalog import get_age_group, get_catalog
+from adi_lims.lookup import get_one
+
+STATE_KEY = "adi_lims:cumulative:{0}"
+DEFAULT_CACHE_MB = 64
+STATE_TTL = 30 * 24 * 60 * 60
+SYNC_OVERLAP = timedelta(minutes=5)
+CUMULATIVE_STATUSES = ("Completed", "Verified")
+TOUCH_CHUNK_SIZE = 1000
+
+_entries = OrderedDict()
+_lock = threading.RLock()
+_size = [0]
+
+
+class PatientHistory:
+	"""lab_test -> (times, values, names), each lab test's rows contiguous and sorted by time."""
+
+	__slots__ = ("epoch", "nbytes", "positions", "synced_at", "tests", "version")
+
+	def __init__(self, epoch, version, synced_at):
+		self.epoch, self.version, self.synced_at = epoch, version, synced_at
+		self.tests = {}
+		self.positions = {}
+		self.nbytes = 0
+
+	def load(self, rows):
+		"""Replace the arrays with `rows` of (name, lab_test, completed_on, value)."""
+		grouped = {}
+		for name, lab_test, completed_on, value in rows:
+			grouped.setdefault(lab_test, []).append(
+				(get_datetime(completed_on).timestamp(), float(value), name)
+			)
+		self.tests = {}
+		for lab_test, items in grouped.items():
+			items.sort()
+			times, values, names = zip(*items, strict=True)
+			self.tests[lab_test] = (np.array(times), np.array(values), list(names))
+		self._reindex()
+
+	def patch(self, rows):
+		"""Apply rows of (name, lab_test, completed_on, value, status) modified since the last sync."""
+		changed = {}
+		for name, lab_test, completed_on, value, status in rows:
+			current = self.positions.get(name)
+			if current:
+				changed.setdefault(current, {})[name] = None
+			if status in CUMULATIVE_STATUSES and value is not None and completed_on:
+				item = (get_datetime(completed_on).timestamp(), float(value), name)
+				changed.setdefault(lab_test, {})[name] = item
+
+		for lab_test, updates in changed.items():
+			times, values, names = self.tests.get(lab_test, ((), (), []))
+			items = [
+				(time, value, name)
+				for time, value, name in zip(times, values, names, strict=True)
+				if name not in updates
+			]
+			items.extend(item for item in updates.values() if item)
+			if items:
+				items.sort()
+				times, values, names = zip(*items, strict=True)
+				self.tests[lab_test] = (np.array(times), np.array(values), list(names))
+			else:
+				self.tests.pop(lab_test, None)
+		self._reindex()
+
+	def _reindex(self):
+		self.positions = {
+			name: lab_test for lab_test, (_t, _v, names) in self.tests.items() for name in names
+		}
+		# names are a Python list: count them at a rough 80 bytes per entry
+		self.nbytes = sum(
+			times.nbytes + values.nbytes + 80 * len(names) for times, values, names in self.tests.values()
+		)
+
+	def series(self, lab_test, start=None, end=None):
+		times, values, _names = self.tests[lab_test]
+		lo = np.searchsorted(times, start, "left") if start is not None else 0
+		hi = np.searchsorted(times, end, "right") if end is not None else len(times)
+		return times[lo:hi], values[lo:hi]
+
+
+def get_cache_bytes():
+	return (cint(frappe.conf.get("adi_lims_cumulative_cache_mb")) or DEFAULT_CACHE_MB) * 1024 * 1024
+
+
+def _put(key, entry):
+	"""Store `entry`, counted at its current size, and evict least recently used ones over the limit."""
+	limit = get_cache_bytes()
+	with _lock:
+		_previous, counted = _entries.pop(key, (None, 0))
+		_entries[key] = (entry, entry.nbytes)
+		_size[0] += entry.nbytes - counted
+		while _size[0] > limit and len(_entries) > 1:
+			_key, (_evicted, evicted_nbytes) = _entries.popitem(last=False)
+			_size[0] -= evicted_nbytes
+
+
+def _get(key):
+	with _lock:
+		if key not in _entries:
+			return None
+		_entries.move_to_end(key)
+		return _entries[key][0]
+
+
+def clear_cache():
+	with _lock:
+		_entries.clear()
+		_size[0] = 0
+
+
+# Shared state
+
+
+def get_state(patient):
+	"""(epoch, version) of a patient's results as last announced by a writer."""
+	state = frappe.cache().pipeline().hgetall(frappe.cache().make_key(STATE_KEY.format(patient))).execute()[0]
+	return state.get(b"epoch", b"").decode(), cint(state.get(b"version"))
+
+
+def _announce(patients, reset=False):
+	patients = {patient for patient in patients if patient}
+	if not patients:
+		return
+
+	def announce():
+		pipe = frappe.cache().pipeline()
+		for patient in patients:
+			key = frappe.cache().make_key(STATE_KEY.format(patient))
+			if reset:
+				pipe.hset(key, "epoch", frappe.generate_hash(length=10))
+			pipe.hincrby(key, "version", 1)
+			pipe.expire(key, STATE_TTL)
+		pipe.execute()
+
+	# readers must not see the new version before they can see the rows
+	frappe.db.after_commit.add(announce)
+
+
+def touch_patients(patients):
+	_announce(patients)
+
+
+def reset_patients(patients):
+	_announce(patients, reset=True)
+
+
+def touch_results(names):
+	"""Announce a write to these Lab Test Results to every worker caching their patients."""
+	names = list(names)
+	patients = set()
+	for start in range(0, len(names), TOUCH_CHUNK_SIZE):
+		patients.update(
+			frappe.db.sql_list(
+				"""
+				select distinct s.patient
+				from `tabLab Test Result` r
+				join `tabSample` s on s.name = r.parent
+				where r.parenttype = 'Sample' and r.name in %s
+				""",
+				[names[start : start + TOUCH_CHUNK_SIZE]],
+			)
+		)
+	touch_patients(patients)
+
+
+def on_result_update(doc, method=None):
+	if doc.parenttype == "Sample" and doc.parent:
+		touch_patients([frappe.db.get_value("Sample", doc.parent, "patient")])
+
+
+def on_sample_update(doc, method=None):
+	previous = doc.get_doc_before_save()
+	if not previous:
+		return
+	removed = {row.name for row in previous.get("sample_test_results") or []} - {
+		row.name for row in doc.get("sample_test_results") or []
+	}
+	if previous.patient != doc.patient or removed:
+		reset_patients([previous.patient, doc.patient])
+	else:
+		# saving the parent rewrites its result rows
+		touch_patients([doc.patient])
+
+
+def on_sample_trash(doc, method=None):
+	reset_patients([doc.patient])
+
+
+# Reading
+
+
+def _query(patient, modified_since=None):
+	"""Rows of the patient's results; all usable ones, or every row modified since a time."""
+	if modified_since:
+		return frappe.db.sql(
+			"""
+			select r.name, r.lab_test, r.completed_on, r.numeric_result_value, r.status
+			from `tabSample` s
+			join `tabLab Test Result` r on r.parent = s.name and r.parenttype = 'Sample'
+			where s.patient = %(patient)s and r.modified >= %(since)s
+			""",
+			{"patient": patient, "since": modified_since},
+		)
+
+	tables = [("tabSample", "tabLab Test Result")]
+	if archive_tables_exist():
+		tables.append((ARCHIVE_TABLES["Sample"], ARCHIVE_TABLES["Lab Test Result"]))
+	return frappe.db.sql(
+		" union all ".join(
+			f"""
+			select r.name, r.lab_test, r.completed_on, r.numeric_result_value
+			from `{samples}` s
+			join `{results}` r on r.parent = s.name and r.parenttype = 'Sample'
+			where s.patient = %(patient)s
+				and r.status in %(statuses)s
+				and r.numeric_result_value is not null
+				and r.completed_on is not null
+			"""
+			for samples, results in tables
+		),
+		{"patient": patient, "statuses": CUMULATIVE_STATUSES},
+	)
+
+
+def get_history(patient):
+	"""The patient's PatientHistory, built, caught up or served as cached."""
+	key = (frappe.local.site, patient)
+	epoch, version = get_state(patient)
+	entry = _get(key)
+	if entry and entry.epoch == epoch and entry.version == version:
+		return entry
+
+	synced_at = now_datetime()
+	if entry and entry.epoch == epoch:
+		rows = _query(patient, modified_since=entry.synced_at - SYNC_OVERLAP)
+		with _lock:
+			entry.patch(rows)
+			entry.version, entry.synced_at = version, synced_at
+			_put(key, entry)
+		return entry
+
+	entry = PatientHistory(epoch, version, synced_at)
+	entry.load(_query(patient))
+	_put(key, entry)
+	return entry
+
+
+def get_patient_cumulative(patient, lab_tests=None, from_date=None, to_date=None):
+	"""Time series of the patient's numeric results per lab test.
+
+	Times are epoch milliseconds; unit and reference range come from the
+	catalog for the patient's gender and current age group.
+	"""
+	frappe.has_permission("Patient", "read", doc=patient, throw=True)
+	frappe.has_permission("Sample", "read", throw=True)
+
+	history = get_history(patient)
+	start = get_datetime(from_date).timestamp() if from_date else None
+	end = get_datetime(to_date).timestamp() if to_date else None
+	wanted = lab_tests or sorted(history.tests)
+
+	info = get_one("Patient", patient, ["gender", "dob"]) or frappe._dict()
+	catalog, age_group = get_catalog(), get_age_group(info.dob)
+	tests = {}
+	for lab_test in wanted:
+		if lab_test not in history.tests:
+			continue
+		times, values = history.series(lab_test, start, end)
+		normal_range = catalog.get_normal_range(lab_test, info.gender, age_group)
+		tests[lab_test] = {
+			"times": (times * 1000).astype(np.int64).tolist(),
+			"values": values.tolist(),
+			"unit": normal_range.unit if normal_range else None,
+			"reference_range": catalog.get_reference_range(lab_test, info.gender, age_group),
+		}
+	return {"patient": patient, "tests": tests}
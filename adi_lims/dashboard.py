@@ -0,0 +1,70 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Dashboard counters.
+
+All Sample status counts come from one GROUP BY and all Collection Appointment
+buckets from one conditional aggregate. The combined result is cached in Redis
+for a short TTL (site config `adi_lims_dashboard_stats_ttl`, seconds) and
+dropped whenever a Sample or Collection Appointment is written.
+"""
+
+import frappe
+
+from adi_lims.perf import record_cache
+
+DASHBOARD_STATS_KEY = "adi_lims:dashboard_stats"
+DEFAULT_STATS_TTL = 30
+
+SAMPLE_STATUSES = ("Received", "In-Progress", "Analyzed", "Rejected", "Disposed")
+
+
+def get_stats_ttl():
+	return frappe.utils.cint(frappe.conf.get("adi_lims_dashboard_stats_ttl")) or DEFAULT_STATS_TTL
+
+
+def get_dashboard_stats():
+	"""Return cached sample and appointment counters, computing them on a miss."""
+	today = frappe.utils.nowdate()
+	stats = frappe.cache().get_value(DASHBOARD_STATS_KEY)
+	record_cache(hit=bool(stats and stats.get("date") == today))
+	if stats and stats.get("date") == today:
+		return stats
+
+	stats = {
+		"date": today,
+		"samples": get_sample_status_counts(),
+		"appointments": get_appointment_counts(today),
+	}
+	frappe.cache().set_value(DASHBOARD_STATS_KEY, stats, expires_in_sec=get_stats_ttl())
+	return stats
+
+
+def get_sample_status_counts():
+	counts = dict.fromkeys(SAMPLE_STATUSES, 0)
+	counts.update(frappe.db.sql("select status, count(*) from `tabSample` group by status"))
+	counts["total"] = sum(counts.values())
+	return counts
+
+
+def get_appointment_counts(today):
+	if not frappe.db.exists("DocType", "Collection Appointment"):
+		return {"scheduled_today": 0, "pending_collection": 0, "completed": 0}
+
+	counts = frappe.db.sql(
+		"""
+		select
+			sum(status = 'Scheduled' and appointment_date = %(today)s) as scheduled_today,
+			sum(status = 'Scheduled' and appointment_date <= %(today)s) as pending_collection,
+			sum(status = 'Completed') as completed
+		from `tabCollection Appointment`
+		""",
+		{"today": today},
+		as_dict=True,
+	)[0]
+	return {key: frappe.utils.cint(value) for key, value in counts.items()}
+
+
+def invalidate_dashboard_stats(doc=None, method=None):
+	"""doc_events hook for Sample and Collection Appointment writes."""
+	frappe.cache().delete_value(DASHBOARD_STATS_KEY)
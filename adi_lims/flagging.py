@@ -0,0 +1,215 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Abnormal flagging and delta checks.
+
+Results are flagged a batch at a time: the batch is loaded with one query,
+each row's normal range resolves from the in-process catalog, and values and
+bounds are compared as NumPy arrays instead of row by row. The delta check
+compares each value with the mean of the patient's last few released results
+for the same test, fetched for the whole batch with one windowed query.
+
+Flags are set inline by bulk result entry and instrument ingestion, and a
+nightly job re-flags every numeric result so edits to normal ranges reach
+results that were already saved.
+"""
+
+import frappe
+import numpy as np
+
+from adi_lims.catalog import get_age_group, get_catalog
+
+DELTA_HISTORY = 3
+FLAG_CHUNK_SIZE = 1000
+REFLAG_CHUNK_SIZE = 5000
+
+NONE, NORMAL, LOW, HIGH, CRITICAL_LOW, CRITICAL_HIGH = range(6)
+FLAG_LABELS = ("", "Normal", "Low", "High", "Critical Low", "Critical High")
+
+
+def compute_range_flags(values, low, high, critical_low, critical_high):
+	"""Flag codes for float arrays of equal length; NaN means missing.
+
+	Critical bounds win over the normal range; a row with no value or no
+	bound at all gets NONE.
+	"""
+	has_bound = ~(np.isnan(low) & np.isnan(high) & np.isnan(critical_low) & np.isnan(critical_high))
+	codes = np.where(~np.isnan(values) & has_bound, NORMAL, NONE).astype(np.int8)
+	# comparisons against NaN are False, so a missing bound never flags
+	with np.errstate(invalid="ignore"):
+		codes[values < low] = LOW
+		codes[values > high] = HIGH
+		codes[values <= critical_low] = CRITICAL_LOW
+		codes[values >= critical_high] = CRITICAL_HIGH
+	return codes
+
+
+def compute_delta(values, previous, threshold):
+	"""Percent change against the previous mean and whether it exceeds the per-test threshold."""
+	with np.errstate(invalid="ignore", divide="ignore"):
+		percent = np.abs(values - previous) / np.abs(previous) * 100
+		percent[~np.isfinite(percent)] = np.nan
+		failed = percent > threshold
+	return percent, failed
+
+
+def _bound(value, allow_zero=False):
+	# numeric columns default to 0, so 0 means "not set" unless it is a meaningful lower bound
+	if value is None or (not value and not allow_zero):
+		return np.nan
+	return float(value)
+
+
+def load_results(names):
+	return frappe.db.sql(
+		"""
+		select r.name, r.lab_test, r.numeric_result_value, r.result_value, s.patient, p.gender, p.dob
+		from `tabLab Test Result` r
+		inner join `tabSample` s on s.name = r.parent
+		left join `tabPatient` p on p.name = s.patient
+		where r.parenttype = 'Sample' and r.name in %(names)s
+		""",
+		{"names": names},
+		as_dict=True,
+	)
+
+
+def get_previous_means(rows, history=DELTA_HISTORY):
+	"""(patient, lab_test) -> mean of the last `history` released results outside this batch."""
+	patients = list({row.patient for row in rows if row.patient})
+	lab_tests = list({row.lab_test for row in rows})
+	if not patients or not lab_tests:
+		return {}
+
+	previous = frappe.db.sql(
+		"""
+		select patient, lab_test, avg(numeric_result_value) as mean
+		from (
+			select
+				s.patient, r.lab_test, r.numeric_result_value,
+				row_number() over (partition by s.patient, r.lab_test order by r.creation desc) as position
+			from `tabLab Test Result` r
+			inner join `tabSample` s on s.name = r.parent
+			where r.parenttype = 'Sample'
+				and s.patient in %(patients)s
+				and r.lab_test in %(lab_tests)s
+				and r.status in ('Completed', 'Verified')
+				and r.numeric_result_value is not null
+				and r.name not in %(names)s
+		) history
+		where position <= %(history)s
+		group by patient, lab_test
+		""",
+		{
+			"patients": patients,
+			"lab_tests": lab_tests,
+			"names": [row.name for row in rows],
+			"history": history,
+		},
+		as_dict=True,
+	)
+	return {(row.patient, row.lab_test): row.mean for row in previous}
+
+
+def flag_results(names, delta_check=True):
+	"""Compute and store result_flag, delta_flag and delta_percent for `names`.
+
+	Returns {name: result_flag} for the rows that were flagged.
+	"""
+	flags = {}
+	for start in range(0, len(names), FLAG_CHUNK_SIZE):
+		flags.update(_flag_chunk(list(names[start : start + FLAG_CHUNK_SIZE]), delta_check))
+	return flags
+
+
+def _flag_chunk(names, delta_check):
+	rows = [row for row in load_results(names) if (row.result_value or "").strip()]
+	if not rows:
+		return {}
+
+	catalog = get_catalog()
+	size = len(rows)
+	values = np.full(size, np.nan)
+	low, high = np.full(size, np.nan), np.full(size, np.nan)
+	critical_low, critical_high = np.full(size, np.nan), np.full(size, np.nan)
+	threshold, previous = np.full(size, np.nan), np.full(size, np.nan)
+
+	means = get_previous_means(rows) if delta_check else {}
+	for i, row in enumerate(rows):
+		if row.numeric_result_value is not None:
+			values[i] = float(row.numeric_result_value)
+		normal_range = catalog.get_normal_range(row.lab_test, row.gender, get_age_group(row.dob))
+		if normal_range:
+			low[i] = _bound(normal_range.min_value, allow_zero=True)
+			high[i] = _bound(normal_range.max_value)
+			critical_low[i] = _bound(normal_range.critical_low)
+			critical_high[i] = _bound(normal_range.critical_high)
+		test = catalog.get_test(row.lab_test)
+		if test:
+			threshold[i] = _bound(test.delta_check_percent)
+		mean = means.get((row.patient, row.lab_test))
+		if mean is not None:
+			previous[i] = float(mean)
+
+	codes = compute_range_flags(values, low, high, critical_low, critical_high)
+	percent, failed = compute_delta(values, previous, threshold)
+
+	updates = [
+		(
+			row.name,
+			FLAG_LABELS[codes[i]],
+			int(failed[i]),
+			None if np.isnan(percent[i]) else round(float(percent[i]), 2),
+		)
+		for i, row in enumerate(rows)
+	]
+	write_flags(updates, delta_check)
+	return {name: flag for name, flag, _failed, _percent in updates if flag}
+
+
+def write_flags(updates, delta_check=True):
+	"""One CASE-based UPDATE for a chunk of (name, result_flag, delta_flag, delta_percent)."""
+	cases = " ".join(["when %s then %s"] * len(updates))
+	values = [v for name, flag, _failed, _percent in updates for v in (name, flag)]
+	columns = [f"result_flag = case name {cases} end"]
+	if delta_check:
+		values += [v for name, _flag, failed, _percent in updates for v in (name, failed)]
+		values += [v for name, _flag, _failed, percent in updates for v in (name, percent)]
+		columns += [f"delta_flag = case name {cases} end", f"delta_percent = case name {cases} end"]
+	values += [name for name, _flag, _failed, _percent in updates]
+
+	frappe.db.sql(
+		f"""
+		update `tabLab Test Result`
+		set {", ".join(columns)}
+		where name in ({", ".join(["%s"] * len(updates))})
+		""",
+		values,
+	)
+
+
+def reflag_all(chunk_size=REFLAG_CHUNK_SIZE):
+	"""Nightly job: re-apply range flags to every result with a value, a chunk per commit.
+
+	Delta flags are left alone; they describe the history at the time the
+	result was entered.
+	"""
+	last_name, total = "", 0
+	while True:
+		names = frappe.db.sql_list(
+			"""
+			select name from `tabLab Test Result`
+			where parenttype = 'Sample' and name > %s
+				and status in ('Completed', 'Verified') and ifnull(result_value, '') != ''
+			order by name
+			limit %s
+			""",
+			(last_name, chunk_size),
+		)
+		if not names:
+			break
+		flag_results(names, delta_check=False)
+		frappe.db.commit()
+		total += len(names)
+		last_name = names[-1]
+	return total
@@ -39,7 +39,8 @@ whitelist_methods = [
 # ------------------
 
 # include js, css files in header of desk.html
-app_include_css = "/assets/adi_lims/css/tailwind_output.css"
+# app_include_css = "/assets/adi_lims/css/adi_lims.css"
+# (the Tailwind build is loaded by the adilims page itself, not on every desk page)
 # app_include_js = "/assets/adi_lims/js/adi_lims.js"
 
 # include js, css files in header of web template
@@ -103,6 +104,15 @@ app_include_css = "/assets/adi_lims/css/tailwind_output.css"
 # ------------
 
 # before_uninstall = "adi_lims.uninstall.before_uninstall"
+
+# Migration
+# ------------
+
+after_migrate = [
+	"adi_lims.search.setup_search_table",
+	"adi_lims.archive.setup_archive_tables",
+	"adi_lims.qc.setup_qc_tables",
+]
 # after_uninstall = "adi_lims.uninstall.after_uninstall"
 
 # Integration Setup
@@ -159,6 +169,123 @@ app_include_css = "/assets/adi_lims/css/tailwind_output.css"
 # 	}
 # }
 
+doc_events = {
+	"Lab Test": {
+		# the catalog must be invalidated before panels are rebuilt from it
+		"on_update": [
+			"adi_lims.catalog.invalidate_catalog",
+			"adi_lims.lookup.invalidate_lookup",
+			"adi_lims.panels.on_lab_test_change",
+		],
+		"after_rename": [
+			"adi_lims.catalog.invalidate_catalog",
+			"adi_lims.lookup.invalidate_lookup",
+			"adi_lims.panels.on_lab_test_change",
+		],
+		"on_trash": [
+			"adi_lims.catalog.invalidate_catalog",
+			"adi_lims.lookup.invalidate_lookup",
+		],
+	},
+	"Lab Test Panel": {
+		"on_update": "adi_lims.panels.on_panel_update",
+		"after_rename": "adi_lims.panels.on_panel_update",
+		"on_trash": "adi_lims.panels.on_panel_trash",
+	},
+	"Sample": {
+		"after_insert": "adi_lims.listing.invalidate_listing_counts",
+		"on_update": [
+			"adi_lims.listing.invalidate_listing_counts_on_status_change",
+			"adi_lims.storage.on_sample_update",
+			"adi_lims.search.on_update",
+			"adi_lims.cumulative.on_sample_update",
+			"adi_lims.dashboard.invalidate_dashboard_stats",
+			"adi_lims.realtime.on_sample_update",
+		],
+		"after_rename": "adi_lims.search.after_rename",
+		"on_trash": [
+			"adi_lims.storage.on_sample_trash",
+			"adi_lims.search.on_trash",
+			"adi_lims.cumulative.on_sample_trash",
+			"adi_lims.dashboard.invalidate_dashboard_stats",
+			"adi_lims.listing.invalidate_listing_counts",
+			"adi_lims.realtime.on_sample_trash",
+		],
+	},
+	"Lab Test Result": {
+		"validate": [
+			"adi_lims.qc.validate_result_run",
+			"adi_lims.tat.set_result_timestamps",
+		],
+		"on_update": [
+			"adi_lims.cumulative.on_result_update",
+			"adi_lims.realtime.on_result_update",
+		],
+	},
+	"Patient": {
+		"after_insert": "adi_lims.listing.invalidate_listing_counts",
+		"on_update": [
+			"adi_lims.lookup.invalidate_lookup",
+			"adi_lims.search.on_update",
+		],
+		"after_rename": [
+			"adi_lims.lookup.invalidate_lookup",
+			"adi_lims.search.after_rename",
+		],
+		"on_trash": [
+			"adi_lims.listing.invalidate_listing_counts",
+			"adi_lims.lookup.invalidate_lookup",
+			"adi_lims.search.on_trash",
+		],
+	},
+	"Sample Type": {
+		"on_update": "adi_lims.lookup.invalidate_lookup",
+		"after_rename": "adi_lims.lookup.invalidate_lookup",
+		"on_trash": "adi_lims.lookup.invalidate_lookup",
+	},
+	"Lab Department": {
+		"on_update": "adi_lims.lookup.invalidate_lookup",
+		"after_rename": "adi_lims.lookup.invalidate_lookup",
+		"on_trash": "adi_lims.lookup.invalidate_lookup",
+	},
+	"Patient Appointment": {
+		"after_insert": "adi_lims.listing.invalidate_listing_counts",
+		"on_update": "adi_lims.listing.invalidate_listing_counts_on_status_change",
+		"on_trash": "adi_lims.listing.invalidate_listing_counts",
+	},
+	"Collection Appointment": {
+		"validate": "adi_lims.phlebotomy.validate_slot",
+		"on_update": [
+			"adi_lims.phlebotomy.update_slot_index",
+			"adi_lims.dashboard.invalidate_dashboard_stats",
+			"adi_lims.realtime.on_appointment_update",
+		],
+		"on_trash": [
+			"adi_lims.phlebotomy.update_slot_index",
+			"adi_lims.dashboard.invalidate_dashboard_stats",
+			"adi_lims.realtime.on_appointment_trash",
+		],
+	},
+}
+
+# called once per bulk status change (adi_lims.sample_status) with the batch of moved samples
+sample_status_transition = [
+	"adi_lims.storage.on_sample_transition",
+	"adi_lims.dashboard.invalidate_dashboard_stats",
+	"adi_lims.listing.invalidate_listing_counts",
+	"adi_lims.realtime.on_sample_transition",
+]
+
+# called once per bulk accessioning (adi_lims.accessioning) with the batch of new samples,
+# in place of the Sample after_insert / on_update doc_events
+sample_batch_insert = [
+	"adi_lims.storage.on_sample_batch_insert",
+	"adi_lims.search.on_batch_insert",
+	"adi_lims.dashboard.invalidate_dashboard_stats",
+	"adi_lims.listing.invalidate_listing_counts",
+	"adi_lims.realtime.on_sample_batch_insert",
+]
+
 # Scheduled Tasks
 # ---------------
 
@@ -180,6 +307,21 @@ app_include_css = "/assets/adi_lims/css/tailwind_output.css"
 # 	],
 # }
 
+scheduler_events = {
+	"cron": {
+		"*/10 * * * *": [
+			"adi_lims.tat.refresh_tat_rollups",
+		],
+	},
+	"daily_long": [
+		"adi_lims.flagging.reflag_all",
+		"adi_lims.archive.archive_samples",
+	],
+	"weekly": [
+		"adi_lims.reports.prune_report_cache",
+	],
+}
+
 # Testing
 # -------
 
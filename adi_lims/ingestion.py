@@ -0,0 +1,257 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Streaming ingestion of instrument result files.
+
+ASTM, HL7 and CSV exports are parsed line by line into (sample_id, test_code,
+value) records by generators, so memory stays flat whatever the file size.
+Records are processed in fixed-size chunks: test codes resolve through a
+dictionary preloaded from the Lab Test catalog, the chunk's samples resolve
+to Lab Test Result rows with one query, and each chunk goes through the
+same write, flag and publish path as bulk result entry and is committed
+before the next one is read. The instrument and QC run the file was
+produced by are stamped on every result written, so QC holds them until
+that run is accepted.
+"""
+
+import csv
+import os
+
+import frappe
+from frappe import _
+
+from adi_lims.catalog import get_catalog
+from adi_lims.qc import validate_run_fields
+from adi_lims.results import MAX_RESULT_LENGTH, save_results, to_numeric
+
+CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 100
+PROGRESS_EVENT = "adi_lims_ingestion_progress"
+
+CSV_SAMPLE_COLUMNS = ("sample_id", "sample", "specimen_id", "sample_name")
+CSV_TEST_COLUMNS = ("test_code", "test", "lab_test", "assay")
+CSV_VALUE_COLUMNS = ("result_value", "result", "value")
+
+
+def detect_format(path):
+	extension = os.path.splitext(path)[1].lower()
+	if extension == ".csv":
+		return "csv"
+	if extension == ".hl7":
+		return "hl7"
+
+	with open(path, errors="replace") as f:
+		head = f.read(16).lstrip("\x02\x05 ")
+	if head.startswith("MSH|"):
+		return "hl7"
+	if head[:2] == "H|" or head[1:3] == "H|":
+		return "astm"
+	return "csv"
+
+
+def iter_csv_records(lines):
+	reader = csv.reader(lines)
+	header = [column.strip().lower() for column in next(reader, [])]
+	sample_idx = _find_column(header, CSV_SAMPLE_COLUMNS)
+	test_idx = _find_column(header, CSV_TEST_COLUMNS)
+	value_idx = _find_column(header, CSV_VALUE_COLUMNS)
+
+	for row in reader:
+		if len(row) > max(sample_idx, test_idx, value_idx):
+			yield row[sample_idx].strip(), row[test_idx].strip(), row[value_idx].strip()
+
+
+def _find_column(header, aliases):
+	for alias in aliases:
+		if alias in header:
+			return header.index(alias)
+	frappe.throw(_("CSV header must contain one of: {0}").format(", ".join(aliases)))
+
+
+def iter_astm_records(lines):
+	"""Yield records from ASTM E1394 text: O (order) records carry the specimen ID,
+	R (result) records the universal test ID and the value."""
+	sample_id = None
+	for line in lines:
+		line = line.strip("\x02\x03\x04\x05\r\n ")
+		# frame numbers prefix the record type in raw captures, e.g. "2R|1|..."
+		if line[:1].isdigit() and line[1:3] in ("O|", "R|", "H|", "P|", "L|"):
+			line = line[1:]
+
+		if line.startswith("O|"):
+			fields = line.split("|")
+			sample_id = _component(fields, 2) or _component(fields, 3)
+		elif line.startswith("R|") and sample_id:
+			fields = line.split("|")
+			test_code = _test_id_component(fields, 2)
+			if test_code:
+				yield sample_id, test_code, fields[3] if len(fields) > 3 else ""
+
+
+def iter_hl7_records(lines):
+	"""Yield records from HL7 v2 ORU messages: OBR-3 (or SPM-2) is the sample ID,
+	OBX-3 the test code and OBX-5 the value."""
+	sample_id = None
+	for line in lines:
+		line = line.strip("\x0b\x1c\r\n ")
+		if line.startswith("MSH|"):
+			sample_id = None
+		elif line.startswith(("OBR|", "SPM|")):
+			sample_id = _component(line.split("|"), 3 if line.startswith("OBR|") else 2) or sample_id
+		elif line.startswith("OBX|") and sample_id:
+			fields = line.split("|")
+			test_code = _component(fields, 3)
+			if test_code:
+				yield sample_id, test_code, fields[5] if len(fields) > 5 else ""
+
+
+def _component(fields, idx):
+	if len(fields) <= idx:
+		return None
+	return fields[idx].split("^")[0].strip() or None
+
+
+def _test_id_component(fields, idx):
+	"""ASTM universal test ID is ^^^<local code>[^...]; fall back to the last non-empty part."""
+	if len(fields) <= idx:
+		return None
+	components = [c.strip() for c in fields[idx].split("^")]
+	if len(components) > 3 and components[3]:
+		return components[3]
+	components = [c for c in components if c]
+	return components[-1] if components else None
+
+
+PARSERS = {
+	"csv": iter_csv_records,
+	"astm": iter_astm_records,
+	"hl7": iter_hl7_records,
+}
+
+
+def iter_chunks(records, size):
+	chunk = []
+	for record in records:
+		chunk.append(record)
+		if len(chunk) >= size:
+			yield chunk
+			chunk = []
+	if chunk:
+		yield chunk
+
+
+def get_test_code_map():
+	"""test_code (and Lab Test name) -> Lab Test, from the in-process catalog."""
+	test_codes = {}
+	for test in get_catalog().tests.values():
+		test_codes[test.name] = test.name
+		if test.test_code:
+			test_codes[test.test_code] = test.name
+	return test_codes
+
+
+def get_result_map(sample_ids):
+	"""(sample, lab_test) -> Lab Test Result for the samples of one chunk."""
+	rows = frappe.get_all(
+		"Lab Test Result",
+		filters={"parenttype": "Sample", "parent": ("in", list(sample_ids)), "status": ("!=", "Verified")},
+		fields=["name", "parent", "lab_test"],
+	)
+	return {(row.parent, row.lab_test): row.name for row in rows}
+
+
+class _LineCounter:
+	"""Wrap a text file to count characters consumed, for progress reporting."""
+
+	def __init__(self, f):
+		self.f = f
+		self.consumed = 0
+
+	def __iter__(self):
+		for line in self.f:
+			self.consumed += len(line)
+			yield line
+
+
+def ingest_file(path, fmt=None, chunk_size=CHUNK_SIZE, user=None, instrument=None, qc_run=None):
+	"""Parse `path` and write matching results chunk by chunk, committing each chunk."""
+	validate_run_fields(instrument, qc_run)
+	fmt = fmt or detect_format(path)
+	total_size = os.path.getsize(path) or 1
+	test_codes = get_test_code_map()
+	stats = {"records": 0, "updated": 0, "unmatched": 0, "invalid": 0, "flagged": 0, "errors": []}
+
+	# universal newlines also split HL7's bare \r segment terminators
+	with open(path, errors="replace") as f:
+		lines = _LineCounter(f)
+		for chunk in iter_chunks(PARSERS[fmt](lines), chunk_size):
+			result_map = get_result_map({sample_id for sample_id, _code, _value in chunk})
+			rows = {}
+			for sample_id, test_code, value in chunk:
+				name = result_map.get((sample_id, test_codes.get(test_code)))
+				value = value.strip()
+				if not name:
+					stats["unmatched"] += 1
+					_report(
+						stats, _("No pending result for sample {0}, test {1}").format(sample_id, test_code)
+					)
+					continue
+				if len(value) > MAX_RESULT_LENGTH:
+					stats["invalid"] += 1
+					_report(
+						stats,
+						_("Result for sample {0}, test {1} is longer than {2} characters").format(
+							sample_id, test_code, MAX_RESULT_LENGTH
+						),
+					)
+					continue
+				# a later record for the same result overrides an earlier one (reruns)
+				rows[name] = (name, value, to_numeric(value))
+
+			flags = save_results(list(rows.values()), instrument=instrument, qc_run=qc_run)
+			stats["flagged"] += sum(flag != "Normal" for flag in flags.values())
+			frappe.db.commit()
+
+			stats["records"] += len(chunk)
+			stats["updated"] += len(rows)
+			frappe.publish_realtime(
+				PROGRESS_EVENT,
+				{
+					"path": os.path.basename(path),
+					"progress": min(lines.consumed / total_size * 100, 100),
+					"records": stats["records"],
+					"updated": stats["updated"],
+					"unmatched": stats["unmatched"],
+					"invalid": stats["invalid"],
+					"flagged": stats["flagged"],
+				},
+				user=user,
+			)
+
+	return stats
+
+
+def _report(stats, message):
+	if len(stats["errors"]) < MAX_REPORTED_ERRORS:
+		stats["errors"].append(message)
+
+
+def enqueue_ingestion(file_url, fmt=None, instrument=None, qc_run=None):
+	"""Queue ingestion of an uploaded File on the long queue."""
+	frappe.has_permission("Sample", "write", throw=True)
+	if fmt and fmt not in PARSERS:
+		frappe.throw(_("Unsupported instrument file format: {0}").format(fmt))
+	validate_run_fields(instrument, qc_run)
+
+	path = frappe.get_doc("File", {"file_url": file_url}).get_full_path()
+	job = frappe.enqueue(
+		"adi_lims.ingestion.ingest_file",
+		queue="long",
+		timeout=6 * 60 * 60,
+		path=path,
+		fmt=fmt,
+		user=frappe.session.user,
+		instrument=instrument,
+		qc_run=qc_run,
+	)
+	return {"job_id": job.id if job else None}
@@ -0,0 +1,419 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Tube labels.
+
+Labels for a list of Samples (or a range of S-numbers, such as one accession
+batch) are rendered from one query joining Sample, Patient and the sample's
+tests, in one of two formats:
+
+- ZPL for thermal printers, from a template split into literal and field
+  parts once and then only joined (site config `adi_lims_label_zpl_template`
+  replaces the built-in one); the printer draws the barcode itself.
+- PDF, one 2 x 1 inch page per label, written directly: Code 128 bar widths
+  are computed with numpy for all labels of the same length at once and drawn
+  as rectangles, so no HTML renderer is involved.
+
+Output is produced in chunks and streamed to a sink: a raw-socket printer
+(port 9100) from site config `adi_lims_label_printers`, a file, or the
+in-process FakePrinter used by tests and benchmarks.
+"""
+
+import functools
+import socket
+import socketserver
+import string
+import threading
+import time
+import zlib
+
+import frappe
+import numpy as np
+from frappe import _
+
+from adi_lims.listing import get_permission_condition
+
+ZPL = "zpl"
+PDF = "pdf"
+FORMATS = (ZPL, PDF)
+MAX_LABELS = 5000
+CHUNK_SIZE = 100
+PRINTER_TIMEOUT = 10
+
+LABEL_FIELDS = ("barcode", "sample_name", "patient", "patient_name", "details", "tests")
+TEXT_LENGTH = 32
+
+DEFAULT_ZPL_TEMPLATE = """^XA
+^CI28
+^PW406^LL203
+^FO20,12^BY2^BCN,70,N,N,N^FD{barcode}^FS
+^FO20,90^A0N,26,26^FD{barcode}  {sample_name}^FS
+^FO20,120^A0N,22,22^FD{patient_name}^FS
+^FO20,146^A0N,20,20^FD{patient}  {details}^FS
+^FO20,172^A0N,18,18^FD{tests}^FS
+^XZ
+"""
+
+# PDF page: 2 x 1 inch, in points
+PAGE_WIDTH, PAGE_HEIGHT = 144, 72
+MARGIN = 6
+BAR_HEIGHT = 30
+BAR_TOP = PAGE_HEIGHT - MARGIN
+QUIET_MODULES = 10
+MAX_MODULE_WIDTH = 1.0
+
+# Code 128 symbol values 0-105 as bar/space module widths; 104 is Start B
+CODE128_PATTERNS = np.array(
+	[
+		[int(width) for width in pattern]
+		for pattern in (
+			"212222 222122 222221 121223 121322 131222 122213 122312 132212 221213 221312 231212 "
+			"112232 122132 122231 113222 123122 123221 223211 221132 221231 213212 223112 312131 "
+			"311222 321122 321221 312212 322112 322211 212123 212321 232121 111323 131123 131321 "
+			"112313 132113 132311 211313 231113 231311 112133 112331 132131 113123 113321 133121 "
+			"313121 211331 231131 213113 213311 213131 311123 311321 331121 312113 312311 332111 "
+			"314111 221411 431111 111224 111422 121124 121421 141122 141221 112214 112412 122114 "
+			"122411 142112 142211 241211 221114 413111 241112 134111 111242 121142 121241 114212 "
+			"124112 124211 411212 421112 421211 212141 214121 412121 111143 111341 131141 114113 "
+			"114311 411113 411311 113141 114131 311141 411131 211412 211214 211232"
+		).split()
+	]
+)
+CODE128_START_B = 104
+CODE128_STOP = np.array([2, 3, 3, 1, 1, 1, 2])
+
+
+# Data
+
+
+def get_label_rows(samples=None, from_sample=None, to_sample=None):
+	"""Label data of the listed samples, or of every sample from `from_sample` to `to_sample`, in one query."""
+	# no alias on tabSample: the permission condition refers to it by table name
+	if samples:
+		conditions, values = ["`tabSample`.name in %(samples)s"], {"samples": list(samples)}
+	elif from_sample and to_sample:
+		conditions, values = (
+			["`tabSample`.name between %(from_sample)s and %(to_sample)s"],
+			{
+				"from_sample": from_sample,
+				"to_sample": to_sample,
+			},
+		)
+	else:
+		frappe.throw(_("Pass a list of samples or a range of samples"))
+	permission_condition = get_permission_condition("Sample")
+	if permission_condition:
+		conditions.append(permission_condition.replace("%", "%%"))
+
+	rows = frappe.db.sql(
+		f"""
+		select
+			`tabSample`.name, `tabSample`.sample_name, `tabSample`.sample_type,
+			`tabSample`.collection_date, `tabSample`.patient,
+			p.first_name, p.last_name, p.gender,
+			group_concat(r.lab_test order by r.idx separator ', ') as tests
+		from `tabSample`
+		left join `tabPatient` p on p.name = `tabSample`.patient
+		left join `tabLab Test Result` r on r.parent = `tabSample`.name and r.parenttype = 'Sample'
+		where {" and ".join(conditions)}
+		group by `tabSample`.name, `tabSample`.sample_name, `tabSample`.sample_type,
+			`tabSample`.collection_date, `tabSample`.patient, p.first_name, p.last_name, p.gender
+		order by `tabSample`.name
+		limit {MAX_LABELS + 1}
+		""",
+		values,
+		as_dict=True,
+	)
+	if len(rows) > MAX_LABELS:
+		frappe.throw(_("At most {0} labels can be printed at once").format(MAX_LABELS))
+	return [_label_fields(row) for row in rows]
+
+
+def _label_fields(row):
+	patient_name = f"{row.first_name or ''} {row.last_name or ''}".strip()
+	details = " ".join(
+		str(value) for value in (row.gender and row.gender[0], row.sample_type, row.collection_date) if value
+	)
+	return {
+		"barcode": row.name,
+		"sample_name": row.sample_name or "",
+		"patient": row.patient or "",
+		"patient_name": patient_name,
+		"details": details,
+		"tests": row.tests or "",
+	}
+
+
+def _clip(value):
+	value = str(value)
+	return value if len(value) <= TEXT_LENGTH else value[: TEXT_LENGTH - 1] + "…"
+
+
+# ZPL
+
+
+@functools.lru_cache(maxsize=8)
+def compile_template(template):
+	"""Split a str.format template into (literal, field) parts once; returns the render function."""
+	parts = [(literal, field) for literal, field, _spec, _conv in string.Formatter().parse(template)]
+	unknown = {field for _literal, field in parts if field and field not in LABEL_FIELDS}
+	if unknown:
+		frappe.throw(_("Unknown label fields: {0}").format(", ".join(sorted(unknown))))
+
+	def render(label):
+		return "".join(literal + (label[field] if field else "") for literal, field in parts)
+
+	return render
+
+
+def _zpl_text(value, clip=True):
+	# ^ and ~ start ZPL commands
+	return (_clip(value) if clip else str(value)).replace("^", " ").replace("~", " ")
+
+
+def iter_zpl(labels):
+	render = compile_template(frappe.conf.get("adi_lims_label_zpl_template") or DEFAULT_ZPL_TEMPLATE)
+	for start in range(0, len(labels), CHUNK_SIZE):
+		yield "".join(
+			render({field: _zpl_text(value, clip=field != "barcode") for field, value in label.items()})
+			for label in labels[start : start + CHUNK_SIZE]
+		).encode()
+
+
+# Code 128
+
+
+def encode_code128(values):
+	"""Module widths (bar, space, bar, ...) of each value as Code 128 subset B.
+
+	Values of equal length are encoded together as one numpy matrix.
+	"""
+	for value in values:
+		if not value or any(not 32 <= ord(char) < 128 for char in value):
+			frappe.throw(_("{0} cannot be encoded as a Code 128 barcode").format(value))
+
+	widths = [None] * len(values)
+	by_length = {}
+	for idx, value in enumerate(values):
+		by_length.setdefault(len(value), []).append(idx)
+	for length, indexes in by_length.items():
+		count = len(indexes)
+		codes = np.frombuffer("".join(values[i] for i in indexes).encode("ascii"), dtype=np.uint8)
+		codes = codes.reshape(count, length).astype(np.int64) - 32
+		checksum = (CODE128_START_B + codes @ np.arange(1, length + 1)) % 103
+		symbols = np.column_stack([np.full(count, CODE128_START_B), codes, checksum])
+		matrix = np.hstack([CODE128_PATTERNS[symbols].reshape(count, -1), np.tile(CODE128_STOP, (count, 1))])
+		for row, idx in zip(matrix, indexes, strict=True):
+			widths[idx] = row
+	return widths
+
+
+def _bar_operators(widths):
+	"""PDF rectangle operators for one barcode, scaled to the label width and centred."""
+	modules = int(widths.sum()) + 2 * QUIET_MODULES
+	module = min(MAX_MODULE_WIDTH, (PAGE_WIDTH - 2 * MARGIN) / modules)
+	offset = (PAGE_WIDTH - modules * module) / 2 + QUIET_MODULES * module
+	starts = (np.cumsum(widths) - widths) * module + offset
+	bottom = BAR_TOP - BAR_HEIGHT
+	# even positions are bars, odd ones spaces
+	return (
+		" ".join(
+			f"{x:.2f} {bottom} {w:.2f} {BAR_HEIGHT} re"
+			for x, w in zip(starts[::2], widths[::2] * module, strict=True)
+		)
+		+ " f"
+	)
+
+
+# PDF
+
+
+def _pdf_text(value):
+	text = _clip(value).encode("cp1252", "replace").decode("latin-1")
+	return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _page_content(label, bars):
+	lines = (
+		(9, f"{label['barcode']}  {label['sample_name']}"),
+		(7, label["patient_name"]),
+		(6, f"{label['patient']}  {label['details']}"),
+		(6, label["tests"]),
+	)
+	text, y = [], BAR_TOP - BAR_HEIGHT - 9
+	for size, value in lines:
+		text.append(f"BT /F1 {size} Tf {MARGIN} {y} Td ({_pdf_text(value)}) Tj ET")
+		y -= size + 1
+	return zlib.compress(f"{bars}\n{' '.join(text)}".encode("latin-1"), 1)
+
+
+def iter_pdf(labels):
+	"""A PDF with one page per label, produced chunk by chunk with its xref built as it goes."""
+	# objects: 1 catalog, 2 page tree, 3 font, then a page and its content stream per label
+	page_ids = [4 + 2 * i for i in range(len(labels))]
+	offsets, position = [], 0
+
+	def emit(*objects):
+		nonlocal position
+		out = bytearray()
+		if not offsets:
+			out += b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"
+		for body in objects:
+			offsets.append(position + len(out))
+			out += f"{len(offsets)} 0 obj\n".encode() + body + b"\nendobj\n"
+		position += len(out)
+		return bytes(out)
+
+	yield emit(
+		b"<< /Type /Catalog /Pages 2 0 R >>",
+		f"<< /Type /Pages /Count {len(labels)} /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] >>".encode(),
+		b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+	)
+	for start in range(0, len(labels), CHUNK_SIZE):
+		chunk = labels[start : start + CHUNK_SIZE]
+		objects = []
+		for label, widths in zip(chunk, encode_code128([label["barcode"] for label in chunk]), strict=True):
+			content_id = len(offsets) + len(objects) + 2
+			objects.append(
+				(
+					f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+					f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+				).encode()
+			)
+			stream = _page_content(label, _bar_operators(widths))
+			objects.append(
+				f"<< /Length {len(stream)} /Filter /FlateDecode >>\nstream\n".encode()
+				+ stream
+				+ b"\nendstream"
+			)
+		yield emit(*objects)
+
+	xref = [f"xref\n0 {len(offsets) + 1}\n0000000000 65535 f \n"]
+	xref.extend(f"{offset:010d} 00000 n \n" for offset in offsets)
+	xref.append(f"trailer\n<< /Size {len(offsets) + 1} /Root 1 0 R >>\nstartxref\n{position}\n%%EOF\n")
+	yield "".join(xref).encode()
+
+
+def iter_labels(labels, fmt=ZPL):
+	if fmt not in FORMATS:
+		frappe.throw(_("Label format must be one of {0}").format(", ".join(FORMATS)))
+	return iter_zpl(labels) if fmt == ZPL else iter_pdf(labels)
+
+
+# Sinks
+
+
+class SocketSink:
+	"""Raw TCP connection to a label printer (`host:port`, usually port 9100)."""
+
+	def __init__(self, address):
+		host, _sep, port = address.rpartition(":")
+		self.address = (host, int(port))
+
+	def __enter__(self):
+		self.connection = socket.create_connection(self.address, timeout=PRINTER_TIMEOUT)
+		return self
+
+	def write(self, chunk):
+		self.connection.sendall(chunk)
+
+	def __exit__(self, *exc_info):
+		self.connection.close()
+
+
+class FileSink:
+	def __init__(self, path):
+		self.path = path
+
+	def __enter__(self):
+		self.file = open(self.path, "wb")
+		return self
+
+	def write(self, chunk):
+		self.file.write(chunk)
+
+	def __exit__(self, *exc_info):
+		self.file.close()
+
+
+class FakePrinter(socketserver.ThreadingTCPServer):
+	"""A local stand-in for a raw-socket printer that counts the bytes and ZPL labels it receives.
+
+	with FakePrinter() as printer:
+		result = stream_labels(labels, ZPL, SocketSink(printer.address))
+		printer.wait_for(result["bytes"])
+	"""
+
+	allow_reuse_address = True
+	daemon_threads = True
+
+	def __init__(self, host="127.0.0.1", port=0):
+		super().__init__((host, port), _FakePrinterHandler)
+		self.bytes = self.labels = 0
+		self.received = threading.Condition()
+
+	@property
+	def address(self):
+		host, port = self.server_address[:2]
+		return f"{host}:{port}"
+
+	def __enter__(self):
+		threading.Thread(target=self.serve_forever, daemon=True).start()
+		return self
+
+	def __exit__(self, *exc_info):
+		self.shutdown()
+		self.server_close()
+
+	def wait_for(self, size, timeout=PRINTER_TIMEOUT):
+		"""Block until `size` bytes have arrived; False on timeout."""
+		with self.received:
+			return self.received.wait_for(lambda: self.bytes >= size, timeout=timeout)
+
+
+class _FakePrinterHandler(socketserver.BaseRequestHandler):
+	def handle(self):
+		tail, server = b"", self.server
+		while chunk := self.request.recv(65536):
+			data = tail + chunk
+			with server.received:
+				server.bytes += len(chunk)
+				server.labels += data.count(b"^XZ")
+				server.received.notify_all()
+			# keep a partial "^XZ" for the next read without counting a whole one twice
+			tail = b"" if data.endswith(b"^XZ") else data[-2:]
+
+
+# Entry points
+
+
+def stream_labels(labels, fmt, sink):
+	"""Render `labels` into `sink`; returns labels, bytes and render time."""
+	start, size = time.perf_counter(), 0
+	with sink:
+		for chunk in iter_labels(labels, fmt):
+			sink.write(chunk)
+			size += len(chunk)
+	return {"labels": len(labels), "format": fmt, "bytes": size, "ms": (time.perf_counter() - start) * 1000}
+
+
+def get_printer_address(printer):
+	printers = frappe.conf.get("adi_lims_label_printers") or {}
+	if printer not in printers:
+		frappe.throw(_("Label printer {0} is not configured").format(printer))
+	return printers[printer]
+
+
+def print_labels(printer, samples=None, from_sample=None, to_sample=None, fmt=ZPL):
+	"""Send the labels of the samples to a configured printer."""
+	frappe.has_permission("Sample", "read", throw=True)
+	labels = get_label_rows(samples, from_sample, to_sample)
+	return stream_labels(labels, fmt, SocketSink(get_printer_address(printer)))
+
+
+def render_labels(samples=None, from_sample=None, to_sample=None, fmt=ZPL):
+	"""(filename, bytes) of the labels of the samples, for download."""
+	frappe.has_permission("Sample", "read", throw=True)
+	labels = get_label_rows(samples, from_sample, to_sample)
+	content = b"".join(iter_labels(labels, fmt))
+	return f"labels-{labels[0]['barcode'] if labels else 'empty'}.{fmt}", content
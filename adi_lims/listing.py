@@ -0,0 +1,171 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Keyset-paginated listings.
+
+Pages are ordered by (creation desc, name desc) and continue from an opaque
+cursor instead of an OFFSET, so page 5,000 costs the same as page 1. Rows are
+read with `frappe.get_list`, so User Permissions and permission query
+conditions apply as they do on the desk list. Totals are either exact counts
+cached per doctype, filter hash and permission condition (dropped when a row
+is inserted, deleted or changes status) or an estimate read from table
+statistics.
+"""
+
+import base64
+import hashlib
+import json
+
+import frappe
+from frappe import _
+from frappe.model.db_query import DatabaseQuery
+
+from adi_lims.perf import record_cache
+
+DEFAULT_PAGE_LENGTH = 20
+MAX_PAGE_LENGTH = 500
+COUNT_CACHE_TTL = 300
+
+COUNT_EXACT = "exact"
+COUNT_ESTIMATE = "estimate"
+
+
+def encode_cursor(*values):
+	"""Return an opaque cursor for the last row of a page."""
+	payload = json.dumps([str(value) for value in values], separators=(",", ":"))
+	return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor):
+	"""Inverse of `encode_cursor`."""
+	try:
+		return json.loads(base64.urlsafe_b64decode(cursor.encode()))
+	except Exception:
+		frappe.throw(_("Invalid cursor"))
+
+
+def get_permission_condition(doctype):
+	"""The current user's User Permission and permission_query_conditions on `doctype` as SQL ("" if none).
+
+	Columns are qualified with `tab<doctype>`, so the condition fits a query
+	that reads that table unaliased.
+	"""
+	return DatabaseQuery(doctype).build_match_conditions()
+
+
+def get_page_length(page_len, default=DEFAULT_PAGE_LENGTH):
+	return min(max(frappe.utils.cint(page_len) or default, 1), MAX_PAGE_LENGTH)
+
+
+def get_filter_list(filters):
+	"""`filters` (a dict or a list) as a list of [field, operator, value] that more conditions can join."""
+	if isinstance(filters, dict):
+		return [
+			[field, *value] if isinstance(value, list | tuple) else [field, "=", value]
+			for field, value in filters.items()
+		]
+	return list(filters or [])
+
+
+def get_cursor_filters(filters, cursor):
+	"""(filters, or_filters) for the rows after `cursor`.
+
+	creation < c or (creation = c and name < n), in the AND-of-ORs form
+	get_list accepts: creation <= c and (creation < c or name < n).
+	"""
+	creation, name = decode_cursor(cursor)
+	return [*filters, ["creation", "<=", creation]], [["creation", "<", creation], ["name", "<", name]]
+
+
+def get_listing(
+	doctype, fields, filters=None, cursor=None, page_len=DEFAULT_PAGE_LENGTH, count=COUNT_EXACT, start=0
+):
+	"""Return one page of `doctype` plus `next_cursor` and a total count.
+
+	:param count: "exact" (cached), "estimate" (table statistics when unfiltered)
+		or a falsy value to skip counting.
+	:param start: deprecated OFFSET for callers that predate cursors; ignored
+		when `cursor` is passed.
+	"""
+	frappe.has_permission(doctype, "read", throw=True)
+
+	filters = get_filter_list(frappe.parse_json(filters) if filters else [])
+	page_len = get_page_length(page_len)
+
+	fields = fields if "creation" in fields else [*fields, "creation"]
+	page_filters, or_filters = get_cursor_filters(filters, cursor) if cursor else (filters, None)
+	rows = frappe.get_list(
+		doctype,
+		fields=fields,
+		filters=page_filters,
+		or_filters=or_filters,
+		order_by="creation desc, name desc",
+		limit_start=0 if cursor else frappe.utils.cint(start),
+		limit_page_length=page_len + 1,
+	)
+
+	next_cursor = None
+	if len(rows) > page_len:
+		rows = rows[:page_len]
+		next_cursor = encode_cursor(rows[-1].creation, rows[-1].name)
+
+	response = {"data": rows, "next_cursor": next_cursor}
+	if count == COUNT_ESTIMATE and not filters and not get_permission_condition(doctype):
+		response["total_count"] = get_estimated_count(doctype)
+		response["count_is_estimate"] = True
+	elif count:
+		response["total_count"] = get_cached_count(doctype, filters)
+		response["count_is_estimate"] = False
+	return response
+
+
+def get_estimated_count(doctype):
+	"""Approximate row count from InnoDB table statistics; no table scan."""
+	rows = frappe.db.sql(
+		"""
+		select table_rows from information_schema.tables
+		where table_schema = database() and table_name = %s
+		""",
+		(f"tab{doctype}",),
+	)
+	return frappe.utils.cint(rows[0][0]) if rows else 0
+
+
+def _count_generation_key(doctype):
+	return f"adi_lims:listing_count_generation:{doctype}"
+
+
+def get_filter_hash(doctype, filters):
+	"""Hash of `filters` and the current user's permission condition, so users who see different rows never share a count."""
+	payload = frappe.as_json([filters, get_permission_condition(doctype)], indent=None)
+	return hashlib.md5(payload.encode()).hexdigest()
+
+
+def _count_key(doctype, filters):
+	generation = frappe.cache().get_value(_count_generation_key(doctype)) or 0
+	return f"adi_lims:listing_count:{doctype}:{generation}:{get_filter_hash(doctype, filters)}"
+
+
+def get_cached_count(doctype, filters):
+	key = _count_key(doctype, filters)
+	total_count = frappe.cache().get_value(key)
+	record_cache(hit=total_count is not None)
+	if total_count is None:
+		total_count = frappe.utils.cint(
+			frappe.get_list(doctype, filters=filters, fields=["count(*) as total_count"], order_by="")[
+				0
+			].total_count
+		)
+		frappe.cache().set_value(key, total_count, expires_in_sec=COUNT_CACHE_TTL)
+	return total_count
+
+
+def invalidate_listing_counts(doc, method=None):
+	"""doc_events hook: bump the doctype's count generation so cached totals are ignored."""
+	frappe.cache().set_value(_count_generation_key(doc.doctype), frappe.generate_hash(length=10))
+
+
+def invalidate_listing_counts_on_status_change(doc, method=None):
+	"""on_update hook: status is the usual listing filter, so a status change invalidates the totals."""
+	if doc.has_value_changed("status"):
+		invalidate_listing_counts(doc)
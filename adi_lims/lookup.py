@@ -0,0 +1,139 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Master data lookups.
+
+`get_many(doctype, names, fields)` answers from two layers before touching the
+database:
+
+- a memo on `frappe.local`, so a document is read at most once per request;
+- a per-process LRU shared across requests, bounded by entry count (site
+  config `adi_lims_lookup_cache_size`) and LOOKUP_TTL seconds.
+
+Names found in neither are fetched with one IN query. Writes to a cached
+doctype bump a generation number in Redis (doc_events), which every worker
+compares before trusting its LRU, so an edit is visible on the next request.
+
+Rows are read without permission checks: callers check the doctype first.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+import frappe
+from frappe.utils import cint
+
+from adi_lims.perf import record_cache
+
+LOOKUP_TTL = 300
+DEFAULT_CACHE_SIZE = 20000
+GENERATION_KEY = "adi_lims:lookup_generation:{0}"
+
+CACHED_DOCTYPES = ("Patient", "Sample Type", "Lab Department", "Lab Test")
+
+_lru = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_cache_size():
+	return cint(frappe.conf.get("adi_lims_lookup_cache_size")) or DEFAULT_CACHE_SIZE
+
+
+def _get_generation(doctype):
+	# frappe.cache() memoizes get_value on frappe.local, so this is one Redis read per request
+	return frappe.cache().get_value(GENERATION_KEY.format(doctype)) or 0
+
+
+def _get_memo():
+	if not hasattr(frappe.local, "adi_lims_lookup"):
+		frappe.local.adi_lims_lookup = {}
+	return frappe.local.adi_lims_lookup
+
+
+def _from_lru(key, generation, fields):
+	with _lock:
+		entry = _lru.get(key)
+		if not entry:
+			return None
+		expires, entry_generation, row = entry
+		if expires < time.monotonic() or entry_generation != generation:
+			del _lru[key]
+			return None
+		if not fields.issubset(row):
+			return None
+		_lru.move_to_end(key)
+		return row
+
+
+def _to_lru(rows, generation):
+	expires, size = time.monotonic() + LOOKUP_TTL, get_cache_size()
+	with _lock:
+		for key, row in rows:
+			_lru[key] = (expires, generation, row)
+			_lru.move_to_end(key)
+		while len(_lru) > size:
+			_lru.popitem(last=False)
+
+
+def get_many(doctype, names, fields):
+	"""{name: row} for the existing documents among `names`, with `fields` (and name) set.
+
+	Every row is a fresh copy the caller may modify.
+	"""
+	names = [name for name in dict.fromkeys(names or []) if name]
+	fields = {"name", *fields}
+	memo, site = _get_memo(), frappe.local.site
+	generation = _get_generation(doctype) if doctype in CACHED_DOCTYPES else None
+
+	found, missing = {}, []
+	for name in names:
+		key = (site, doctype, name)
+		row = memo.get(key)
+		if row is not None and fields.issubset(row):
+			found[name] = row
+			continue
+		if generation is not None:
+			row = _from_lru(key, generation, fields)
+			if row is not None:
+				memo[key] = found[name] = row
+				continue
+		missing.append(name)
+	record_cache(hit=not missing)
+
+	if missing:
+		# fetch the union of what was asked before, so wider and narrower callers share rows
+		wanted = set(fields)
+		for name in missing:
+			wanted.update(memo.get((site, doctype, name)) or ())
+		fetched = []
+		for row in frappe.get_all(doctype, filters={"name": ("in", missing)}, fields=sorted(wanted)):
+			key = (site, doctype, row.name)
+			memo[key] = found[row.name] = dict(row)
+			fetched.append((key, memo[key]))
+		if generation is not None:
+			_to_lru(fetched, generation)
+
+	return {
+		name: frappe._dict({field: found[name].get(field) for field in fields})
+		for name in names
+		if name in found
+	}
+
+
+def get_one(doctype, name, fields):
+	"""Single-name `get_many`; None if the document does not exist."""
+	if not name:
+		return None
+	return get_many(doctype, [name], fields).get(name)
+
+
+def invalidate_lookup(doc, method=None, old_name=None, *args):
+	"""doc_events hook for the CACHED_DOCTYPES: drop the doctype from every worker's LRU."""
+	if method == "on_update" and not doc.get_doc_before_save():
+		# a new document cannot be in any cache yet
+		return
+	frappe.cache().set_value(GENERATION_KEY.format(doc.doctype), frappe.generate_hash(length=10))
+	memo = _get_memo()
+	for name in (doc.name, old_name):
+		memo.pop((frappe.local.site, doc.doctype, name), None)
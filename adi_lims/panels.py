@@ -0,0 +1,119 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Precomputed panel expansion.
+
+Maps a Lab Test Panel to its ordered tests with default unit and reference
+range. Entries live in a Redis hash shared by all workers and in a small
+per-worker LRU in front of it. When a panel or one of its tests changes, only
+the affected panel entries are rebuilt and the map version is bumped so
+workers drop their LRU copies; they refill from Redis, not the database.
+"""
+
+from collections import OrderedDict
+
+import frappe
+
+from adi_lims.catalog import format_reference_range, get_catalog
+from adi_lims.perf import record_cache
+
+PANEL_MAP_KEY = "adi_lims:panel_map"
+PANEL_MAP_VERSION_KEY = "adi_lims:panel_map_version"
+LRU_SIZE = 256
+
+_lru = OrderedDict()
+
+
+def _lru_get(key):
+	entry = _lru.get(key)
+	if entry is not None:
+		_lru.move_to_end(key)
+	return entry
+
+
+def _lru_set(key, entry):
+	_lru[key] = entry
+	_lru.move_to_end(key)
+	while len(_lru) > LRU_SIZE:
+		_lru.popitem(last=False)
+
+
+def build_panel_entries(panels):
+	"""Build expansion entries for `panels` with one query plus the in-process catalog."""
+	catalog = get_catalog()
+	entries = {panel: [] for panel in panels}
+	if not panels:
+		return entries
+
+	for row in frappe.get_all(
+		"Lab Test Panel Item",
+		filters={"parenttype": "Lab Test Panel", "parent": ("in", list(panels))},
+		fields=["parent", "lab_test"],
+		order_by="parent asc, idx asc",
+	):
+		normal_range = catalog.get_normal_range(row.lab_test)
+		test = catalog.get_test(row.lab_test)
+		entries[row.parent].append(
+			frappe._dict(
+				lab_test=row.lab_test,
+				test_code=test.test_code if test else None,
+				unit=normal_range.unit if normal_range else None,
+				reference_range=format_reference_range(normal_range) if normal_range else None,
+			)
+		)
+	return entries
+
+
+def get_panel_tests(panels):
+	"""panel -> ordered list of test entries (lab_test, test_code, unit, reference_range)."""
+	version = frappe.cache().get_value(PANEL_MAP_VERSION_KEY)
+	result, missing = {}, []
+	for panel in panels:
+		entry = _lru_get((frappe.local.site, panel))
+		if entry and entry[0] == version:
+			record_cache(hit=True)
+			result[panel] = entry[1]
+			continue
+
+		tests = frappe.cache().hget(PANEL_MAP_KEY, panel)
+		record_cache(hit=tests is not None)
+		if tests is None:
+			missing.append(panel)
+			continue
+		result[panel] = tests
+		_lru_set((frappe.local.site, panel), (version, tests))
+
+	if missing:
+		for panel, tests in build_panel_entries(missing).items():
+			frappe.cache().hset(PANEL_MAP_KEY, panel, tests)
+			_lru_set((frappe.local.site, panel), (version, tests))
+			result[panel] = tests
+	return result
+
+
+def rebuild_panels(panels):
+	"""Recompute the entries of `panels` in Redis and tell workers to refresh."""
+	for panel, tests in build_panel_entries(panels).items():
+		frappe.cache().hset(PANEL_MAP_KEY, panel, tests)
+	frappe.cache().set_value(PANEL_MAP_VERSION_KEY, frappe.generate_hash(length=10))
+
+
+def on_panel_update(doc, method=None, *args):
+	rebuild_panels([doc.name])
+
+
+def on_panel_trash(doc, method=None):
+	frappe.cache().hdel(PANEL_MAP_KEY, doc.name)
+	frappe.cache().set_value(PANEL_MAP_VERSION_KEY, frappe.generate_hash(length=10))
+
+
+def on_lab_test_change(doc, method=None, *args):
+	"""Rebuild only the panels that include the changed Lab Test."""
+	panels = frappe.get_all(
+		"Lab Test Panel Item",
+		filters={"parenttype": "Lab Test Panel", "lab_test": doc.name},
+		distinct=True,
+		pluck="parent",
+	)
+	if panels:
+		rebuild_panels(panels)
@@ -0,0 +1,8 @@
+import frappe
+
+
+def execute():
+	frappe.db.add_index("Sample", ["status"], index_name="status_index")
+	frappe.db.add_index(
+		"Collection Appointment", ["status", "appointment_date"], index_name="status_appointment_date_index"
+	)
@@ -0,0 +1,9 @@
+import frappe
+
+from adi_lims.archive import ARCHIVE_TABLES, archive_tables_exist
+
+
+def execute():
+	frappe.db.add_index("Sample", ["patient"], index_name="patient_index")
+	if archive_tables_exist():
+		frappe.db.sql(f"create index if not exists patient_index on `{ARCHIVE_TABLES['Sample']}` (patient)")
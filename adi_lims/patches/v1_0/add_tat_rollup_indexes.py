@@ -0,0 +1,8 @@
+import frappe
+
+
+def execute():
+	frappe.db.add_index(
+		"Lab TAT Rollup", ["stage", "tat_date", "department"], index_name="stage_date_department_index"
+	)
+	frappe.db.add_index("Lab Test Result", ["modified"], index_name="modified_index")
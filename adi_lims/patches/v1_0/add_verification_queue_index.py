@@ -0,0 +1,9 @@
+import frappe
+
+
+def execute():
+	frappe.db.add_index(
+		"Lab Test Result",
+		["status", "verification_status", "completed_on"],
+		index_name="verification_queue_index",
+	)
@@ -0,0 +1,10 @@
+import frappe
+
+from adi_lims.search import setup_search_table
+
+
+def execute():
+	setup_search_table()
+	frappe.enqueue(
+		"adi_lims.search.rebuild_search_index", queue="long", timeout=6 * 60 * 60, enqueue_after_commit=True
+	)
@@ -0,0 +1,11 @@
+import frappe
+from frappe.utils.nestedset import rebuild_tree
+
+from adi_lims.storage import recount_occupancy
+
+
+def execute():
+	rebuild_tree("Storage Location")
+	frappe.db.add_index("Storage Location", ["location_type", "lft"], index_name="location_type_lft_index")
+	frappe.db.add_index("Sample", ["storage_location"], index_name="storage_location_index")
+	recount_occupancy()
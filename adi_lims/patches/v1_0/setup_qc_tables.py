@@ -0,0 +1,8 @@
+import frappe
+
+from adi_lims.qc import setup_qc_tables
+
+
+def execute():
+	setup_qc_tables()
+	frappe.db.add_index("Lab Test Result", ["lab_test", "qc_run"], index_name="qc_run_index")
@@ -0,0 +1,8 @@
+import frappe
+
+from adi_lims.archive import setup_archive_tables
+
+
+def execute():
+	setup_archive_tables()
+	frappe.db.add_index("Sample", ["status", "modified"], index_name="status_modified_index")
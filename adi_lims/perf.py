@@ -0,0 +1,221 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Opt-in instrumentation for the whitelisted API.
+
+Enable with `bench --site <site> set-config adi_lims_perf_instrumentation 1`.
+Every call to an `@instrument`-ed endpoint then records wall time, query
+count, SQL time, response payload size and cache hits/misses into per-endpoint
+counters and a wall-time histogram in Redis. When one query shape runs more
+than `adi_lims_perf_n_plus_one_threshold` times (default 10) in a single
+call, the call is flagged as a likely N+1.
+
+Desk pages report client-side timings through `record_page_timing`; they are
+kept like an endpoint named "page:<metric>" and, for metrics with a target in
+PAGE_TIMING_TARGETS, reported with the share of page loads that met it.
+
+Read the numbers with the `get_lims_perf_stats` endpoint or
+`bench --site <site> lims-perf-stats`.
+"""
+
+import functools
+import re
+import time
+
+import frappe
+
+ENDPOINTS_KEY = "adi_lims:perf:endpoints"
+ENDPOINT_KEY = "adi_lims:perf:endpoint:{0}"
+N_PLUS_ONE_KEY = "adi_lims:perf:n_plus_one"
+N_PLUS_ONE_LOG_SIZE = 100
+DEFAULT_N_PLUS_ONE_THRESHOLD = 10
+
+# wall time histogram bucket upper bounds, in milliseconds
+HISTOGRAM_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# client-side timings accepted from desk pages, with their target in milliseconds
+# (each target is a histogram bucket bound, so the share within it is exact)
+PAGE_TIMING_TARGETS = {
+	"adilims.first_paint": 1000,
+}
+PAGE_TIMING_PREFIX = "page:"
+
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def is_enabled():
+	return bool(frappe.conf.get("adi_lims_perf_instrumentation"))
+
+
+def get_query_shape(query):
+	"""Strip literals so the same statement with different values shares a shape."""
+	shape = _STRING_LITERAL.sub("?", str(query))
+	shape = _NUMBER_LITERAL.sub("?", shape)
+	shape = _IN_LIST.sub("(?+)", shape)
+	return _WHITESPACE.sub(" ", shape).strip()
+
+
+def record_cache(hit):
+	"""Called by the LIMS caches; counts towards the current instrumented call."""
+	stats = getattr(frappe.local, "adi_lims_perf", None)
+	if stats is not None:
+		stats["cache_hits" if hit else "cache_misses"] += 1
+
+
+def instrument(fn):
+	"""Record performance counters for each call of a whitelisted function."""
+	endpoint = f"{fn.__module__}.{fn.__name__}"
+
+	@functools.wraps(fn)
+	def wrapper(*args, **kwargs):
+		if not is_enabled() or getattr(frappe.local, "adi_lims_perf", None) is not None:
+			return fn(*args, **kwargs)
+
+		stats = frappe.local.adi_lims_perf = {
+			"queries": 0,
+			"sql_ms": 0.0,
+			"cache_hits": 0,
+			"cache_misses": 0,
+			"shapes": {},
+		}
+		original_sql = frappe.db.sql
+
+		def sql(query, *sql_args, **sql_kwargs):
+			start = time.perf_counter()
+			try:
+				return original_sql(query, *sql_args, **sql_kwargs)
+			finally:
+				stats["sql_ms"] += (time.perf_counter() - start) * 1000
+				stats["queries"] += 1
+				shape = get_query_shape(query)
+				stats["shapes"][shape] = stats["shapes"].get(shape, 0) + 1
+
+		frappe.db.sql = sql
+		start = time.perf_counter()
+		try:
+			result = fn(*args, **kwargs)
+		finally:
+			wall_ms = (time.perf_counter() - start) * 1000
+			del frappe.db.sql
+			frappe.local.adi_lims_perf = None
+
+		try:
+			_record(endpoint, wall_ms, stats, len(frappe.as_json(result, indent=None)))
+		except Exception:
+			# instrumentation must never break the endpoint it measures
+			frappe.log_error(frappe.get_traceback(), "adi_lims perf instrumentation")
+		return result
+
+	return wrapper
+
+
+def _record(endpoint, wall_ms, stats, payload_bytes):
+	threshold = frappe.utils.cint(frappe.conf.get("adi_lims_perf_n_plus_one_threshold")) or (
+		DEFAULT_N_PLUS_ONE_THRESHOLD
+	)
+	repeated = {shape: count for shape, count in stats["shapes"].items() if count > threshold}
+
+	cache = frappe.cache()
+	key = cache.make_key(ENDPOINT_KEY.format(endpoint))
+	bucket = next((f"le_{bound}" for bound in HISTOGRAM_BUCKETS if wall_ms <= bound), "le_inf")
+
+	pipe = _raw_pipeline()
+	pipe.sadd(cache.make_key(ENDPOINTS_KEY), endpoint)
+	pipe.hincrby(key, "calls", 1)
+	pipe.hincrby(key, bucket, 1)
+	pipe.hincrbyfloat(key, "wall_ms", wall_ms)
+	pipe.hincrby(key, "queries", stats["queries"])
+	pipe.hincrbyfloat(key, "sql_ms", stats["sql_ms"])
+	pipe.hincrby(key, "payload_bytes", payload_bytes)
+	pipe.hincrby(key, "cache_hits", stats["cache_hits"])
+	pipe.hincrby(key, "cache_misses", stats["cache_misses"])
+	if repeated:
+		pipe.hincrby(key, "n_plus_one", 1)
+		for shape, count in repeated.items():
+			pipe.lpush(
+				cache.make_key(N_PLUS_ONE_KEY),
+				frappe.as_json({"endpoint": endpoint, "count": count, "query": shape[:500]}, indent=None),
+			)
+		pipe.ltrim(cache.make_key(N_PLUS_ONE_KEY), 0, N_PLUS_ONE_LOG_SIZE - 1)
+	pipe.execute()
+
+
+def record_page_timing(metric, ms):
+	"""Record a timing measured in the browser, e.g. the first paint of the adilims page."""
+	if not is_enabled() or metric not in PAGE_TIMING_TARGETS:
+		return
+	wall_ms = min(max(float(ms), 0.0), 10 * 60 * 1000)
+	cache = frappe.cache()
+	key = cache.make_key(ENDPOINT_KEY.format(PAGE_TIMING_PREFIX + metric))
+	bucket = next((f"le_{bound}" for bound in HISTOGRAM_BUCKETS if wall_ms <= bound), "le_inf")
+
+	pipe = _raw_pipeline()
+	pipe.sadd(cache.make_key(ENDPOINTS_KEY), PAGE_TIMING_PREFIX + metric)
+	pipe.hincrby(key, "calls", 1)
+	pipe.hincrby(key, bucket, 1)
+	pipe.hincrbyfloat(key, "wall_ms", wall_ms)
+	pipe.execute()
+
+
+def _raw_pipeline():
+	"""A plain redis pipeline: keys are site-prefixed here, values are not pickled."""
+	return frappe.cache().pipeline()
+
+
+def get_perf_stats():
+	"""Per-endpoint totals, averages and wall-time histogram, plus recent N+1 reports."""
+	cache = frappe.cache()
+	pipe = _raw_pipeline()
+	pipe.smembers(cache.make_key(ENDPOINTS_KEY))
+	pipe.lrange(cache.make_key(N_PLUS_ONE_KEY), 0, -1)
+	members, n_plus_one = pipe.execute()
+	endpoint_names = sorted(member.decode() for member in members)
+
+	pipe = _raw_pipeline()
+	for endpoint in endpoint_names:
+		pipe.hgetall(cache.make_key(ENDPOINT_KEY.format(endpoint)))
+
+	endpoints = {}
+	for endpoint, raw in zip(endpoint_names, pipe.execute(), strict=True):
+		raw = {field.decode(): float(value) for field, value in raw.items()}
+		calls = raw.get("calls") or 0
+		if not calls:
+			continue
+		endpoints[endpoint] = {
+			"calls": int(calls),
+			"avg_ms": raw.get("wall_ms", 0) / calls,
+			"avg_queries": raw.get("queries", 0) / calls,
+			"avg_sql_ms": raw.get("sql_ms", 0) / calls,
+			"avg_payload_bytes": raw.get("payload_bytes", 0) / calls,
+			"cache_hits": int(raw.get("cache_hits", 0)),
+			"cache_misses": int(raw.get("cache_misses", 0)),
+			"n_plus_one_calls": int(raw.get("n_plus_one", 0)),
+			"histogram": {
+				f"le_{bound}": int(raw.get(f"le_{bound}", 0)) for bound in (*HISTOGRAM_BUCKETS, "inf")
+			},
+		}
+
+	for metric, target in PAGE_TIMING_TARGETS.items():
+		stats = endpoints.get(PAGE_TIMING_PREFIX + metric)
+		if stats:
+			within = sum(stats["histogram"][f"le_{bound}"] for bound in HISTOGRAM_BUCKETS if bound <= target)
+			stats["target_ms"] = target
+			stats["within_target"] = within / stats["calls"]
+
+	return {"endpoints": endpoints, "n_plus_one": [frappe.parse_json(item.decode()) for item in n_plus_one]}
+
+
+def reset_perf_stats():
+	cache = frappe.cache()
+	pipe = _raw_pipeline()
+	pipe.smembers(cache.make_key(ENDPOINTS_KEY))
+	(members,) = pipe.execute()
+
+	keys = [cache.make_key(ENDPOINT_KEY.format(member.decode())) for member in members]
+	keys += [cache.make_key(ENDPOINTS_KEY), cache.make_key(N_PLUS_ONE_KEY)]
+	pipe = _raw_pipeline()
+	pipe.delete(*keys)
+	pipe.execute()
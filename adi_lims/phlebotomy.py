@@ -0,0 +1,379 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Home collection routing and slot capacity.
+
+`plan_routes` assigns a day's Scheduled home collections to phlebotomists in
+one pass: appointments are clustered by city and pincode, whole clusters go
+to the least-loaded assistant, and each assistant's stops are ordered by a
+nearest-neighbour walk that respects the booked time windows. Distances use
+latitude/longitude when set and fall back to pincode/city proximity.
+
+Booked counts per (date, slot) live in a Redis hash, so checking a slot is
+one HGET. The hash is built from one GROUP BY query the first time a date is
+read and kept current from the Collection Appointment doc_events. Booking
+reserves the slot with one atomic check-and-increment in validate, which is
+released again if the transaction rolls back; every other count change
+(cancelling, moving away from a slot, deleting) is applied after commit.
+"""
+
+import math
+from datetime import datetime, timedelta
+from functools import partial
+
+import frappe
+from frappe import _
+from frappe.utils import cint, get_time, getdate
+
+from adi_lims.realtime import UPSERT, publish_delta
+
+HOME_COLLECTION = "Home Collection"
+SCHEDULED = "Scheduled"
+CANCELLED = "Cancelled"
+
+SLOT_MINUTES = 30
+DAY_START = "07:00"
+DAY_END = "19:00"
+DEFAULT_SLOT_CAPACITY = 10
+SLOT_INDEX_KEY = "adi_lims:slots:{0}"
+SLOT_INDEX_TTL = 60 * 60
+BUILT_FIELD = "__built"
+
+# a booked time is a window of this length; stops take SERVICE_MINUTES
+WINDOW_MINUTES = 60
+SERVICE_MINUTES = 15
+SPEED_KM_PER_HOUR = 25
+SAME_PINCODE_KM = 1.5
+SAME_CITY_KM = 6.0
+OTHER_CITY_KM = 30.0
+# nearest-neighbour only looks at this many of the earliest pending windows
+CANDIDATE_WINDOW = 40
+UPDATE_CHUNK_SIZE = 1000
+
+# increments only when the date's index exists; a missing index is rebuilt on read
+_HINCRBY_IF_EXISTS = """
+if redis.call('exists', KEYS[1]) == 1 then
+	return redis.call('hincrby', KEYS[1], ARGV[1], ARGV[2])
+end
+return nil
+"""
+# takes one place in the slot if it has one free: the new count, -1 when full, nil when not indexed
+_RESERVE_IF_FREE = """
+if redis.call('exists', KEYS[1]) == 0 then
+	return nil
+end
+if tonumber(redis.call('hget', KEYS[1], ARGV[1]) or '0') >= tonumber(ARGV[2]) then
+	return -1
+end
+return redis.call('hincrby', KEYS[1], ARGV[1], 1)
+"""
+
+
+# Slot index
+
+
+def get_slot_capacity():
+	return cint(frappe.conf.get("adi_lims_slot_capacity")) or DEFAULT_SLOT_CAPACITY
+
+
+def get_slot(appointment_time):
+	"""Floor a time to its slot, as "HH:MM"."""
+	time = get_time(appointment_time)
+	minutes = (time.hour * 60 + time.minute) // SLOT_MINUTES * SLOT_MINUTES
+	return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def get_day_slots():
+	start, end = get_time(DAY_START), get_time(DAY_END)
+	minute, last = start.hour * 60 + start.minute, end.hour * 60 + end.minute
+	return [f"{m // 60:02d}:{m % 60:02d}" for m in range(minute, last, SLOT_MINUTES)]
+
+
+def _slot_key(date):
+	return frappe.cache().make_key(SLOT_INDEX_KEY.format(getdate(date)))
+
+
+def _build_slot_index(date):
+	counts = {}
+	for appointment_time, count in frappe.db.sql(
+		"""
+		select appointment_time, count(*)
+		from `tabCollection Appointment`
+		where appointment_date = %s and status != %s and appointment_time is not null
+		group by appointment_time
+		""",
+		(getdate(date), CANCELLED),
+	):
+		slot = get_slot(appointment_time)
+		counts[slot] = counts.get(slot, 0) + count
+
+	key = _slot_key(date)
+	pipe = frappe.cache().pipeline()
+	pipe.delete(key)
+	pipe.hset(key, mapping={BUILT_FIELD: 1, **counts})
+	pipe.expire(key, SLOT_INDEX_TTL)
+	pipe.execute()
+	return counts
+
+
+def get_booked(date, slot=None):
+	"""Booked count of one slot, or {slot: count} for the day; O(1) once the day is indexed."""
+	key = _slot_key(date)
+	pipe = frappe.cache().pipeline()
+	if slot:
+		pipe.hmget(key, [BUILT_FIELD, slot])
+		built, booked = pipe.execute()[0]
+		if built is None:
+			return _build_slot_index(date).get(slot, 0)
+		return cint(booked)
+
+	pipe.hgetall(key)
+	raw = pipe.execute()[0]
+	if not raw:
+		return _build_slot_index(date)
+	return {field.decode(): int(value) for field, value in raw.items() if field.decode() != BUILT_FIELD}
+
+
+def is_slot_available(date, appointment_time):
+	return get_booked(date, get_slot(appointment_time)) < get_slot_capacity()
+
+
+def get_slot_availability(date):
+	capacity, booked = get_slot_capacity(), get_booked(date)
+	return [
+		{
+			"slot": slot,
+			"capacity": capacity,
+			"booked": booked.get(slot, 0),
+			"free": max(capacity - booked.get(slot, 0), 0),
+		}
+		for slot in get_day_slots()
+	]
+
+
+def _counted_slot(doc):
+	if doc and doc.get("appointment_date") and doc.get("appointment_time") and doc.get("status") != CANCELLED:
+		return (str(getdate(doc.appointment_date)), get_slot(doc.appointment_time))
+
+
+def reserve_slot(date, slot):
+	"""Atomically take one place in `slot` if it is free; returns False when it is full."""
+	key, capacity = _slot_key(date), get_slot_capacity()
+	booked = frappe.cache().eval(_RESERVE_IF_FREE, 1, key, slot, capacity)
+	if booked is None:
+		_build_slot_index(date)
+		booked = frappe.cache().eval(_RESERVE_IF_FREE, 1, key, slot, capacity)
+	return booked is not None and booked >= 0
+
+
+def _increment_slot(date, slot, delta):
+	frappe.cache().eval(_HINCRBY_IF_EXISTS, 1, _slot_key(date), slot, delta)
+
+
+def validate_slot(doc, method=None):
+	"""doc_events validate hook: book the slot, or refuse if it is full.
+
+	The reservation is the check, so two concurrent bookings cannot both take
+	the last place; it is given back if the transaction rolls back.
+	"""
+	slot = _counted_slot(doc)
+	if not slot or slot == _counted_slot(doc.get_doc_before_save()):
+		return
+	if not reserve_slot(*slot):
+		frappe.throw(
+			_("The {0} slot on {1} is fully booked").format(slot[1], frappe.format(slot[0], "Date")),
+			title=_("Slot full"),
+		)
+	doc.flags.reserved_slot = slot
+	frappe.db.after_rollback.add(partial(_increment_slot, *slot, -1))
+
+
+def update_slot_index(doc, method=None):
+	"""doc_events on_update / on_trash hook: move the appointment's count between slots after commit.
+
+	The new slot was already counted when validate_slot reserved it.
+	"""
+	if method == "on_trash":
+		before, after = _counted_slot(doc), None
+	else:
+		before, after = _counted_slot(doc.get_doc_before_save()), _counted_slot(doc)
+	if before == after:
+		return
+
+	if before:
+		frappe.db.after_commit.add(partial(_increment_slot, *before, -1))
+	if after and doc.flags.reserved_slot != after:
+		frappe.db.after_commit.add(partial(_increment_slot, *after, 1))
+
+
+# Routing
+
+
+def _distance_km(a, b):
+	if a.latitude and a.longitude and b.latitude and b.longitude:
+		lat1, lon1, lat2, lon2 = map(math.radians, (a.latitude, a.longitude, b.latitude, b.longitude))
+		h = (
+			math.sin((lat2 - lat1) / 2) ** 2
+			+ math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+		)
+		return 6371 * 2 * math.asin(math.sqrt(h))
+	if a.cluster == b.cluster:
+		return SAME_PINCODE_KM
+	if a.city_key == b.city_key:
+		return SAME_CITY_KM
+	return OTHER_CITY_KM
+
+
+def _travel_minutes(a, b):
+	if a is None:
+		return 0
+	return _distance_km(a, b) / SPEED_KM_PER_HOUR * 60
+
+
+def load_home_collections(date):
+	rows = frappe.get_all(
+		"Collection Appointment",
+		filters={"appointment_date": getdate(date), "status": SCHEDULED, "collection_type": HOME_COLLECTION},
+		fields=[
+			"name",
+			"patient",
+			"patient_name",
+			"appointment_date",
+			"appointment_time",
+			"collection_type",
+			"status",
+			"lab_assistant",
+			"city",
+			"pincode",
+			"latitude",
+			"longitude",
+		],
+	)
+	day_start = get_time(DAY_START)
+	for row in rows:
+		time = get_time(row.appointment_time) if row.appointment_time else day_start
+		row.window_start = time.hour * 60 + time.minute
+		row.window_end = row.window_start + WINDOW_MINUTES
+		row.city_key = (row.city or "").strip().lower()
+		row.cluster = (row.city_key, (row.pincode or "").replace(" ", ""))
+	return rows
+
+
+def cluster_appointments(rows):
+	"""(city, pincode) -> appointments, largest clusters first."""
+	clusters = {}
+	for row in rows:
+		clusters.setdefault(row.cluster, []).append(row)
+	return sorted(
+		clusters.values(), key=lambda members: (-len(members), min(m.window_start for m in members))
+	)
+
+
+def assign_clusters(clusters, assistants):
+	"""Longest-processing-time-first: each cluster goes to the assistant with the fewest stops.
+
+	A cluster larger than a fair share is split in time order, so one busy
+	pincode does not swamp a single assistant.
+	"""
+	total = sum(len(members) for members in clusters)
+	fair_share = max(math.ceil(total / len(assistants)), 1)
+	loads = {assistant: [] for assistant in assistants}
+	for members in clusters:
+		members = sorted(members, key=lambda row: row.window_start)
+		for start in range(0, len(members), fair_share):
+			assistant = min(loads, key=lambda name: len(loads[name]))
+			loads[assistant].extend(members[start : start + fair_share])
+	return loads
+
+
+def order_route(stops):
+	"""Nearest-neighbour walk with time windows.
+
+	From the current stop, go to the pending stop with the earliest feasible
+	finish (travel plus any wait for its window to open) among the
+	CANDIDATE_WINDOW earliest windows; a stop whose window can no longer be met
+	is visited next and marked late rather than dropped.
+	"""
+	pending = sorted(stops, key=lambda row: (row.window_start, row.window_end))
+	clock = get_time(DAY_START).hour * 60 + get_time(DAY_START).minute
+	route, current = [], None
+	while pending:
+		best_idx, best_finish, best_arrival = None, None, None
+		for idx, stop in enumerate(pending[:CANDIDATE_WINDOW]):
+			arrival = clock + _travel_minutes(current, stop)
+			if arrival > stop.window_end:
+				# already missed: serve it now before it gets later still
+				best_idx, best_arrival = idx, arrival
+				break
+			finish = max(arrival, stop.window_start) + SERVICE_MINUTES
+			if best_finish is None or finish < best_finish:
+				best_idx, best_finish, best_arrival = idx, finish, arrival
+		stop = pending.pop(best_idx)
+		stop.arrival = max(best_arrival, stop.window_start)
+		stop.late = best_arrival > stop.window_end
+		clock = stop.arrival + SERVICE_MINUTES
+		route.append(stop)
+		current = stop
+	return route
+
+
+def plan_routes(date, assistants, commit=True):
+	"""Assign and sequence the home collections of `date`; returns a per-assistant summary."""
+	frappe.has_permission("Collection Appointment", "write", throw=True)
+	assistants = list(dict.fromkeys(assistants or frappe.conf.get("adi_lims_phlebotomists") or []))
+	if not assistants:
+		frappe.throw(_("No phlebotomists to assign, pass `assistants` or set adi_lims_phlebotomists"))
+
+	rows = load_home_collections(date)
+	routes = {
+		assistant: order_route(stops)
+		for assistant, stops in assign_clusters(cluster_appointments(rows), assistants).items()
+	}
+
+	updates = []
+	for assistant, route in routes.items():
+		for sequence, stop in enumerate(route, start=1):
+			stop.lab_assistant = assistant
+			updates.append((stop.name, assistant, sequence))
+	if commit and updates:
+		write_assignments(updates)
+		publish_delta("Collection Appointment", UPSERT, [stop.name for stop in rows])
+
+	return {
+		"date": str(getdate(date)),
+		"appointments": len(rows),
+		"routes": {
+			assistant: {
+				"stops": [stop.name for stop in route],
+				"late": sum(1 for stop in route if stop.late),
+				"finish": _format_minutes(route[-1].arrival + SERVICE_MINUTES) if route else None,
+			}
+			for assistant, route in routes.items()
+		},
+	}
+
+
+def _format_minutes(minutes):
+	return (datetime.min + timedelta(minutes=minutes)).strftime("%H:%M")
+
+
+def write_assignments(updates):
+	"""Set lab_assistant and route_sequence with one CASE update per chunk."""
+	now, user = frappe.utils.now(), frappe.session.user
+	for start in range(0, len(updates), UPDATE_CHUNK_SIZE):
+		chunk = updates[start : start + UPDATE_CHUNK_SIZE]
+		cases = " ".join(["when %s then %s"] * len(chunk))
+		values = [v for name, assistant, _sequence in chunk for v in (name, assistant)]
+		values += [v for name, _assistant, sequence in chunk for v in (name, sequence)]
+		values += [now, user]
+		values += [name for name, _assistant, _sequence in chunk]
+		frappe.db.sql(
+			f"""
+			update `tabCollection Appointment`
+			set lab_assistant = case name {cases} end,
+				route_sequence = case name {cases} end,
+				modified = %s, modified_by = %s
+			where name in ({", ".join(["%s"] * len(chunk))})
+			""",
+			values,
+		)
@@ -0,0 +1,143 @@
+// Appointments tab of the adilims page; loaded on demand (see TAB_BUNDLES in adilims.js)
+
+adi_lims.adilims.tabs.appointments = class AppointmentsTab {
+    constructor(dashboard) {
+        this.dashboard = dashboard;
+        this.wrapper = dashboard.wrapper;
+        this.state = dashboard.state;
+
+        this.wrapper.on('click', '.btn-primary[data-action="book-appointment"]', function () {
+            frappe.new_doc('Collection Appointment');
+        });
+    }
+
+    show() {
+        // Basic Layout
+        const view_template = `
+            <div class="appointment-view fade-in">
+                <div class="view-header">
+                    <div class="title-section">
+                        <h1>Appointments</h1>
+                        <p>Schedule patient tests and home collections.</p>
+                    </div>
+                    <button class="btn-primary" data-action="book-appointment"><span class="icon">+</span> Book Appointment</button>
+                </div>
+                
+                <div class="stats-row" id="appointment-stats-container">
+                    <div class="loading-state">Loading stats...</div>
+                </div>
+
+                <div class="worklist-container">
+                    <div class="worklist-header" style="border-bottom: none; padding-bottom: 0;">
+                        <div class="worklist-title"><span class="icon">📅</span> Upcoming Schedule</div>
+                    </div>
+                    
+                    <div class="worklist-table-wrapper" id="appointment-list-container">
+                        <div class="loading-state">Loading appointments...</div>
+                    </div>
+                </div>
+            </div>`;
+
+        this.wrapper.find('#content-mount-point').html(view_template);
+
+        // Load Stats
+        this.dashboard.load_stats(() => this.render_appointment_stats());
+
+        // Load List
+        this.dashboard.cache.get(
+            "appointments",
+            () => frappe.xcall("adi_lims.api.get_appointments"),
+            (appointments) => {
+                if (this.dashboard.is_active('appointments')) this.render_appointments(appointments || []);
+            }
+        );
+    }
+
+    render_state() {
+        this.render_appointment_stats();
+    }
+
+    render_appointments(appointments) {
+        let rows = '';
+        if (appointments.length === 0) {
+            rows = '<tr><td colspan="5" class="text-center">No upcoming appointments found.</td></tr>';
+        } else {
+            appointments.forEach(app => {
+                // Format Time and Date
+                const dateObj = frappe.datetime.str_to_obj(app.appointment_date);
+                const timeStr = app.appointment_time ? app.appointment_time.substring(0, 5) : '00:00'; // HH:MM
+                // Convert HH:MM to AM/PM format
+                const [hours, minutes] = timeStr.split(':');
+                const ampm = hours >= 12 ? 'PM' : 'AM';
+                const hours12 = hours % 12 || 12;
+                const formattedTime = `${hours12}:${minutes} ${ampm}`;
+                const formattedDate = dateObj ? frappe.datetime.obj_to_user(dateObj) : app.appointment_date;
+
+                rows += `
+                    <tr>
+                        <td>
+                            <div class="time-main">${formattedTime}</div>
+                            <div class="date-sub">${formattedDate}</div>
+                        </td>
+                        <td>
+                            <div class="patient-name">${app.patient_name || 'Unknown'}</div>
+                            <div class="patient-uhid">${app.patient || '-'}</div>
+                        </td>
+                        <td>${app.collection_type || 'Walk-in'}</td>
+                        <td><span class="status-badge ${app.status === 'Scheduled' ? 'blue-status' : 'gray-status'}">${app.status}</span></td>
+                        <td class="text-right">
+                            <button class="icon-btn-sm"><span class="icon">...</span></button>
+                        </td>
+                    </tr>
+                `;
+            });
+        }
+
+        const table_html = `
+            <table class="worklist-table appointment-table">
+                <thead>
+                    <tr>
+                        <th>TIME / DATE</th>
+                        <th>PATIENT</th>
+                        <th>COLLECTION TYPE</th>
+                        <th>STATUS</th>
+                        <th class="text-right">ACTIONS</th>
+                    </tr>
+                </thead>
+                <tbody>${rows}</tbody>
+            </table>`;
+        this.wrapper.find('#appointment-list-container').html(table_html);
+    }
+
+    render_appointment_stats() {
+        const container = this.wrapper.find('#appointment-stats-container');
+        if (!container.length || !this.state.stats) return;
+
+        const stats = this.state.stats.appointments;
+        container.html(`
+            ${this.get_appointment_stat_card('calendar', stats.scheduled_today, 'Scheduled Today', 'blue')}
+            ${this.get_appointment_stat_card('syringe', stats.pending_collection, 'Pending Collection', 'orange')}
+            ${this.get_appointment_stat_card('check-circle', stats.completed, 'Completed', 'green')}
+        `);
+    }
+
+    get_appointment_stat_card(icon, value, label, color) {
+        let iconSvg = '';
+        // Simplified SVGs for demo
+        if (icon === 'calendar') iconSvg = '<rect x="3" y="4" width="18" height="18" rx="2" ry="2"></rect><line x1="16" y1="2" x2="16" y2="6"></line><line x1="8" y1="2" x2="8" y2="6"></line><line x1="3" y1="10" x2="21" y2="10"></line>';
+        if (icon === 'syringe') iconSvg = '<path d="m19 13.5 1.5-1.5"></path><path d="m13 7.5 1.5-1.5"></path><path d="m4.5 16 1.5 1.5"></path><path d="m17.5 12-11.5 11.5"></path><path d="m19 13.5-7.5-7.5"></path><path d="m5 18-2 3"></path><path d="m18 5 3-2"></path>';
+        if (icon === 'check-circle') iconSvg = '<path d="M22 11.08V12a10 10 0 1 1-5.93-9.14"></path><polyline points="22 4 12 14.01 9 11.01"></polyline>';
+
+        return `
+            <div class="stat-card appointment-card">
+                <div class="icon-square ${color}-bg-light">
+                    <svg width="20" height="20" viewBox="0 0 24 24" fill="none" class="${color}-stroke" stroke="currentColor" stroke-width="2">${iconSvg}</svg>
+                </div>
+                <div class="stat-content">
+                    <div class="stat-value">${value}</div>
+                    <div class="stat-label">${label}</div>
+                </div>
+            </div>
+        `;
+    }
+};
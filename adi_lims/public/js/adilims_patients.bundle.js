@@ -0,0 +1,83 @@
+// Patients tab of the adilims page; loaded on demand (see TAB_BUNDLES in adilims.js)
+
+adi_lims.adilims.tabs.patients = class PatientsTab {
+    constructor(dashboard) {
+        this.dashboard = dashboard;
+        this.wrapper = dashboard.wrapper;
+
+        this.wrapper.on('click', '.btn-primary[data-action="register-patient"]', function () {
+            frappe.new_doc('Patient');
+        });
+    }
+
+    show() {
+        this.dashboard.cache.get(
+            "patients",
+            () => frappe.xcall("adi_lims.api.get_patients_for_listing"),
+            (data) => {
+                if (this.dashboard.is_active('patients')) this.render_patients(data);
+            }
+        );
+    }
+
+    render_patients(data) {
+        if (!data || !data.data) {
+            this.wrapper.find('#content-mount-point').html(`<div style="padding: 20px; text-align: center; color: #EF4444;"><h2>Error</h2><p>Could not load patient data.</p></div>`);
+            return;
+        }
+
+        const patients = data.data;
+        let patient_rows = '';
+        if (patients.length === 0) {
+            patient_rows = '<tr><td colspan="6" class="text-center">No patients found.</td></tr>';
+        } else {
+            patients.forEach(patient => {
+                const avatar_initial = (patient.first_name || patient.name || 'U').charAt(0).toUpperCase();
+                const gender_initial = patient.gender ? patient.gender.charAt(0).toUpperCase() : '';
+                const dob_year = patient.dob ? new Date(patient.dob).getFullYear() : '';
+                const current_year = new Date().getFullYear();
+                const age = dob_year ? current_year - dob_year : '';
+
+                patient_rows += `
+                    <tr>
+                        <td><div class="avatar s-avatar">${avatar_initial}</div></td>
+                        <td><div class="patient-name">${patient.first_name || ''} ${patient.last_name || patient.name || ''}</div><div class="patient-uhid">${patient.name}</div></td>
+                        <td>${age} Y / ${gender_initial}</td>
+                        <td><div class="contact-info"><span class="icon">📞</span> ${patient.mobile_no || 'N/A'}</div></td>
+                        <td>${frappe.datetime.global_date_and_time_to_user(patient.modified).split(' ')[0]}</td>
+                        <td class="text-right"><a href="#Form/Patient/${patient.name}" class="btn-view">View</a></td>
+                    </tr>
+                `;
+            });
+        }
+
+        const patients_view = `
+        <div class="patient-view fade-in">
+            <div class="view-header">
+                <div class="title-section">
+                    <h1>Patient Management</h1>
+                    <p>Directory of all registered patients.</p>
+                </div>
+                <div class="header-actions">
+                    <button class="btn-primary" data-action="register-patient"><span class="icon">+</span> Register Patient</button>
+                </div>
+            </div>
+            <div class="view-controls">
+                <div class="search-bar">
+                    <span class="search-icon"><svg width="16" height="16" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2"><circle cx="11" cy="11" r="8"></circle><line x1="21" y1="21" x2="16.65" y2="16.65"></line></svg></span>
+                    <input type="text" placeholder="Search patients...">
+                </div>
+                <button class="btn-filter"><svg width="16" height="16" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2"><polygon points="22 3 2 3 10 12.46 10 19 14 21 14 12.46 22 3"></polygon></svg></button>
+            </div>
+            <div class="patient-table-container">
+                <table class="patient-table">
+                    <thead><tr><th style="width: 50px;"></th><th>NAME / UHID</th><th>DEMOGRAPHICS</th><th>CONTACT</th><th>LAST VISIT</th><th style="text-align: right">ACTIONS</th></tr></thead>
+                    <tbody>
+                        ${patient_rows}
+                    </tbody>
+                </table>
+            </div>
+        </div>`;
+        this.wrapper.find('#content-mount-point').html(patients_view);
+    }
+};
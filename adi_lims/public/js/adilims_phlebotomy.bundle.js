@@ -0,0 +1,100 @@
+// Phlebotomy tab of the adilims page; loaded on demand (see TAB_BUNDLES in adilims.js)
+
+adi_lims.adilims.tabs.phlebotomy = class PhlebotomyTab {
+    constructor(dashboard) {
+        this.dashboard = dashboard;
+        this.wrapper = dashboard.wrapper;
+        this.state = dashboard.state;
+
+        this.wrapper.on('click', '.btn-collect-sample', function () {
+            const appointment_name = $(this).data('name');
+            // Logic to open collection form or confirm action
+            frappe.msgprint(`Initiating collection for ${appointment_name}`);
+            // Ideally: frappe.set_route('Form', 'Collection Appointment', appointment_name);
+        });
+    }
+
+    show() {
+        // Basic Layout
+        const view_template = `
+            <div class="phlebotomy-view fade-in">
+                <div class="view-header">
+                    <div class="title-section">
+                        <h1>Phlebotomy Queue</h1>
+                        <p>Pending sample collections for scheduled patients.</p>
+                    </div>
+                </div>
+                
+                <div class="phlebotomy-grid" id="phlebotomy-queue-container">
+                    <div class="loading-state">Loading queue...</div>
+                </div>
+            </div>`;
+
+        this.wrapper.find('#content-mount-point').html(view_template);
+
+        // The queue is kept current by realtime deltas; reload it only once it is stale
+        this.render_phlebotomy_queue();
+        if (!this.state.phlebotomy || Date.now() - this.state.phlebotomy_loaded_at > adi_lims.adilims.FRESH_FOR_MS) {
+            frappe.call({
+                method: "adi_lims.api.get_phlebotomy_queue",
+                callback: (r) => {
+                    this.state.phlebotomy = r.message || [];
+                    this.state.phlebotomy_loaded_at = Date.now();
+                    this.render_phlebotomy_queue();
+                }
+            });
+        }
+    }
+
+    render_state() {
+        this.render_phlebotomy_queue();
+    }
+
+    render_phlebotomy_queue() {
+        const container = this.wrapper.find('#phlebotomy-queue-container');
+        if (!container.length || !this.state.phlebotomy) return;
+
+        let cards_html = '';
+        if (this.state.phlebotomy.length === 0) {
+            cards_html = '<div class="empty-state">No pending collections.</div>';
+        } else {
+            this.state.phlebotomy.forEach(item => {
+                cards_html += this.get_phlebotomy_card(item);
+            });
+        }
+        container.html(cards_html);
+    }
+
+    get_phlebotomy_card(data) {
+        // Format Time
+        const timeStr = data.appointment_time ? data.appointment_time.substring(0, 5) : '00:00';
+        const [hours, minutes] = timeStr.split(':');
+        const ampm = hours >= 12 ? 'PM' : 'AM';
+        const hours12 = hours % 12 || 12;
+        const formattedTime = `${hours12}:${minutes} ${ampm}`;
+        const avatar_initial = (data.patient_name || 'U').charAt(0).toUpperCase();
+
+        return `
+            <div class="phlebotomy-card">
+                <div class="card-header">
+                    <div class="avatar-circle">${avatar_initial}</div>
+                    <div class="time-pill">${formattedTime}</div>
+                </div>
+                <div class="card-body">
+                    <div class="patient-name">${data.patient_name}</div>
+                    <div class="patient-uhid">${data.patient}</div>
+                    
+                    <div class="test-section">
+                        <div class="test-label">TEST REQUESTED</div>
+                        <div class="test-value">${data.collection_type || 'Standard Panel'}</div>
+                    </div>
+                </div>
+                <div class="card-footer">
+                     <button class="btn-dark-full btn-collect-sample" data-name="${data.name}">
+                        <span class="icon">💉</span> Collect Sample
+                     </button>
+                </div>
+            </div>
+        `;
+    }
+};
@@ -0,0 +1,52 @@
+// Reports tab of the adilims page; loaded on demand (see TAB_BUNDLES in adilims.js)
+
+adi_lims.adilims.tabs.reports = class ReportsTab {
+    constructor(dashboard) {
+        this.dashboard = dashboard;
+        this.wrapper = dashboard.wrapper;
+
+        this.wrapper.on('click', '.btn-print-report', function () {
+            frappe.set_route('Form', 'Sample', $(this).data('name'));
+        });
+    }
+
+    show() {
+        this.dashboard.cache.get(
+            "pending_reports",
+            () => frappe.xcall("adi_lims.api.get_pending_reports"),
+            (reports) => {
+                if (this.dashboard.is_active('reports')) this.render_reports(reports || []);
+            }
+        );
+    }
+
+    render_reports(reports) {
+        let rows = '';
+        if (reports.length === 0) {
+            rows = '<tr><td colspan="4" class="text-center">No reports ready for printing.</td></tr>';
+        } else {
+            reports.forEach(rep => {
+                rows += `
+                    <tr>
+                        <td>${rep.patient_name || 'Unknown'}</td>
+                        <td>${rep.template_name || rep.test_name || 'Lab Test'}</td>
+                        <td>${frappe.datetime.str_to_user(rep.verified_on || rep.creation)}</td>
+                        <td class="text-right"><button class="btn-sm btn-white btn-print-report" data-name="${rep.name}">Print</button></td>
+                    </tr>
+                `;
+            });
+        }
+
+        const view = `
+            <div class="fade-in">
+                <div class="view-header"><h1>Reports</h1><p>Fully verified samples ready for printing.</p></div>
+                <div class="worklist-container" style="margin-top:0">
+                    <table class="worklist-table">
+                        <thead><tr><th>PATIENT</th><th>TEST</th><th>DATE</th><th class="text-right">ACTIONS</th></tr></thead>
+                        <tbody>${rows}</tbody>
+                    </table>
+                </div>
+            </div>`;
+        this.wrapper.find('#content-mount-point').html(view);
+    }
+};
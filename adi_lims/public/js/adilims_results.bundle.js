@@ -0,0 +1,180 @@
+// Test Results Entry tab of the adilims page; loaded on demand (see TAB_BUNDLES in adilims.js)
+
+adi_lims.adilims.tabs.test_results_entry = class ResultsTab {
+    constructor(dashboard) {
+        this.dashboard = dashboard;
+        this.wrapper = dashboard.wrapper;
+
+        const that = this;
+        this.wrapper.on('click', '.result-list-item', function () {
+            that.wrapper.find('.result-list-item').removeClass('active');
+            $(this).addClass('active');
+            that.render_result_entry_form($(this).data('sample'));
+        });
+    }
+
+    show() {
+        // Split Layout matching mockup
+        const view_template = `
+        <div class="test-results-view-split fade-in">
+            <!-- Left Sidebar -->
+            <div class="results-sidebar">
+                <div class="sidebar-header-search">
+                    <span class="icon">📝</span> Pending Results
+                </div>
+                <div class="sidebar-list-container" id="results-sidebar-list">
+                    <div class="loading-state-sm">Loading...</div>
+                </div>
+            </div>
+
+            <!-- Right Main Content -->
+            <div class="results-main-content">
+                <div id="results-empty-state" class="empty-state-results">
+                    <div class="empty-icon">⚗️</div>
+                    <h3>Select a sample to enter results</h3>
+                </div>
+                <div id="results-entry-form-container" class="results-form-wrapper" style="display: none;">
+                    <!-- Form loaded here -->
+                </div>
+            </div>
+        </div>`;
+
+        this.wrapper.find('#content-mount-point').html(view_template);
+        this.load_samples_for_result_entry();
+    }
+
+    load_samples_for_result_entry() {
+        this.dashboard.cache.get(
+            "result_entry",
+            () => frappe.xcall("adi_lims.api.get_samples_for_result_entry"),
+            (samples) => {
+                if (this.dashboard.is_active('test_results_entry')) this.render_sample_list(samples || []);
+            }
+        );
+    }
+
+    render_sample_list(samples) {
+        const listContainer = this.wrapper.find('#results-sidebar-list');
+        const selected = listContainer.find('.result-list-item.active').data('sample-name');
+        listContainer.empty();
+
+        if (samples.length === 0) {
+            listContainer.html('<div class="empty-list-msg">No pending results.</div>');
+            return;
+        }
+
+        samples.forEach(sample => {
+            // Extract test names for preview
+            const testNames = sample.sample_test_results ?
+                sample.sample_test_results.map(t => t.lab_test).join(', ') : 'No Tests';
+
+            const listItem = `
+                <div class="result-list-item ${sample.name === selected ? 'active' : ''}" data-sample-name="${sample.name}">
+                    <div class="item-header">
+                        <div class="patient-name">${sample.patient_name || 'Unknown'}</div>
+                        <span class="status-badge-sm blue-status">${sample.status === 'In-Progress' ? 'ACCESSIONED' : 'PROCESSING'}</span>
+                    </div>
+                    <div class="item-sub">
+                        <div class="uhid-text">${sample.name}</div>
+                    </div>
+                    <div class="item-tests">
+                        ${testNames}
+                    </div>
+                </div>
+            `;
+            const $item = $(listItem);
+
+            // Store sample data for click handler
+            $item.data('sample', sample);
+            listContainer.append($item);
+        });
+    }
+
+    render_result_entry_form(sample) {
+        const that = this;
+        const container = this.wrapper.find('#results-entry-form-container');
+        const emptyState = this.wrapper.find('#results-empty-state');
+
+        // Hide empty state, show form
+        emptyState.hide();
+        container.show();
+
+        let tests_html = '';
+        if (sample.sample_test_results) {
+            sample.sample_test_results.forEach(test => {
+                tests_html += `
+                    <div class="result-entry-row">
+                        <div class="test-meta">
+                            <div class="test-name">${test.lab_test}</div>
+                            <div class="test-range">Results</div>
+                        </div>
+                        <div class="result-input-group">
+                            <input type="text" class="form-control result-input" 
+                                value="${test.result_value || ''}" 
+                                placeholder="Enter Value"
+                                data-name="${test.name}">
+                            <span class="unit-label">${test.unit || ''}</span>
+                        </div>
+                        <div class="reference-range">
+                            Normal: ${test.reference_range || 'N/A'}
+                        </div>
+                        <button class="btn-icon-save save-single-result" data-name="${test.name}">
+                            <span class="icon">💾</span>
+                        </button>
+                    </div>
+                `;
+            });
+        }
+
+        const form_html = `
+            <div class="result-form-header">
+                <div class="header-left">
+                    <h2>${sample.patient_name || 'Unknown'}</h2>
+                    <div class="sub-ids">
+                        <span class="badge-gray">${sample.name}</span>
+                        <span class="sep">•</span>
+                        <span class="text-muted">${sample.sample_type || 'Sample'}</span>
+                    </div>
+                </div>
+                <div class="header-actions">
+                    <button class="btn-primary" id="save-all-results">Save All</button>
+                </div>
+            </div>
+            
+            <div class="result-form-body">
+                ${tests_html}
+            </div>
+        `;
+
+        container.html(form_html);
+
+        // Bind Save Events
+        container.find('.save-single-result').on('click', function () {
+            const btn = $(this);
+            const name = btn.data('name');
+            const val = btn.siblings('.result-input-group').find('.result-input').val();
+            that.save_test_result(name, val, btn);
+        });
+    }
+
+    save_test_result(name, value, btn) {
+        frappe.call({
+            method: "adi_lims.api.update_test_result",
+            args: {
+                test_result_name: name,
+                result_value: value
+            },
+            callback: (r) => {
+                if (r.message && r.message.status === 'success') {
+                    // The pending list changed; fetch it again the next time it is shown
+                    this.dashboard.cache.invalidate("result_entry");
+                    frappe.show_alert({ message: 'Saved', indicator: 'green' });
+                    if (btn) {
+                        btn.addClass('saved').html('<span class="icon">✓</span>');
+                        setTimeout(() => btn.removeClass('saved').html('<span class="icon">💾</span>'), 2000);
+                    }
+                }
+            }
+        });
+    }
+};
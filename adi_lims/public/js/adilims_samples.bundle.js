@@ -0,0 +1,264 @@
+// Sample Management tab of the adilims page; loaded on demand (see TAB_BUNDLES in adilims.js)
+
+adi_lims.adilims.tabs.samples = class SamplesTab {
+    constructor(dashboard) {
+        this.dashboard = dashboard;
+        this.wrapper = dashboard.wrapper;
+        this.state = dashboard.state;
+
+        const that = this;
+        this.wrapper.on('click', '.sample-management-view .filter-tab', function () {
+            that.wrapper.find('.filter-tab').removeClass('active');
+            $(this).addClass('active');
+            that.load_sample_worklist($(this).data('status'));
+        });
+        this.wrapper.on('click', '.sample-view .btn-primary[data-action="register-sample"]', () => {
+            frappe.new_doc('Sample');
+        });
+        this.wrapper.on('click', '[data-action="create-dummy-sample"]', () => this.create_dummy_sample());
+    }
+
+    show() {
+        const view_template = `
+            <div class="sample-management-view fade-in">
+                <div class="view-header">
+                    <div class="title-section">
+                        <h1>Sample Management</h1>
+                        <p>Manage accessioning, rejection, and chain of custody.</p>
+                    </div>
+                    <button class="btn-dark" id="scan-barcode-btn"><span class="icon">⤡</span> Scan Barcode</button>
+                </div>
+                
+                <div class="stats-row" id="sample-stats-container">
+                    <!-- Stats will be loaded here -->
+                    <div class="loading-state">Loading stats...</div>
+                </div>
+
+                <div class="worklist-container">
+                    <div class="worklist-header">
+                        <div class="worklist-title"><span class="icon">Y</span> Worklist</div>
+                        <div class="worklist-filters">
+                            <button class="filter-tab" data-status="All">All</button>
+                            <button class="filter-tab" data-status="Pending">Pending</button>
+                        </div>
+                    </div>
+                    
+                    <div class="worklist-table-wrapper" id="sample-worklist-container">
+                        <!-- Table will be loaded here -->
+                        <div class="loading-state">Loading worklist...</div>
+                    </div>
+                </div>
+            </div>`;
+
+        this.wrapper.find('#content-mount-point').html(view_template);
+
+        // Load Stats
+        this.dashboard.load_stats(() => this.render_sample_stats());
+
+        // A loaded worklist is kept current by realtime deltas: show it at once and
+        // only reload it (stale-while-revalidate) once it is older than FRESH_FOR_MS
+        const worklist = this.state.worklist;
+        const status = worklist ? worklist.status : "All";
+        this.wrapper.find(`.filter-tab[data-status='${status}']`).addClass('active');
+        if (worklist) this.render_sample_worklist();
+        if (!worklist || Date.now() - worklist.loaded_at > adi_lims.adilims.FRESH_FOR_MS) {
+            this.load_sample_worklist(status);
+        }
+    }
+
+    render_state() {
+        this.render_sample_stats();
+        this.render_sample_worklist();
+    }
+
+    render_sample_stats() {
+        const container = this.wrapper.find('#sample-stats-container');
+        if (!container.length || !this.state.stats) return;
+
+        const stats = this.state.stats.samples;
+        container.html(`
+            ${this.get_sample_stat_card('Pending Accession', stats["Received"], 'orange', 'clock')}
+            ${this.get_sample_stat_card('Accessioned', stats["In-Progress"], 'blue', 'beaker')}
+            ${this.get_sample_stat_card('Processing', stats["Analyzed"], 'purple', 'activity')}
+            ${this.get_sample_stat_card('Rejected', stats["Rejected"], 'red', 'alert')}
+        `);
+    }
+
+    get_sample_stat_card(label, count, color, icon) {
+        let iconSvg = '';
+        if (icon === 'clock') iconSvg = '<circle cx="12" cy="12" r="10"></circle><polyline points="12 6 12 12 16 14"></polyline>';
+        if (icon === 'beaker') iconSvg = '<path d="M4.5 3h15"></path><path d="M6 3v16a2 2 0 0 0 2 2h8a2 2 0 0 0 2-2V3"></path><line x1="6" y1="11" x2="18" y2="11"></line>';
+        if (icon === 'activity') iconSvg = '<polyline points="22 12 18 12 15 21 9 3 6 12 2 12"></polyline>';
+        if (icon === 'alert') iconSvg = '<circle cx="12" cy="12" r="10"></circle><line x1="12" y1="8" x2="12" y2="12"></line><line x1="12" y1="16" x2="12.01" y2="16"></line>';
+
+        return `
+            <div class="stat-card sample-stat-card">
+                <div class="icon-circle ${color}-bg">
+                    <svg width="20" height="20" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2">${iconSvg}</svg>
+                </div>
+                <div class="stat-details">
+                    <div class="stat-count">${count}</div>
+                    <div class="stat-label">${label}</div>
+                </div>
+            </div>
+        `;
+    }
+
+    load_sample_worklist(status, cursor = null) {
+        frappe.call({
+            method: "adi_lims.api.get_sample_worklist",
+            args: { status: status, cursor: cursor },
+            callback: (r) => {
+                if (r.message) {
+                    const loaded = cursor && this.state.worklist ? this.state.worklist.rows : [];
+                    this.state.worklist = {
+                        status: status,
+                        rows: loaded.concat(r.message.data),
+                        next_cursor: r.message.next_cursor,
+                        loaded_at: cursor && this.state.worklist ? this.state.worklist.loaded_at : Date.now()
+                    };
+                    this.render_sample_worklist();
+                }
+            }
+        });
+    }
+
+    render_sample_worklist() {
+        const container = this.wrapper.find('#sample-worklist-container');
+        if (!container.length || !this.state.worklist) return;
+
+        const { status, rows: samples, next_cursor } = this.state.worklist;
+        let rows = '';
+        if (samples.length === 0) {
+            rows = '<tr><td colspan="5" class="text-center">No samples found.</td></tr>';
+        } else {
+            samples.forEach(sample => {
+                let action_btn = '';
+                if (sample.ui_status === 'Pending') {
+                    action_btn = `<button class="btn-sm btn-white">Accession</button>`;
+                } else if (sample.ui_status === 'Pending Accession') { // Fallback handling
+                    action_btn = `<button class="btn-sm btn-white">Accession</button>`;
+                }
+
+                rows += `
+                    <tr data-name="${sample.name}">
+                        <td><span class="status-badge ${sample.status_color}">${sample.ui_status}</span></td>
+                        <td>
+                            <div class="patient-name">${sample.patient_name || 'Unknown'}</div>
+                            <div class="patient-uhid">${sample.patient_uhid || sample.patient || '-'}</div>
+                        </td>
+                        <td>
+                            <div class="test-info">${sample.test_info || 'No Tests'}</div>
+                            <div class="sample-id">${sample.sample_name || sample.name}</div>
+                        </td>
+                        <td>${frappe.datetime.str_to_user(sample.collection_date)} <br> <span class="text-muted">08:30 AM</span></td>
+                        <td class="text-right">${action_btn}</td>
+                    </tr>
+                `;
+            });
+        }
+
+        const table_html = `
+            <table class="worklist-table">
+                <thead>
+                    <tr>
+                        <th>STATUS</th>
+                        <th>PATIENT DETAILS</th>
+                        <th>TEST INFO</th>
+                        <th>COLLECTED AT</th>
+                        <th class="text-right">ACTIONS</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    ${rows}
+                </tbody>
+            </table>
+        `;
+        container.html(table_html);
+
+        if (next_cursor) {
+            const $more = $(`<div class="worklist-load-more text-center"><button class="btn-sm btn-white">Load more</button></div>`);
+            $more.find('button').on('click', () => this.load_sample_worklist(status, next_cursor));
+            container.append($more);
+        }
+    }
+
+    create_dummy_sample() {
+        frappe.call({
+            method: "adi_lims.api.create_dummy_sample_with_tests",
+            callback: (r) => {
+                if (r.message && r.message.status === 'success') {
+                    frappe.show_alert({ message: __('Dummy sample created: ') + r.message.sample_name, indicator: 'green' });
+                    this.dashboard.cache.invalidate("sample_listing");
+                    this.show_sample_listing(); // Reload list
+                } else {
+                    frappe.show_alert({ message: __('Error creating dummy sample: ') + r.message.message, indicator: 'red' });
+                }
+            }
+        });
+    }
+
+    show_sample_listing() {
+        this.dashboard.cache.get(
+            "sample_listing",
+            () => frappe.xcall("adi_lims.api.get_samples_for_listing"),
+            (data) => {
+                if (this.dashboard.is_active('samples')) this.render_sample_listing(data);
+            }
+        );
+    }
+
+    render_sample_listing(data) {
+        if (!data || !data.data) {
+            this.wrapper.find('#content-mount-point').html(`<div style="padding: 20px; text-align: center; color: #EF4444;"><h2>Error</h2><p>Could not load sample data.</p></div>`);
+            return;
+        }
+
+        const samples = data.data;
+        let sample_rows = '';
+        if (samples.length === 0) {
+            sample_rows = '<tr><td colspan="7" class="text-center">No samples found.</td></tr>';
+        } else {
+            samples.forEach(sample => {
+                sample_rows += `
+                    <tr>
+                        <td>${sample.name}</td>
+                        <td>${sample.sample_name}</td>
+                        <td>${sample.sample_type}</td>
+                        <td>${frappe.datetime.global_date_and_time_to_user(sample.collection_date).split(' ')[0]}</td>
+                        <td>${frappe.datetime.global_date_and_time_to_user(sample.received_date).split(' ')[0]}</td>
+                        <td><span class="badge ${sample.status.toLowerCase().replace('-', '')}-status">${sample.status}</span></td>
+                        <td class="text-right"><a href="#Form/Sample/${sample.name}" class="btn-view">View</a></td>
+                    </tr>
+                `;
+            });
+        }
+
+        const samples_view = `
+        <div class="sample-view fade-in">
+            <div class="view-header">
+                <div class="title-section">
+                    <h1>Sample Management</h1>
+                    <p>Directory of all registered samples.</p>
+                </div>
+                <button class="btn-primary" data-action="register-sample"><span class="icon">+</span> Register Sample</button>
+            </div>
+            <div class="view-controls">
+                <div class="search-bar">
+                    <span class="search-icon"><svg width="16" height="16" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2"><circle cx="11" cy="11" r="8"></circle><line x1="21" y1="21" x2="16.65" y2="16.65"></line></svg></span>
+                    <input type="text" placeholder="Search samples...">
+                </div>
+                <button class="btn-filter"><svg width="16" height="16" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2"><polygon points="22 3 2 3 10 12.46 10 19 14 21 14 12.46 22 3"></polygon></svg></button>
+            </div>
+            <div class="sample-table-container">
+                <table class="sample-table">
+                    <thead><tr><th>ID</th><th>NAME</th><th>TYPE</th><th>COLLECTION DATE</th><th>RECEIVED DATE</th><th>STATUS</th><th style="text-align: right">ACTIONS</th></tr></thead>
+                    <tbody>
+                        ${sample_rows}
+                    </tbody>
+                </table>
+            </div>
+        </div>`;
+        this.wrapper.find('#content-mount-point').html(samples_view);
+    }
+};
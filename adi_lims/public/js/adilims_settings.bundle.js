@@ -0,0 +1,33 @@
+// Settings tab of the adilims page; loaded on demand (see TAB_BUNDLES in adilims.js)
+
+adi_lims.adilims.tabs.settings = class SettingsTab {
+    constructor(dashboard) {
+        this.dashboard = dashboard;
+        this.wrapper = dashboard.wrapper;
+    }
+
+    show() {
+        const view = `
+            <div class="fade-in">
+                <div class="view-header"><h1>Settings</h1><p>Configure laboratory preferences.</p></div>
+                <div class="worklist-container" style="margin-top:0">
+                    <form style="max-width: 600px;">
+                        <div class="frappe-control">
+                            <label class="control-label">Default Lab Name</label>
+                            <input type="text" class="form-control" value="MediLIMS Laboratory" disabled>
+                        </div>
+                        <div class="frappe-control" style="margin-top: 15px;">
+                            <label class="control-label">Auto-Approve Normal Results</label>
+                            <input type="checkbox"> Enable
+                        </div>
+                        <div class="frappe-control" style="margin-top: 15px;">
+                            <label class="control-label">Printers</label>
+                            <select class="form-control"><option>Default System Printer</option></select>
+                        </div>
+                        <button type="button" class="btn btn-primary" style="margin-top: 20px;">Save Settings</button>
+                    </form>
+                </div>
+            </div>`;
+        this.wrapper.find('#content-mount-point').html(view);
+    }
+};
@@ -0,0 +1,541 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Quality control: Westgard rules over control runs.
+
+Control results are appended to `__lims_qc_result` and never updated. Each
+control series (lab test, instrument, control level) keeps its state in one
+row of `__lims_qc_series`:
+
+- a rolling window of the last accepted values with their running sum and
+  sum of squares, so the mean and SD move in O(1) per point;
+- the z-scores of the last ten points, which is all the rules look at.
+
+A point is scored against the series' target mean/SD when one is set
+(`set_control_target`), otherwise against the rolling window; no rules are
+applied until the window holds MIN_POINTS values. A new control lot starts
+the series afresh with `reset_control_series`. The rules, on the z-score
+of the new point and those before it:
+
+	1_2s  |z| > 2                          warning only
+	1_3s  |z| > 3                          reject
+	2_2s  two in a row beyond 2 SD, same side
+	R_4s  two in a row beyond 2 SD, opposite sides
+	4_1s  four in a row beyond 1 SD, same side
+	10_x  ten in a row on the same side of the mean
+
+The outcome of each analytical run (lab test, instrument, run id) is kept in
+`__lims_qc_run`: Accepted until one of its control points violates a
+rejection rule, then Rejected for good. A Lab Test Result carrying a
+`qc_run` can only be verified once that run has been Accepted, so rejecting
+a run holds all of its patient results at once, with no per-row writes.
+Result entry and instrument ingestion stamp the instrument and run on the
+results they write; the two are always set together.
+
+Batches of control points lock their series rows (FOR UPDATE, in key order)
+for the length of the transaction, so concurrent writers to one series are
+serialised and its window stays consistent.
+"""
+
+import json
+import math
+from collections import deque
+
+import frappe
+from frappe import _
+from frappe.utils import cint, flt, get_datetime, now_datetime
+
+RESULT_TABLE = "__lims_qc_result"
+SERIES_TABLE = "__lims_qc_series"
+RUN_TABLE = "__lims_qc_run"
+
+ACCEPTED = "Accepted"
+REJECTED = "Rejected"
+
+REJECTION_RULES = ("1_3s", "2_2s", "R_4s", "4_1s", "10_x")
+HISTORY = 10  # the longest rule, 10_x
+DEFAULT_WINDOW = 20
+MIN_POINTS = 10
+MAX_BATCH_SIZE = 10000
+INSERT_CHUNK_SIZE = 1000
+
+
+def setup_qc_tables():
+	frappe.db.sql(
+		f"""
+		create table if not exists `{RESULT_TABLE}` (
+			id bigint not null auto_increment,
+			lab_test varchar(140) not null,
+			instrument varchar(140) not null,
+			control_level varchar(140) not null,
+			qc_run varchar(140) not null,
+			value double not null,
+			mean double,
+			sd double,
+			z double,
+			rules varchar(140) not null default '',
+			rejected tinyint not null default 0,
+			recorded_at datetime(6) not null,
+			owner varchar(140),
+			primary key (id),
+			key series_index (lab_test, instrument, control_level, id),
+			key run_index (lab_test, instrument, qc_run)
+		) engine=InnoDB character set=utf8mb4 collate=utf8mb4_unicode_ci
+		"""
+	)
+	frappe.db.sql(
+		f"""
+		create table if not exists `{SERIES_TABLE}` (
+			lab_test varchar(140) not null,
+			instrument varchar(140) not null,
+			control_level varchar(140) not null,
+			target_mean double,
+			target_sd double,
+			window_values text,
+			window_sum double not null default 0,
+			window_sum_sq double not null default 0,
+			recent_z text,
+			points bigint not null default 0,
+			modified datetime(6),
+			primary key (lab_test, instrument, control_level)
+		) engine=InnoDB character set=utf8mb4 collate=utf8mb4_unicode_ci
+		"""
+	)
+	frappe.db.sql(
+		f"""
+		create table if not exists `{RUN_TABLE}` (
+			lab_test varchar(140) not null,
+			instrument varchar(140) not null,
+			qc_run varchar(140) not null,
+			status varchar(16) not null,
+			rules varchar(140) not null default '',
+			points int not null default 0,
+			modified datetime(6),
+			primary key (lab_test, instrument, qc_run)
+		) engine=InnoDB character set=utf8mb4 collate=utf8mb4_unicode_ci
+		"""
+	)
+
+
+def get_window_size():
+	return cint(frappe.conf.get("adi_lims_qc_window")) or DEFAULT_WINDOW
+
+
+class ControlSeries:
+	"""Rolling window and recent z-scores of one control series."""
+
+	__slots__ = (
+		"key",
+		"points",
+		"recent_z",
+		"since_resum",
+		"target_mean",
+		"target_sd",
+		"total",
+		"total_sq",
+		"values",
+	)
+
+	def __init__(
+		self, key, window_size, values=(), total=0.0, total_sq=0.0, recent_z=(), points=0, target=(None, None)
+	):
+		self.key = key
+		self.values = deque(values, maxlen=window_size)
+		self.total, self.total_sq = total, total_sq
+		self.recent_z = deque(recent_z, maxlen=HISTORY)
+		self.points = points
+		self.target_mean, self.target_sd = target
+		self.since_resum = 0
+		if len(self.values) != len(values):
+			# the window was shrunk in site config
+			self._resum()
+
+	def stats(self):
+		"""(mean, sd) the next point is scored against, or (None, None) while establishing."""
+		if self.target_mean is not None and self.target_sd:
+			return self.target_mean, self.target_sd
+		n = len(self.values)
+		if n < MIN_POINTS:
+			return None, None
+		mean = self.total / n
+		variance = max((self.total_sq - n * mean * mean) / (n - 1), 0.0)
+		return mean, math.sqrt(variance) or None
+
+	def add(self, value):
+		"""Score `value`; returns (mean, sd, z, violated rules, rejected)."""
+		mean, sd = self.stats()
+		self.points += 1
+		if sd is None:
+			self._push(value)
+			return mean, sd, None, [], False
+
+		z = (value - mean) / sd
+		self.recent_z.append(z)
+		rules = check_rules(list(self.recent_z))
+		rejected = any(rule in REJECTION_RULES for rule in rules)
+		# a rejected point stays out of the window, but later rules still see its z
+		if not rejected:
+			self._push(value)
+		return mean, sd, z, rules, rejected
+
+	def _push(self, value):
+		if len(self.values) == self.values.maxlen:
+			evicted = self.values[0]
+			self.total -= evicted
+			self.total_sq -= evicted * evicted
+		self.values.append(value)
+		self.total += value
+		self.total_sq += value * value
+		self.since_resum += 1
+		if self.since_resum >= self.values.maxlen:
+			# running sums drift with every add and subtract; re-add once per window length
+			self._resum()
+
+	def _resum(self):
+		self.total = math.fsum(self.values)
+		self.total_sq = math.fsum(value * value for value in self.values)
+		self.since_resum = 0
+
+
+def check_rules(z):
+	"""Westgard rules violated by the last point of `z` (oldest first)."""
+	rules = []
+	last = z[-1]
+	if abs(last) > 3:
+		rules.append("1_3s")
+	elif abs(last) > 2:
+		rules.append("1_2s")
+	if len(z) >= 2:
+		previous = z[-2]
+		if (last > 2 and previous > 2) or (last < -2 and previous < -2):
+			rules.append("2_2s")
+		elif (last > 2 and previous < -2) or (last < -2 and previous > 2):
+			rules.append("R_4s")
+	if len(z) >= 4 and (all(value > 1 for value in z[-4:]) or all(value < -1 for value in z[-4:])):
+		rules.append("4_1s")
+	if len(z) >= 10 and (all(value > 0 for value in z[-10:]) or all(value < 0 for value in z[-10:])):
+		rules.append("10_x")
+	return rules
+
+
+# Writing
+
+
+def _parse_points(points):
+	parsed, errors = [], []
+	for idx, point in enumerate(points):
+		point = frappe._dict(point)
+		missing = [
+			field for field in ("lab_test", "instrument", "control_level", "qc_run") if not point.get(field)
+		]
+		if missing:
+			errors.append({"idx": idx, "message": _("Missing {0}").format(", ".join(missing))})
+			continue
+		try:
+			value = float(point.value)
+		except (TypeError, ValueError):
+			errors.append({"idx": idx, "message": _("Value {0} is not a number").format(point.value)})
+			continue
+		if not math.isfinite(value):
+			errors.append({"idx": idx, "message": _("Value {0} is not a number").format(point.value)})
+			continue
+		recorded_at = get_datetime(point.recorded_at) if point.recorded_at else None
+		parsed.append((idx, point, value, recorded_at))
+	return parsed, errors
+
+
+def _lock_series(keys, window_size):
+	"""Series state for `keys`, locked until the transaction ends."""
+	series = {}
+	keys = sorted(keys)
+	for start in range(0, len(keys), INSERT_CHUNK_SIZE):
+		chunk = keys[start : start + INSERT_CHUNK_SIZE]
+		# create new series first, so that every writer takes the same row locks in the same order
+		frappe.db.sql(
+			f"""
+			insert ignore into `{SERIES_TABLE}` (lab_test, instrument, control_level)
+			values {", ".join(["(%s, %s, %s)"] * len(chunk))}
+			""",
+			[value for key in chunk for value in key],
+		)
+		rows = frappe.db.sql(
+			f"""
+			select lab_test, instrument, control_level, target_mean, target_sd,
+				window_values, window_sum, window_sum_sq, recent_z, points
+			from `{SERIES_TABLE}`
+			where (lab_test, instrument, control_level) in ({", ".join(["(%s, %s, %s)"] * len(chunk))})
+			order by lab_test, instrument, control_level
+			for update
+			""",
+			[value for key in chunk for value in key],
+			as_dict=True,
+		)
+		for row in rows:
+			key = (row.lab_test, row.instrument, row.control_level)
+			series[key] = ControlSeries(
+				key,
+				window_size,
+				values=json.loads(row.window_values or "[]"),
+				total=flt(row.window_sum),
+				total_sq=flt(row.window_sum_sq),
+				recent_z=json.loads(row.recent_z or "[]"),
+				points=cint(row.points),
+				target=(row.target_mean, row.target_sd),
+			)
+	return series
+
+
+def _save_series(series, timestamp):
+	rows = list(series.values())
+	for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+		chunk = rows[start : start + INSERT_CHUNK_SIZE]
+		frappe.db.sql(
+			f"""
+			insert into `{SERIES_TABLE}`
+				(lab_test, instrument, control_level, window_values, window_sum, window_sum_sq,
+				recent_z, points, modified)
+			values {", ".join(["(%s, %s, %s, %s, %s, %s, %s, %s, %s)"] * len(chunk))}
+			on duplicate key update
+				window_values = values(window_values), window_sum = values(window_sum),
+				window_sum_sq = values(window_sum_sq), recent_z = values(recent_z),
+				points = values(points), modified = values(modified)
+			""",
+			[
+				value
+				for state in chunk
+				for value in (
+					*state.key,
+					json.dumps(list(state.values)),
+					state.total,
+					state.total_sq,
+					json.dumps(list(state.recent_z)),
+					state.points,
+					timestamp,
+				)
+			],
+		)
+
+
+def _save_runs(runs, timestamp):
+	"""Upsert run outcomes; a run once Rejected stays Rejected."""
+	rows = list(runs.items())
+	for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+		chunk = rows[start : start + INSERT_CHUNK_SIZE]
+		frappe.db.sql(
+			f"""
+			insert into `{RUN_TABLE}` (lab_test, instrument, qc_run, status, rules, points, modified)
+			values {", ".join(["(%s, %s, %s, %s, %s, %s, %s)"] * len(chunk))}
+			on duplicate key update
+				rules = left(if(values(rules) = '', rules, if(rules = '', values(rules), concat(rules, ',', values(rules)))), 140),
+				status = if(status = '{REJECTED}', status, values(status)),
+				points = points + values(points),
+				modified = values(modified)
+			""",
+			[
+				value
+				for key, run in chunk
+				for value in (
+					*key,
+					REJECTED if run["rejected"] else ACCEPTED,
+					",".join(sorted(run["rules"]))[:140],
+					run["points"],
+					timestamp,
+				)
+			],
+		)
+
+
+def record_control_results(points):
+	"""Append control points and evaluate the Westgard rules on each, in order.
+
+	Each point is a dict of lab_test, instrument, control_level, qc_run, value
+	and optionally recorded_at; points of a series are scored in the order
+	given. Returns the scored points, the errors, and the runs this batch
+	rejected.
+	"""
+	frappe.has_permission("Lab Test Result", "write", throw=True)
+	if len(points) > MAX_BATCH_SIZE:
+		frappe.throw(_("At most {0} control results can be recorded in one batch").format(MAX_BATCH_SIZE))
+
+	parsed, errors = _parse_points(points)
+	if not parsed:
+		return {"recorded": [], "errors": errors, "rejected_runs": []}
+
+	timestamp, user = now_datetime(), frappe.session.user
+	series = _lock_series(
+		{(p.lab_test, p.instrument, p.control_level) for _i, p, _v, _t in parsed}, get_window_size()
+	)
+
+	rows, recorded, runs = [], [], {}
+	for idx, point, value, recorded_at in parsed:
+		mean, sd, z, rules, rejected = series[(point.lab_test, point.instrument, point.control_level)].add(
+			value
+		)
+		rows.append(
+			(
+				point.lab_test,
+				point.instrument,
+				point.control_level,
+				point.qc_run,
+				value,
+				mean,
+				sd,
+				z,
+				",".join(rules),
+				int(rejected),
+				recorded_at or timestamp,
+				user,
+			)
+		)
+		run = runs.setdefault(
+			(point.lab_test, point.instrument, point.qc_run), {"rejected": False, "rules": set(), "points": 0}
+		)
+		run["points"] += 1
+		run["rules"].update(rule for rule in rules if rule in REJECTION_RULES)
+		run["rejected"] = run["rejected"] or rejected
+		recorded.append({"idx": idx, "z": z, "rules": rules, "rejected": rejected})
+
+	for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+		chunk = rows[start : start + INSERT_CHUNK_SIZE]
+		frappe.db.sql(
+			f"""
+			insert into `{RESULT_TABLE}`
+				(lab_test, instrument, control_level, qc_run, value, mean, sd, z, rules, rejected, recorded_at, owner)
+			values {", ".join(["(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"] * len(chunk))}
+			""",
+			[value for row in chunk for value in row],
+		)
+	_save_series(series, timestamp)
+	_save_runs(runs, timestamp)
+
+	rejected_runs = [
+		{"lab_test": lab_test, "instrument": instrument, "qc_run": qc_run, "rules": sorted(run["rules"])}
+		for (lab_test, instrument, qc_run), run in runs.items()
+		if run["rejected"]
+	]
+	return {"recorded": recorded, "errors": errors, "rejected_runs": rejected_runs}
+
+
+def _target_values(lab_test, instrument, control_level, mean, sd):
+	if (mean is None) != (sd is None) or (sd is not None and flt(sd) <= 0):
+		frappe.throw(_("Set both a mean and a positive SD, or neither"))
+	return {
+		"lab_test": lab_test,
+		"instrument": instrument,
+		"control_level": control_level,
+		"mean": flt(mean) if mean is not None else None,
+		"sd": flt(sd) if sd is not None else None,
+		"now": now_datetime(),
+	}
+
+
+def set_control_target(lab_test, instrument, control_level, mean=None, sd=None):
+	"""Score a series against a fixed mean/SD (e.g. the control lot's); pass None to use the rolling window.
+
+	The recent z-scores were taken against the old mean/SD, so the rules start
+	over; the window of accepted values is kept.
+	"""
+	frappe.has_permission("Lab Test", "write", throw=True)
+	frappe.db.sql(
+		f"""
+		insert into `{SERIES_TABLE}` (lab_test, instrument, control_level, target_mean, target_sd, modified)
+		values (%(lab_test)s, %(instrument)s, %(control_level)s, %(mean)s, %(sd)s, %(now)s)
+		on duplicate key update
+			target_mean = values(target_mean), target_sd = values(target_sd),
+			recent_z = null, modified = values(modified)
+		""",
+		_target_values(lab_test, instrument, control_level, mean, sd),
+	)
+
+
+def reset_control_series(lab_test, instrument, control_level, mean=None, sd=None):
+	"""Start a series afresh for a new control lot: forget its window and recent z-scores.
+
+	`mean` and `sd` set the new lot's target; without them the series is
+	established again from MIN_POINTS new values. Recorded points are kept.
+	"""
+	frappe.has_permission("Lab Test", "write", throw=True)
+	frappe.db.sql(
+		f"""
+		insert into `{SERIES_TABLE}` (lab_test, instrument, control_level, target_mean, target_sd, modified)
+		values (%(lab_test)s, %(instrument)s, %(control_level)s, %(mean)s, %(sd)s, %(now)s)
+		on duplicate key update
+			target_mean = values(target_mean), target_sd = values(target_sd),
+			window_values = null, window_sum = 0, window_sum_sq = 0, recent_z = null,
+			modified = values(modified)
+		""",
+		_target_values(lab_test, instrument, control_level, mean, sd),
+	)
+
+
+# Release
+
+
+def validate_run_fields(instrument, qc_run):
+	"""Runs are keyed by instrument, so a qc_run without one could never be released."""
+	if bool(instrument) != bool(qc_run):
+		frappe.throw(_("Set both an instrument and a QC run, or neither"), title=_("Invalid QC run"))
+
+
+def validate_result_run(doc, method=None):
+	"""Lab Test Result validate hook."""
+	validate_run_fields(doc.instrument, doc.qc_run)
+
+
+def qc_release_condition(alias="r"):
+	"""SQL condition: the result has no QC run, or its run has been Accepted."""
+	return f"""(ifnull({alias}.qc_run, '') = '' or exists (
+		select 1 from `{RUN_TABLE}` qc
+		where qc.lab_test = {alias}.lab_test and qc.instrument = ifnull({alias}.instrument, '')
+			and qc.qc_run = {alias}.qc_run and qc.status = '{ACCEPTED}'
+	))"""
+
+
+def get_held_results(lab_test=None, instrument=None, qc_run=None, limit=500):
+	"""Completed results waiting on a QC run that was rejected or has not been evaluated."""
+	frappe.has_permission("Sample", "read", throw=True)
+	conditions, values = (
+		["r.parenttype = 'Sample'", "r.status = 'Completed'", f"not {qc_release_condition()}"],
+		{},
+	)
+	for field, value in (("lab_test", lab_test), ("instrument", instrument), ("qc_run", qc_run)):
+		if value:
+			conditions.append(f"r.{field} = %({field})s")
+			values[field] = value
+	values["limit"] = min(cint(limit) or 500, MAX_BATCH_SIZE)
+	return frappe.db.sql(
+		f"""
+		select r.name, r.parent, r.lab_test, r.instrument, r.qc_run, qc.status as qc_status, qc.rules as qc_rules
+		from `tabLab Test Result` r
+		left join `{RUN_TABLE}` qc
+			on qc.lab_test = r.lab_test and qc.instrument = ifnull(r.instrument, '') and qc.qc_run = r.qc_run
+		where {" and ".join(conditions)}
+		order by r.completed_on, r.name
+		limit %(limit)s
+		""",
+		values,
+		as_dict=True,
+	)
+
+
+# Reading
+
+
+def get_levey_jennings(lab_test, instrument, control_level, limit=100):
+	"""The last `limit` points of a series, oldest first, with the mean/SD each was scored against."""
+	frappe.has_permission("Lab Test Result", "read", throw=True)
+	rows = frappe.db.sql(
+		f"""
+		select id, qc_run, value, mean, sd, z, rules, rejected, recorded_at
+		from `{RESULT_TABLE}`
+		where lab_test = %s and instrument = %s and control_level = %s
+		order by id desc
+		limit %s
+		""",
+		(lab_test, instrument, control_level, min(cint(limit) or 100, MAX_BATCH_SIZE)),
+		as_dict=True,
+	)
+	rows.reverse()
+	for row in rows:
+		row.rules = row.rules.split(",") if row.rules else []
+	return rows
@@ -0,0 +1,184 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Change feed for the adilims desk page.
+
+doc_events on Sample, Lab Test Result and Collection Appointment publish
+compact delta messages over frappe.realtime once the transaction commits:
+
+	{
+		"doctype": "Sample",
+		"op": "upsert" | "delete",
+		"names": ["S-00042", ...],
+		"counters": {"samples": {"Received": -1, "In-Progress": 1}},
+	}
+
+Messages carry names and aggregate counters only, never row contents, and
+go to the doctype's realtime room, which frappe only lets users with read
+permission join. Open dashboards apply the counters directly and fetch the
+rows they show with `get_delta_rows`, which reads them with the user's own
+permissions. Load grows with the rate of changes rather than with the
+number of open pages.
+"""
+
+import frappe
+from frappe import _
+from frappe.realtime import get_doctype_room
+from frappe.utils import getdate, nowdate
+
+from adi_lims.worklist import get_worklist_rows
+
+DELTA_EVENT = "adi_lims_delta"
+
+UPSERT = "upsert"
+DELETE = "delete"
+MAX_DELTA_ROWS = 200
+
+# child doctypes have no permissions of their own, so their deltas go to the parent's room
+ROOM_DOCTYPES = {"Lab Test Result": "Sample"}
+
+RESULT_FIELDS = [
+	"name",
+	"parent",
+	"lab_test",
+	"result_value",
+	"numeric_result_value",
+	"result_flag",
+	"status",
+	"verification_status",
+]
+APPOINTMENT_FIELDS = [
+	"name",
+	"patient",
+	"patient_name",
+	"appointment_date",
+	"appointment_time",
+	"collection_type",
+	"status",
+	"lab_assistant",
+]
+
+
+def publish_delta(doctype, op, names, counters=None):
+	"""Announce changed `names` of `doctype`, MAX_DELTA_ROWS per message, to users who can read it."""
+	names, room = list(names), get_doctype_room(ROOM_DOCTYPES.get(doctype, doctype))
+	for start in range(0, max(len(names), 1), MAX_DELTA_ROWS):
+		frappe.publish_realtime(
+			DELTA_EVENT,
+			{
+				"doctype": doctype,
+				"op": op,
+				"names": names[start : start + MAX_DELTA_ROWS],
+				"counters": (counters or {}) if not start else {},
+			},
+			room=room,
+			after_commit=True,
+		)
+
+
+def get_delta_rows(doctype, names):
+	"""Current rows for names announced in a delta; names the user cannot read (or that are gone) are left out."""
+	names = list(names or [])[:MAX_DELTA_ROWS]
+	if doctype == "Sample":
+		return get_worklist_rows(names)
+	if not names:
+		return []
+	if doctype == "Lab Test Result":
+		return frappe.get_list(
+			"Lab Test Result",
+			parent_doctype="Sample",
+			filters={"name": ("in", names), "parenttype": "Sample"},
+			fields=RESULT_FIELDS,
+		)
+	if doctype == "Collection Appointment":
+		return frappe.get_list(
+			"Collection Appointment", filters={"name": ("in", names)}, fields=APPOINTMENT_FIELDS
+		)
+	frappe.throw(_("{0} has no change feed").format(doctype))
+
+
+def _counter_delta(before, after):
+	"""Turn the bucket keys a row left and joined into a {key: +/-1} delta."""
+	delta = {}
+	for key in before:
+		delta[key] = delta.get(key, 0) - 1
+	for key in after:
+		delta[key] = delta.get(key, 0) + 1
+	return {key: value for key, value in delta.items() if value}
+
+
+# Sample
+
+
+def _sample_buckets(status):
+	return {status, "total"} if status else {"total"}
+
+
+def on_sample_update(doc, method=None):
+	previous = doc.get_doc_before_save()
+	before = _sample_buckets(previous.status) if previous else set()
+	counters = _counter_delta(before, _sample_buckets(doc.status))
+	publish_delta("Sample", UPSERT, [doc.name], {"samples": counters} if counters else None)
+
+
+def on_sample_trash(doc, method=None):
+	counters = _counter_delta(_sample_buckets(doc.status), set())
+	publish_delta("Sample", DELETE, [doc.name], {"samples": counters})
+
+
+def on_sample_batch_insert(batch):
+	"""sample_batch_insert hook: only the newest names of a large batch; counters cover the rest."""
+	publish_delta(
+		"Sample", UPSERT, [doc.name for doc in batch.rows[-MAX_DELTA_ROWS:]], {"samples": batch.counters}
+	)
+
+
+def on_sample_transition(batch):
+	"""sample_status_transition hook: the batch's names, MAX_DELTA_ROWS per message."""
+	counters = {key: value for key, value in batch.counters.items() if value}
+	publish_delta(
+		"Sample", UPSERT, [row.name for row in batch.rows], {"samples": counters} if counters else None
+	)
+
+
+# Lab Test Result
+
+
+def on_result_update(doc, method=None):
+	publish_delta("Lab Test Result", UPSERT, [doc.name])
+
+
+def publish_result_batch(rows):
+	"""Announce a bulk write of (name, result_value, numeric_result_value) rows."""
+	publish_delta("Lab Test Result", UPSERT, [name for name, _value, _numeric in rows])
+
+
+# Collection Appointment
+
+
+def _appointment_buckets(doc):
+	"""Dashboard buckets (see adi_lims.dashboard.get_appointment_counts) the appointment falls in."""
+	buckets = set()
+	if doc.status == "Completed":
+		buckets.add("completed")
+	elif doc.status == "Scheduled" and doc.appointment_date:
+		appointment_date, today = getdate(doc.appointment_date), getdate(nowdate())
+		if appointment_date <= today:
+			buckets.add("pending_collection")
+		if appointment_date == today:
+			buckets.add("scheduled_today")
+	return buckets
+
+
+def on_appointment_update(doc, method=None):
+	previous = doc.get_doc_before_save()
+	before = _appointment_buckets(previous) if previous else set()
+	counters = _counter_delta(before, _appointment_buckets(doc))
+	publish_delta(
+		"Collection Appointment", UPSERT, [doc.name], {"appointments": counters} if counters else None
+	)
+
+
+def on_appointment_trash(doc, method=None):
+	counters = _counter_delta(_appointment_buckets(doc), set())
+	publish_delta("Collection Appointment", DELETE, [doc.name], {"appointments": counters})
@@ -0,0 +1,354 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Sample report PDFs.
+
+A report is rendered from templates/reports/sample_report.html and cached on
+disk under the site's private folder, keyed by a hash of the Sample, its
+patient, its results and the template. An unchanged report is served from
+the cache; any edit changes the hash and the next request renders again.
+
+Rendering runs in background jobs on the `lims_reports` queue when the site
+defines it (`workers` in common_site_config.json, served by
+`bench worker-pool --queue lims_reports --num-workers N`), otherwise on
+`long`. A day's verified samples are split into chunks rendered in parallel;
+the chunk that finishes last queues the merge into one PDF. Throughput
+counters are kept in Redis.
+"""
+
+import hashlib
+import json
+import os
+import time
+
+import frappe
+from frappe import _
+from frappe.utils import add_days, cint, get_datetime, getdate
+
+from adi_lims.listing import get_permission_condition
+from adi_lims.lookup import get_many
+
+REPORT_TEMPLATE = "adi_lims/templates/reports/sample_report.html"
+REPORT_QUEUE = "lims_reports"
+FALLBACK_QUEUE = "long"
+CACHE_FOLDER = "lims_report_cache"
+BATCH_CHUNK_SIZE = 50
+
+METRICS_KEY = "adi_lims:report_metrics"
+BATCH_KEY = "adi_lims:report_batch:{0}"
+BATCH_REMAINING_KEY = "adi_lims:report_batch_remaining:{0}"
+BATCH_EVENT = "adi_lims_report_batch"
+
+SAMPLE_FIELDS = [
+	"name",
+	"sample_name",
+	"sample_type",
+	"patient",
+	"collection_date",
+	"received_date",
+	"status",
+	"modified",
+]
+PATIENT_FIELDS = ["name", "first_name", "last_name", "gender", "dob", "modified"]
+RESULT_FIELDS = [
+	"name",
+	"lab_test",
+	"result_value",
+	"unit",
+	"reference_range",
+	"result_flag",
+	"status",
+	"verified_on",
+	"modified",
+]
+
+_template_version = {}
+
+
+def get_template_version():
+	"""Hash of the report template source, so a template change invalidates every cached report."""
+	if "hash" not in _template_version:
+		with open(frappe.get_app_path("adi_lims", "templates", "reports", "sample_report.html"), "rb") as f:
+			_template_version["hash"] = hashlib.sha256(f.read()).hexdigest()[:16]
+	return _template_version["hash"]
+
+
+def get_report_queue():
+	from frappe.utils.background_jobs import get_queues_timeout
+
+	return REPORT_QUEUE if REPORT_QUEUE in get_queues_timeout() else FALLBACK_QUEUE
+
+
+def get_cache_path(content_hash):
+	return frappe.get_site_path("private", CACHE_FOLDER, content_hash[:2], f"{content_hash}.pdf")
+
+
+def load_report_data(samples):
+	"""sample -> {sample, patient, results}, with one query per doctype for the whole list."""
+	samples = list(samples)
+	rows = frappe.get_all("Sample", filters={"name": ("in", samples)}, fields=SAMPLE_FIELDS)
+	patients = get_many("Patient", [row.patient for row in rows], PATIENT_FIELDS)
+	results = {}
+	for row in frappe.get_all(
+		"Lab Test Result",
+		filters={"parenttype": "Sample", "parent": ("in", samples)},
+		fields=["parent", *RESULT_FIELDS],
+		order_by="parent asc, idx asc",
+	):
+		results.setdefault(row.pop("parent"), []).append(row)
+
+	data = {}
+	for row in rows:
+		patient = patients.get(row.patient) or frappe._dict()
+		if patient:
+			patient.full_name = f"{patient.first_name or ''} {patient.last_name or ''}".strip()
+		data[row.name] = frappe._dict(sample=row, patient=patient, results=results.get(row.name, []))
+	return data
+
+
+def get_content_hash(report):
+	payload = json.dumps(
+		[get_template_version(), report.sample, report.patient, report.results],
+		sort_keys=True,
+		default=str,
+		separators=(",", ":"),
+	)
+	return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def render_report(report):
+	"""Return (path, from_cache) for one report loaded by `load_report_data`."""
+	from frappe.utils.pdf import get_pdf
+
+	content_hash = get_content_hash(report)
+	path = get_cache_path(content_hash)
+	if os.path.exists(path):
+		_record_metrics(cache_hits=1)
+		return path, True
+
+	start = time.perf_counter()
+	html = frappe.render_template(REPORT_TEMPLATE, dict(report))
+	pdf = get_pdf(html)
+	os.makedirs(os.path.dirname(path), exist_ok=True)
+	# write and rename so a concurrent reader never sees half a file
+	tmp_path = f"{path}.{os.getpid()}.tmp"
+	with open(tmp_path, "wb") as f:
+		f.write(pdf)
+	os.replace(tmp_path, path)
+	_record_metrics(rendered=1, render_ms=(time.perf_counter() - start) * 1000, bytes=len(pdf))
+	return path, False
+
+
+def render_samples(samples):
+	"""Render (or find in cache) the reports of `samples`; background job entry point."""
+	paths = {}
+	for name, report in load_report_data(samples).items():
+		paths[name], _from_cache = render_report(report)
+	return paths
+
+
+def get_report_status(sample):
+	"""Serve from cache when the report is current, otherwise queue a render."""
+	frappe.has_permission("Sample", "read", doc=sample, throw=True)
+	report = load_report_data([sample]).get(sample)
+	if not report:
+		frappe.throw(_("Sample {0} not found").format(sample), frappe.DoesNotExistError)
+
+	content_hash = get_content_hash(report)
+	if os.path.exists(get_cache_path(content_hash)):
+		return {"status": "ready", "content_hash": content_hash}
+
+	frappe.enqueue(
+		"adi_lims.reports.render_samples",
+		queue=get_report_queue(),
+		job_id=f"lims_report::{content_hash}",
+		deduplicate=True,
+		samples=[sample],
+	)
+	return {"status": "queued", "content_hash": content_hash}
+
+
+def get_cached_report(sample):
+	"""(filename, pdf bytes) of the current report, or None if it is not rendered yet."""
+	frappe.has_permission("Sample", "read", doc=sample, throw=True)
+	report = load_report_data([sample]).get(sample)
+	if not report:
+		return None
+	path = get_cache_path(get_content_hash(report))
+	if not os.path.exists(path):
+		return None
+	_record_metrics(cache_hits=1)
+	with open(path, "rb") as f:
+		return f"{sample}.pdf", f.read()
+
+
+# Daily batch
+
+
+def get_verified_samples(date):
+	"""Samples the current user can read with a result verified on `date`, in S-number order."""
+	start = get_datetime(getdate(date))
+	# no alias on tabSample: the permission condition refers to it by table name
+	conditions = [
+		"""`tabSample`.name in (
+			select parent from `tabLab Test Result`
+			where parenttype = 'Sample' and verified_on >= %(start)s and verified_on < %(end)s
+		)"""
+	]
+	permission_condition = get_permission_condition("Sample")
+	if permission_condition:
+		conditions.append(permission_condition.replace("%", "%%"))
+
+	return frappe.db.sql_list(
+		f"""
+		select `tabSample`.name
+		from `tabSample`
+		where {" and ".join(conditions)}
+		order by `tabSample`.name
+		""",
+		{"start": start, "end": get_datetime(add_days(start, 1))},
+	)
+
+
+def enqueue_daily_batch(date=None, user=None):
+	"""Split a day's verified samples into chunks rendered in parallel; returns the batch id."""
+	date = str(getdate(date))
+	samples = get_verified_samples(date)
+	if not samples:
+		frappe.throw(_("No verified samples on {0}").format(date))
+
+	batch_id = f"{date}-{frappe.generate_hash(length=8)}"
+	chunks = [samples[i : i + BATCH_CHUNK_SIZE] for i in range(0, len(samples), BATCH_CHUNK_SIZE)]
+	frappe.cache().set_value(
+		BATCH_KEY.format(batch_id),
+		{"date": date, "samples": samples, "started": time.time(), "user": user or frappe.session.user},
+		expires_in_sec=24 * 60 * 60,
+	)
+	pipe = frappe.cache().pipeline()
+	pipe.set(frappe.cache().make_key(BATCH_REMAINING_KEY.format(batch_id)), len(chunks), ex=24 * 60 * 60)
+	pipe.execute()
+
+	queue = get_report_queue()
+	for chunk in chunks:
+		frappe.enqueue(
+			"adi_lims.reports.render_batch_chunk",
+			queue=queue,
+			batch_id=batch_id,
+			samples=chunk,
+			enqueue_after_commit=True,
+		)
+	return {"batch_id": batch_id, "samples": len(samples), "chunks": len(chunks), "queue": queue}
+
+
+def render_batch_chunk(batch_id, samples):
+	render_samples(samples)
+	remaining = (
+		frappe.cache()
+		.pipeline()
+		.decr(frappe.cache().make_key(BATCH_REMAINING_KEY.format(batch_id)))
+		.execute()[0]
+	)
+	if remaining <= 0:
+		frappe.enqueue("adi_lims.reports.merge_batch", queue=get_report_queue(), batch_id=batch_id)
+
+
+def merge_batch(batch_id):
+	"""Merge the batch's cached reports, in sample order, into one PDF and publish metrics."""
+	from pypdf import PdfWriter
+
+	batch = frappe.cache().get_value(BATCH_KEY.format(batch_id))
+	if not batch:
+		return
+
+	paths = render_samples(batch["samples"])
+	writer = PdfWriter()
+	for sample in batch["samples"]:
+		if sample in paths:
+			writer.append(paths[sample])
+
+	path = frappe.get_site_path("private", CACHE_FOLDER, "batches", f"{batch_id}.pdf")
+	os.makedirs(os.path.dirname(path), exist_ok=True)
+	with open(path, "wb") as f:
+		writer.write(f)
+
+	seconds = time.time() - batch["started"]
+	metrics = {
+		"batch_id": batch_id,
+		"date": batch["date"],
+		"samples": len(paths),
+		"pages": len(writer.pages),
+		"seconds": seconds,
+		"samples_per_sec": len(paths) / seconds if seconds else 0.0,
+		"ready": True,
+	}
+	batch.update(metrics)
+	frappe.cache().set_value(BATCH_KEY.format(batch_id), batch, expires_in_sec=24 * 60 * 60)
+	frappe.publish_realtime(BATCH_EVENT, metrics, user=batch["user"])
+	return metrics
+
+
+def get_batch(batch_id):
+	"""The stored batch, if it was started by the current user."""
+	batch = frappe.cache().get_value(BATCH_KEY.format(batch_id))
+	if not batch:
+		frappe.throw(_("Report batch {0} not found or expired").format(batch_id))
+	if batch["user"] != frappe.session.user:
+		frappe.throw(_("Report batch {0} belongs to another user").format(batch_id), frappe.PermissionError)
+	return batch
+
+
+def get_batch_status(batch_id):
+	batch = get_batch(batch_id)
+	batch.pop("samples", None)
+	return batch
+
+
+def get_batch_file(batch_id):
+	get_batch(batch_id)
+	path = frappe.get_site_path("private", CACHE_FOLDER, "batches", f"{os.path.basename(batch_id)}.pdf")
+	if not os.path.exists(path):
+		return None
+	with open(path, "rb") as f:
+		return f"reports-{batch_id}.pdf", f.read()
+
+
+def prune_report_cache():
+	"""Weekly job: delete cached PDFs not read or written for `adi_lims_report_cache_days` (default 30)."""
+	max_age = (cint(frappe.conf.get("adi_lims_report_cache_days")) or 30) * 24 * 60 * 60
+	root = frappe.get_site_path("private", CACHE_FOLDER)
+	now = time.time()
+	for folder, _dirs, files in os.walk(root):
+		for filename in files:
+			path = os.path.join(folder, filename)
+			try:
+				if now - max(os.path.getatime(path), os.path.getmtime(path)) > max_age:
+					os.remove(path)
+			except FileNotFoundError:
+				pass
+
+
+# Metrics
+
+
+def _record_metrics(**counters):
+	key = frappe.cache().make_key(METRICS_KEY)
+	pipe = frappe.cache().pipeline()
+	for field, value in counters.items():
+		if isinstance(value, float):
+			pipe.hincrbyfloat(key, field, value)
+		else:
+			pipe.hincrby(key, field, value)
+	pipe.execute()
+
+
+def get_report_metrics():
+	raw = frappe.cache().pipeline().hgetall(frappe.cache().make_key(METRICS_KEY)).execute()[0]
+	raw = {field.decode(): float(value) for field, value in raw.items()}
+	rendered, hits = cint(raw.get("rendered")), cint(raw.get("cache_hits"))
+	return {
+		"rendered": rendered,
+		"cache_hits": hits,
+		"cache_hit_ratio": hits / (hits + rendered) if hits + rendered else None,
+		"avg_render_ms": raw.get("render_ms", 0) / rendered if rendered else None,
+		"avg_pdf_bytes": raw.get("bytes", 0) / rendered if rendered else None,
+	}
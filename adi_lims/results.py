@@ -0,0 +1,188 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Bulk result entry.
+
+A whole analyzer run is validated in a few passes over the batch and written
+with chunked multi-row UPDATEs in a single transaction. Rows that fail
+validation are reported back and skipped; they never abort the batch.
+"""
+
+import csv
+import io
+import json
+import math
+
+import frappe
+from frappe import _
+
+from adi_lims.cumulative import touch_results
+from adi_lims.flagging import flag_results
+from adi_lims.qc import validate_run_fields
+from adi_lims.realtime import publish_result_batch
+
+UPDATE_CHUNK_SIZE = 1000
+MAX_RESULT_LENGTH = 140  # Lab Test Result.result_value is a Data field
+
+
+def parse_results_payload(results):
+	"""Normalise the accepted payload shapes into a list of (test_result_name, result_value).
+
+	Accepts a list of pairs or dicts, a JSON string of the same, or CSV text with a
+	`test_result_name,result_value` header (or two unlabeled columns).
+	"""
+	if isinstance(results, str):
+		stripped = results.lstrip()
+		if stripped.startswith(("[", "{")):
+			results = json.loads(results)
+		else:
+			results = _parse_csv(results)
+
+	if isinstance(results, dict):
+		results = list(results.items())
+
+	pairs = []
+	for row in results:
+		if isinstance(row, dict):
+			pairs.append((row.get("test_result_name") or row.get("name"), row.get("result_value")))
+		else:
+			name, value = [*list(row), None, None][:2]
+			pairs.append((name, value))
+	return pairs
+
+
+def _parse_csv(text):
+	rows = [row for row in csv.reader(io.StringIO(text)) if row]
+	if rows and rows[0][0].strip().lower() in ("test_result_name", "name"):
+		rows = rows[1:]
+	return [(row[0].strip(), row[1].strip() if len(row) > 1 else None) for row in rows]
+
+
+def to_numeric(value):
+	"""Parse a result value as a finite float, or None if it is not numeric."""
+	if value is None or isinstance(value, bool):
+		return None
+	try:
+		number = float(value)
+	except (ValueError, TypeError):
+		return None
+	return number if math.isfinite(number) else None
+
+
+def validate_results(pairs):
+	"""Split pairs into valid rows and per-row errors.
+
+	Returns (rows, errors) where rows are (name, result_value, numeric_result_value).
+	Verified results are reported as errors rather than overwritten.
+	"""
+	errors = []
+	candidates = {}
+	for idx, (name, value) in enumerate(pairs):
+		name = "" if name is None else str(name).strip()
+		value = "" if value is None else str(value).strip()
+		if not name:
+			errors.append(_error(idx, name, _("Test result name is missing")))
+		elif len(value) > MAX_RESULT_LENGTH:
+			errors.append(
+				_error(idx, name, _("Result value is longer than {0} characters").format(MAX_RESULT_LENGTH))
+			)
+		elif name in candidates:
+			errors.append(_error(idx, name, _("Duplicate test result in batch")))
+		else:
+			candidates[name] = (idx, value)
+
+	existing = {}
+	names = list(candidates)
+	for start in range(0, len(names), UPDATE_CHUNK_SIZE):
+		existing.update(
+			frappe.get_all(
+				"Lab Test Result",
+				filters={"name": ("in", names[start : start + UPDATE_CHUNK_SIZE])},
+				fields=["name", "status"],
+				as_list=True,
+			)
+		)
+
+	rows = []
+	for name, (idx, value) in candidates.items():
+		if name not in existing:
+			errors.append(_error(idx, name, _("Lab Test Result {0} not found").format(name)))
+		elif existing[name] == "Verified":
+			errors.append(_error(idx, name, _("Lab Test Result {0} is already verified").format(name)))
+		else:
+			rows.append((name, value, to_numeric(value)))
+
+	errors.sort(key=lambda error: error["row"])
+	return rows, errors
+
+
+def _error(idx, name, message):
+	return {"row": idx, "test_result_name": name, "message": message}
+
+
+def write_results(rows, status="Completed", instrument=None, qc_run=None):
+	"""Write validated rows with one CASE-based UPDATE per chunk.
+
+	A new value needs a new verification, so a rejected result re-entered here
+	goes back into the verification queue. `instrument` and `qc_run` stamp the
+	analytical run the values came from (see adi_lims.qc).
+	"""
+	now = frappe.utils.now()
+	user = frappe.session.user
+	run_assignment = ", instrument = %s, qc_run = %s" if instrument else ""
+	for start in range(0, len(rows), UPDATE_CHUNK_SIZE):
+		chunk = rows[start : start + UPDATE_CHUNK_SIZE]
+		cases = " ".join(["when %s then %s"] * len(chunk))
+		values = []
+		for name, value, _numeric in chunk:
+			values.extend((name, value))
+		for name, _value, numeric in chunk:
+			values.extend((name, numeric))
+		values.extend((status, now, now, user))
+		if instrument:
+			values.extend((instrument, qc_run))
+		values.extend(name for name, _value, _numeric in chunk)
+
+		frappe.db.sql(
+			f"""
+			update `tabLab Test Result`
+			set
+				result_value = case name {cases} end,
+				numeric_result_value = case name {cases} end,
+				status = %s, completed_on = ifnull(completed_on, %s), modified = %s, modified_by = %s,
+				verification_status = 'Pending', verifier = null, verified_on = null{run_assignment}
+			where name in ({", ".join(["%s"] * len(chunk))})
+			""",
+			values,
+		)
+	touch_results([name for name, _value, _numeric in rows])
+
+
+def bulk_update_results(results, instrument=None, qc_run=None):
+	"""Validate and save a batch of results in one transaction.
+
+	`instrument` and `qc_run` name the analytical run the batch came from, so
+	its results are held until the run's QC is accepted. Returns the number of
+	updated rows, the per-row errors and the abnormal flags set on the saved rows.
+	"""
+	frappe.has_permission("Sample", "write", throw=True)
+	validate_run_fields(instrument, qc_run)
+
+	rows, errors = validate_results(parse_results_payload(results))
+	flags = save_results(rows, instrument=instrument, qc_run=qc_run)
+	return {"updated": len(rows), "errors": errors, "flags": flags}
+
+
+def save_results(rows, instrument=None, qc_run=None):
+	"""Write validated rows, flag them and announce the batch; returns the flags.
+
+	The one path for every batch writer (bulk entry, instrument ingestion), so
+	they all leave the same flags, QC run and realtime updates behind.
+	"""
+	if not rows:
+		return {}
+	validate_run_fields(instrument, qc_run)
+	write_results(rows, instrument=instrument, qc_run=qc_run)
+	flags = flag_results([name for name, _value, _numeric in rows])
+	publish_result_batch(rows)
+	return flags
@@ -0,0 +1,233 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Sample status state machine.
+
+TRANSITIONS lists the statuses a Sample may move to from each status. Form
+saves are checked against it in Sample.validate; batches of samples move
+with `transition_samples`, which updates a whole chunk in one statement:
+
+	update `tabSample` set status = <to>, modified = <now>
+	where name in (...) and status in (<allowed from>) and modified = <version read>
+
+`modified` is the version, as in frappe's own "document has been modified"
+check: a row changed by another worker since it was read no longer matches
+and is reported as a conflict instead of being overwritten. Rows that did
+move get the Version row a save would have written (Sample tracks changes)
+with one multi-row INSERT, and are announced once per batch to the
+`sample_status_transition` hooks, which do what the Sample doc_events do for
+a single save.
+"""
+
+import frappe
+from frappe import _
+from frappe.utils import get_datetime, now
+
+TRANSITIONS = {
+	"Received": ("In-Progress", "Rejected", "Disposed"),
+	"In-Progress": ("Analyzed", "Rejected"),
+	"Analyzed": ("Rejected", "Disposed"),
+	"Rejected": ("Disposed",),
+	"Disposed": (),
+}
+MAX_BATCH_SIZE = 10000
+UPDATE_CHUNK_SIZE = 1000
+
+
+def get_allowed_sources(status):
+	return [source for source, targets in TRANSITIONS.items() if status in targets]
+
+
+def validate_transition(doc):
+	"""Sample.validate: refuse a status change the state machine does not allow."""
+	previous = doc.get_doc_before_save()
+	if previous and previous.status != doc.status and doc.status not in TRANSITIONS.get(previous.status, ()):
+		frappe.throw(
+			_("Sample {0} cannot move from {1} to {2}").format(doc.name, previous.status, doc.status),
+			title=_("Invalid status change"),
+		)
+
+
+def _resolve_samples(samples=None, filters=None):
+	"""(names, more): the listed samples, or those matching `filters`, that the user can read."""
+	if samples:
+		names = list(dict.fromkeys(samples))
+		if len(names) > MAX_BATCH_SIZE:
+			frappe.throw(_("At most {0} samples can change status in one batch").format(MAX_BATCH_SIZE))
+		permitted = set()
+		for start in range(0, len(names), UPDATE_CHUNK_SIZE):
+			permitted.update(
+				frappe.get_list(
+					"Sample",
+					filters={"name": ("in", names[start : start + UPDATE_CHUNK_SIZE])},
+					pluck="name",
+					limit=UPDATE_CHUNK_SIZE,
+				)
+			)
+		return [name for name in names if name in permitted], False
+	if filters:
+		names = frappe.get_list(
+			"Sample", filters=filters, pluck="name", order_by="name asc", limit=MAX_BATCH_SIZE + 1
+		)
+		return names[:MAX_BATCH_SIZE], len(names) > MAX_BATCH_SIZE
+	frappe.throw(_("Pass a list of samples or filters"))
+
+
+def _read_versions(names):
+	rows = {}
+	for start in range(0, len(names), UPDATE_CHUNK_SIZE):
+		for row in frappe.get_all(
+			"Sample",
+			filters={"name": ("in", names[start : start + UPDATE_CHUNK_SIZE])},
+			fields=["name", "status", "modified", "storage_location", "patient"],
+		):
+			rows[row.name] = row
+	return rows
+
+
+def _update_chunk(rows, status, sources, timestamp, user):
+	"""Conditional UPDATE of one chunk; returns the names this statement moved."""
+	names = [row.name for row in rows]
+	versions = []
+	for row in rows:
+		versions.extend((row.name, row.modified))
+	frappe.db.sql(
+		f"""
+		update `tabSample`
+		set status = %s, modified = %s, modified_by = %s
+		where name in ({", ".join(["%s"] * len(names))})
+			and status in ({", ".join(["%s"] * len(sources))})
+			and modified = case name {" ".join(["when %s then %s"] * len(rows))} end
+		""",
+		[status, timestamp, user, *names, *sources, *versions],
+	)
+	# our own UPDATE holds the row locks, so the rows carrying our timestamp are exactly ours
+	return set(
+		frappe.db.sql_list(
+			f"""
+			select name from `tabSample`
+			where name in ({", ".join(["%s"] * len(names))}) and status = %s and modified = %s
+			""",
+			[*names, status, timestamp],
+		)
+	)
+
+
+def transition_samples(status, samples=None, filters=None, expected=None):
+	"""Move a batch of samples to `status`.
+
+	:param samples: Sample names; or
+	:param filters: get_list filters selecting the samples (at most MAX_BATCH_SIZE per call).
+	:param expected: optional {name: modified} the caller last saw; a sample
+		modified since is reported as a conflict.
+
+	Returns the names per outcome: transitioned, unchanged (already in
+	`status`), invalid (transition not allowed), conflicts, not_found; and
+	`more` when `filters` matched more samples than one batch.
+	"""
+	frappe.has_permission("Sample", "write", throw=True)
+	if status not in TRANSITIONS:
+		frappe.throw(_("Invalid sample status {0}").format(status))
+
+	names, more = _resolve_samples(samples, filters)
+	expected = expected or {}
+	sources = get_allowed_sources(status)
+	current = _read_versions(names)
+
+	response = {
+		"transitioned": [],
+		"unchanged": [],
+		"invalid": [],
+		"conflicts": [],
+		# listed samples the user cannot read are reported like missing ones
+		"not_found": [name for name in dict.fromkeys(samples or names) if name not in current],
+		"more": more,
+	}
+	eligible = []
+	for name in names:
+		row = current.get(name)
+		if not row:
+			continue
+		if row.status == status:
+			response["unchanged"].append(name)
+		elif row.status not in sources:
+			response["invalid"].append(name)
+		elif name in expected and get_datetime(expected[name]) != get_datetime(row.modified):
+			response["conflicts"].append(name)
+		else:
+			eligible.append(row)
+
+	timestamp, user, moved = now(), frappe.session.user, []
+	for start in range(0, len(eligible), UPDATE_CHUNK_SIZE):
+		chunk = eligible[start : start + UPDATE_CHUNK_SIZE]
+		won = _update_chunk(chunk, status, sources, timestamp, user)
+		for row in chunk:
+			(moved if row.name in won else response["conflicts"]).append(row)
+
+	response["transitioned"] = [row.name for row in moved]
+	if moved:
+		after_transition(status, moved, timestamp)
+	return response
+
+
+def insert_versions(status, rows, timestamp):
+	"""One Version per moved sample, with the same diff a form save would record."""
+	if not frappe.get_meta("Sample").track_changes:
+		return
+	user = frappe.session.user
+	frappe.db.bulk_insert(
+		"Version",
+		["name", "ref_doctype", "docname", "data", "owner", "modified_by", "creation", "modified"],
+		[
+			(
+				frappe.generate_hash(length=10),
+				"Sample",
+				row.name,
+				frappe.as_json(
+					{
+						"changed": [["status", row.status, status]],
+						"added": [],
+						"removed": [],
+						"row_changed": [],
+					},
+					indent=None,
+				),
+				user,
+				user,
+				timestamp,
+				timestamp,
+			)
+			for row in rows
+		],
+		chunk_size=UPDATE_CHUNK_SIZE,
+	)
+
+
+def after_transition(status, rows, timestamp):
+	"""Record the moves and run the `sample_status_transition` hooks once for the whole batch."""
+	insert_versions(status, rows, timestamp)
+	counters = {status: len(rows)}
+	for row in rows:
+		counters[row.status] = counters.get(row.status, 0) - 1
+	batch = frappe._dict(
+		doctype="Sample",
+		status=status,
+		modified=timestamp,
+		rows=[
+			frappe._dict(
+				name=row.name,
+				from_status=row.status,
+				storage_location=row.storage_location,
+				patient=row.patient,
+			)
+			for row in rows
+		],
+		counters=counters,
+	)
+	for method in frappe.get_hooks("sample_status_transition"):
+		frappe.get_attr(method)(batch)
+
+
+def get_transition_map():
+	"""TRANSITIONS for the desk page, so buttons only offer allowed moves."""
+	return {source: list(targets) for source, targets in TRANSITIONS.items()}
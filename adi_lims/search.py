@@ -0,0 +1,419 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Patient and sample search.
+
+`__lims_search` is a plain token table, like frappe's `__global_search`,
+clustered on the token so every lookup is an index range scan:
+
+- words of names, lower-cased, answer prefix queries (`token like 'sha%'`);
+- identifiers (UHID, mobile number, S-number, sample name) are also indexed
+  with punctuation removed, so "S-00123" and "s00123" both match;
+- identifiers get "#"-prefixed trigrams for infix queries such as the last
+  digits of a mobile number.
+
+Rows are rewritten from doc_events (and once per batch by bulk accessioning).
+Entries of archived samples are kept under "<doctype> Archive" and only
+searched when asked for.
+Each worker also keeps a prefix trie over the most recently modified patients
+for typeahead, rebuilt every TRIE_TTL seconds.
+"""
+
+import re
+import time
+
+import frappe
+
+from adi_lims.lookup import get_many
+
+SEARCH_TABLE = "__lims_search"
+TRIGRAM_MARKER = "#"
+MAX_TOKEN_LENGTH = 64
+MIN_PREFIX_LENGTH = 2
+CANDIDATES_PER_TERM = 2000
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+REINDEX_CHUNK_SIZE = 5000
+
+# score multipliers by how a query term matched a token
+EXACT, PREFIX, INFIX = 3, 2, 1
+
+# doctype -> {field: (weight, is_identifier)}
+SEARCH_FIELDS = {
+	"Patient": {
+		"name": (5, True),
+		"mobile_no": (4, True),
+		"first_name": (3, False),
+		"last_name": (3, False),
+	},
+	"Sample": {
+		"name": (5, True),
+		"sample_name": (4, True),
+		"patient": (1, True),
+	},
+}
+RESULT_FIELDS = {
+	"Patient": ["name", "first_name", "last_name", "mobile_no", "gender", "dob"],
+	"Sample": ["name", "sample_name", "patient", "status", "collection_date"],
+}
+
+TRIE_SIZE = 5000
+TRIE_TTL = 60
+TRIE_RESULTS_PER_NODE = 10
+
+_WORD = re.compile(r"[^\W_]+", re.UNICODE)
+_tries = {}
+
+
+def setup_search_table():
+	frappe.db.sql(
+		f"""
+		create table if not exists `{SEARCH_TABLE}` (
+			token varchar({MAX_TOKEN_LENGTH}) not null,
+			ref_doctype varchar(64) not null,
+			ref_name varchar(140) not null,
+			field varchar(64) not null,
+			weight tinyint not null,
+			primary key (token, ref_doctype, ref_name, field),
+			key ref_index (ref_doctype, ref_name)
+		) engine=InnoDB character set=utf8mb4 collate=utf8mb4_unicode_ci
+		"""
+	)
+
+
+def get_words(value):
+	return [word.lower() for word in _WORD.findall(str(value or ""))]
+
+
+def compact(value):
+	return "".join(get_words(value))
+
+
+def get_trigrams(value):
+	return {value[i : i + 3] for i in range(len(value) - 2)}
+
+
+def get_tokens(doctype, row):
+	"""(token, field, weight) for one document; a token keeps its best weight per field."""
+	tokens = {}
+	for field, (weight, is_identifier) in SEARCH_FIELDS[doctype].items():
+		value = row.get(field)
+		if not value:
+			continue
+		terms = set(get_words(value))
+		if is_identifier:
+			identifier = compact(value)
+			terms.add(identifier)
+			terms.update(TRIGRAM_MARKER + trigram for trigram in get_trigrams(identifier))
+		for token in terms:
+			tokens[(token[:MAX_TOKEN_LENGTH], field)] = weight
+	return [(token, field, weight) for (token, field), weight in tokens.items()]
+
+
+def index_rows(doctype, rows):
+	"""Replace the index entries of `rows` (dicts with the SEARCH_FIELDS of `doctype`)."""
+	if not rows:
+		return
+	remove_from_index(doctype, [row["name"] for row in rows])
+	values = [
+		(token, doctype, row["name"], field, weight)
+		for row in rows
+		for token, field, weight in get_tokens(doctype, row)
+	]
+	for start in range(0, len(values), REINDEX_CHUNK_SIZE * 10):
+		chunk = values[start : start + REINDEX_CHUNK_SIZE * 10]
+		frappe.db.sql(
+			f"""
+			insert ignore into `{SEARCH_TABLE}` (token, ref_doctype, ref_name, field, weight)
+			values {", ".join(["(%s, %s, %s, %s, %s)"] * len(chunk))}
+			""",
+			[value for row in chunk for value in row],
+		)
+
+
+def remove_from_index(doctype, names):
+	if names:
+		frappe.db.sql(
+			f"delete from `{SEARCH_TABLE}` where ref_doctype = %s and ref_name in %s", (doctype, list(names))
+		)
+
+
+def get_archived_doctype(doctype):
+	"""ref_doctype under which the index keeps rows of archived documents."""
+	return f"{doctype} Archive"
+
+
+def set_archived(doctype, names, archived=True):
+	"""Move index rows of `names` out of (or back into) the live searches."""
+	if not names:
+		return
+	source, target = doctype, get_archived_doctype(doctype)
+	if not archived:
+		source, target = target, source
+	frappe.db.sql(
+		f"update ignore `{SEARCH_TABLE}` set ref_doctype = %s where ref_doctype = %s and ref_name in %s",
+		(target, source, list(names)),
+	)
+	# rows left behind by "ignore" were already present under the target
+	remove_from_index(source, names)
+
+
+def on_batch_insert(batch):
+	"""sample_batch_insert hook: index every new document with one delete and batched inserts."""
+	fields = SEARCH_FIELDS[batch.doctype]
+	index_rows(batch.doctype, [{field: doc.get(field) for field in fields} for doc in batch.rows])
+
+
+def on_update(doc, method=None):
+	"""doc_events hook for Patient and Sample."""
+	if doc.doctype not in SEARCH_FIELDS:
+		return
+	previous = doc.get_doc_before_save()
+	fields = SEARCH_FIELDS[doc.doctype]
+	if previous and all(previous.get(field) == doc.get(field) for field in fields):
+		return
+	index_rows(doc.doctype, [{field: doc.get(field) for field in fields}])
+	if doc.doctype == "Patient":
+		_add_to_trie(doc)
+
+
+def on_trash(doc, method=None):
+	remove_from_index(doc.doctype, [doc.name])
+
+
+def after_rename(doc, method=None, old_name=None, new_name=None, merge=False):
+	remove_from_index(doc.doctype, [old_name])
+	index_rows(doc.doctype, [{field: doc.get(field) for field in SEARCH_FIELDS[doc.doctype]}])
+
+
+def rebuild_search_index(doctype=None, chunk_size=REINDEX_CHUNK_SIZE):
+	"""Re-index every Patient and Sample (or one doctype) in keyset order, committing per chunk."""
+	setup_search_table()
+	for current in [doctype] if doctype else list(SEARCH_FIELDS):
+		if not frappe.db.table_exists(current):
+			continue
+		last_name = ""
+		while True:
+			rows = frappe.get_all(
+				current,
+				filters={"name": (">", last_name)},
+				fields=list(SEARCH_FIELDS[current]),
+				order_by="name asc",
+				limit=chunk_size,
+			)
+			if not rows:
+				break
+			index_rows(current, rows)
+			frappe.db.commit()
+			last_name = rows[-1].name
+
+
+def _term_query(idx, term, doctypes):
+	"""Candidate rows for one term, read straight off the token index and capped."""
+	if len(term) >= MIN_PREFIX_LENGTH:
+		condition, pattern = "token like %s", term + "%"
+	else:
+		condition, pattern = "token = %s", term
+	# words are alphanumeric only, so the pattern needs no escaping
+	return (
+		f"""
+		(select {idx} as term, ref_doctype, ref_name,
+			weight * case when token = %s then {EXACT} else {PREFIX} end as score
+		from `{SEARCH_TABLE}`
+		where {condition} and ref_doctype in ({", ".join(["%s"] * len(doctypes))})
+		limit {CANDIDATES_PER_TERM})
+		""",
+		[term, pattern, *doctypes],
+	)
+
+
+def _search_words(terms, doctypes, limit):
+	"""Documents matching every term, ranked by the summed best score per term."""
+	subqueries, values = [], []
+	for idx, term in enumerate(terms):
+		query, term_values = _term_query(idx, term, doctypes)
+		subqueries.append(query)
+		values.extend(term_values)
+	values.extend([len(terms), limit])
+
+	return frappe.db.sql(
+		f"""
+		select ref_doctype, ref_name, sum(score) as score
+		from (
+			select term, ref_doctype, ref_name, max(score) as score
+			from ({" union all ".join(subqueries)}) candidates
+			group by term, ref_doctype, ref_name
+		) per_term
+		group by ref_doctype, ref_name
+		having count(*) = %s
+		order by score desc, ref_name desc
+		limit %s
+		""",
+		values,
+		as_dict=True,
+	)
+
+
+def _search_trigrams(term, doctypes, limit):
+	"""Infix match on identifiers: documents holding every trigram of the term."""
+	trigrams = sorted(TRIGRAM_MARKER + trigram for trigram in get_trigrams(term))
+	if not trigrams:
+		return []
+	return frappe.db.sql(
+		f"""
+		select ref_doctype, ref_name, max(weight) * %s as score
+		from `{SEARCH_TABLE}`
+		where token in %s and ref_doctype in %s
+		group by ref_doctype, ref_name, field
+		having count(*) = %s
+		order by score desc, ref_name desc
+		limit %s
+		""",
+		(INFIX, trigrams, doctypes, len(trigrams), limit),
+		as_dict=True,
+	)
+
+
+def search(query, doctypes=None, limit=DEFAULT_LIMIT, typeahead=False, include_archived=False):
+	"""Ranked Patient and Sample matches for `query`.
+
+	Every word must prefix-match some indexed field. A single-word query that
+	finds too few documents is retried as an infix match on identifiers.
+	With `typeahead`, recent patients from the in-memory trie come first.
+	With `include_archived`, archived samples are searched too.
+	"""
+	limit = min(max(frappe.utils.cint(limit) or DEFAULT_LIMIT, 1), MAX_LIMIT)
+	doctypes = [
+		doctype
+		for doctype in (frappe.parse_json(doctypes) if doctypes else list(SEARCH_FIELDS))
+		if doctype in SEARCH_FIELDS and frappe.has_permission(doctype, "read")
+	]
+	words = get_words(query)
+	if not doctypes or not words:
+		return []
+
+	matches = {}
+	if typeahead and "Patient" in doctypes and len(words) == 1:
+		# the trie is shared by every user of the worker
+		for name in get_permitted("Patient", get_recent_patient_trie().lookup(words[0], limit)):
+			matches[("Patient", name)] = None
+
+	if include_archived:
+		from adi_lims.archive import ARCHIVE_TABLES
+
+		doctypes += [get_archived_doctype(doctype) for doctype in doctypes if doctype in ARCHIVE_TABLES]
+
+	terms = list(dict.fromkeys(term[:MAX_TOKEN_LENGTH] for term in words))
+	identifier = compact(query)[:MAX_TOKEN_LENGTH]
+	rows = []
+	if len(matches) < limit:
+		rows = _search_words(terms, doctypes, limit)
+		if len(terms) > 1 and len(rows) < limit:
+			# "S-00123" is indexed whole as well as word by word
+			rows += _search_words([identifier], doctypes, limit)
+		if len(rows) < limit and len(identifier) >= 3:
+			rows += _search_trigrams(identifier, doctypes, limit)
+	for row in sorted(rows, key=lambda row: -row.score):
+		matches.setdefault((row.ref_doctype, row.ref_name), row.score)
+
+	return _load_results(list(matches.items())[:limit])
+
+
+def get_permitted(doctype, names):
+	"""`names`, in order, without the documents the current user cannot read."""
+	if not names:
+		return []
+	permitted = set(frappe.get_list(doctype, filters={"name": ("in", names)}, pluck="name"))
+	return [name for name in names if name in permitted]
+
+
+def _load_results(matches):
+	names = {}
+	for (doctype, name), _score in matches:
+		names.setdefault(doctype, []).append(name)
+	docs = {}
+	for doctype, doc_names in names.items():
+		if doctype in RESULT_FIELDS:
+			# the index holds every document; get_many skips permission checks
+			rows = get_many(doctype, get_permitted(doctype, doc_names), RESULT_FIELDS[doctype]).values()
+		else:
+			from adi_lims.archive import get_archived_rows
+
+			live_doctype = doctype.removesuffix(" Archive")  # see get_archived_doctype
+			rows = get_archived_rows(
+				live_doctype, RESULT_FIELDS[live_doctype], filters={"name": ("in", doc_names)}
+			)
+		for row in rows:
+			docs[(doctype, row.name)] = row
+
+	results = []
+	for (doctype, name), score in matches:
+		row = docs.get((doctype, name))
+		# the index can briefly point at a document deleted in another transaction
+		if row:
+			archived = doctype not in RESULT_FIELDS
+			if archived:
+				doctype = doctype.removesuffix(" Archive")
+			results.append({"doctype": doctype, "score": score, "archived": int(archived), **row})
+	return results
+
+
+class PrefixTrie:
+	"""Token prefix -> most recent names, capped per node so a lookup is O(len(prefix))."""
+
+	def __init__(self):
+		self.root = {}
+
+	def insert(self, token, name):
+		node = self.root
+		for char in token:
+			node = node.setdefault(char, {})
+			names = node.setdefault("", [])
+			if name in names:
+				names.remove(name)
+			names.insert(0, name)
+			del names[TRIE_RESULTS_PER_NODE:]
+
+	def lookup(self, prefix, limit=TRIE_RESULTS_PER_NODE):
+		node = self.root
+		for char in prefix:
+			node = node.get(char)
+			if node is None:
+				return []
+		return node.get("", [])[:limit]
+
+
+def _trie_tokens(row):
+	tokens = set(get_words(row.get("first_name"))) | set(get_words(row.get("last_name")))
+	tokens.add(compact(row.get("name")))
+	if row.get("mobile_no"):
+		tokens.add(compact(row.get("mobile_no")))
+	return tokens
+
+
+def get_recent_patient_trie():
+	entry = _tries.get(frappe.local.site)
+	if entry and time.monotonic() - entry[0] < TRIE_TTL:
+		return entry[1]
+
+	trie = PrefixTrie()
+	# oldest first, so the most recent patients end up at the front of each node
+	for row in reversed(
+		frappe.get_all(
+			"Patient",
+			fields=["name", "first_name", "last_name", "mobile_no"],
+			order_by="modified desc",
+			limit=TRIE_SIZE,
+		)
+	):
+		for token in _trie_tokens(row):
+			trie.insert(token, row.name)
+	_tries[frappe.local.site] = (time.monotonic(), trie)
+	return trie
+
+
+def _add_to_trie(doc):
+	entry = _tries.get(frappe.local.site)
+	if entry:
+		for token in _trie_tokens(doc):
+			entry[1].insert(token, doc.name)
@@ -0,0 +1,288 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Storage occupancy.
+
+Storage Location is a nested set (lft/rgt), so the capacity and occupancy of
+a whole Freezer -> Rack -> Box subtree is one range query. Each location's
+current_occupancy counts the non-disposed Samples stored directly in it and
+is only ever changed with atomic `current_occupancy + n` updates: from the
+Sample doc_events when a sample is stored, moved, disposed or deleted, and
+once per batch from bulk accessioning and the allocator. Capacity 0 means
+the location has no limit.
+"""
+
+import heapq
+
+import frappe
+from frappe import _
+
+DISPOSED = "Disposed"
+BOX = "Box"
+FREE_BOX_PAGE_LENGTH = 50
+
+
+def _counted_location(doc):
+	"""The location a sample occupies, or None if it takes no space."""
+	if doc and doc.get("storage_location") and doc.get("status") != DISPOSED:
+		return doc.storage_location
+
+
+def apply_occupancy_deltas(deltas):
+	"""Apply {location: +/-n}; a location that would go over capacity raises."""
+	for location, delta in sorted(deltas.items()):
+		if not delta:
+			continue
+		if delta > 0:
+			# the row lock is held until commit, so the checked space cannot be taken meanwhile
+			space = frappe.db.sql(
+				"""
+				select ifnull(capacity, 0) as capacity, current_occupancy
+				from `tabStorage Location`
+				where name = %s
+				for update
+				""",
+				location,
+				as_dict=True,
+			)
+			if not space or (space[0].capacity and space[0].current_occupancy + delta > space[0].capacity):
+				frappe.throw(
+					_("Storage Location {0} does not have space for {1} more samples").format(
+						location, delta
+					),
+					title=_("Storage full"),
+				)
+			frappe.db.sql(
+				"""
+				update `tabStorage Location`
+				set current_occupancy = current_occupancy + %(delta)s
+				where name = %(location)s
+				""",
+				{"location": location, "delta": delta},
+			)
+		else:
+			frappe.db.sql(
+				"""
+				update `tabStorage Location`
+				set current_occupancy = greatest(current_occupancy + %(delta)s, 0)
+				where name = %(location)s
+				""",
+				{"location": location, "delta": delta},
+			)
+
+
+def _move_delta(before, after):
+	deltas = {}
+	if before:
+		deltas[before] = deltas.get(before, 0) - 1
+	if after:
+		deltas[after] = deltas.get(after, 0) + 1
+	return deltas
+
+
+def on_sample_update(doc, method=None):
+	"""doc_events hook; also runs on insert, when there is no previous version."""
+	before = _counted_location(doc.get_doc_before_save())
+	after = _counted_location(doc)
+	if before != after:
+		apply_occupancy_deltas(_move_delta(before, after))
+
+
+def on_sample_trash(doc, method=None):
+	location = _counted_location(doc)
+	if location:
+		apply_occupancy_deltas({location: -1})
+
+
+def on_sample_batch_insert(batch):
+	"""sample_batch_insert hook: one occupancy update per location for the new samples."""
+	deltas = {}
+	for doc in batch.rows:
+		location = _counted_location(doc)
+		if location:
+			deltas[location] = deltas.get(location, 0) + 1
+	apply_occupancy_deltas(deltas)
+
+
+def on_sample_transition(batch):
+	"""sample_status_transition hook: disposed samples free their slots."""
+	if batch.status != DISPOSED:
+		return
+	deltas = {}
+	for row in batch.rows:
+		if row.storage_location:
+			deltas[row.storage_location] = deltas.get(row.storage_location, 0) - 1
+	apply_occupancy_deltas(deltas)
+
+
+def get_subtree_occupancy(location):
+	"""Capacity, occupancy and free space of `location` and everything under it.
+
+	Capacity is summed over the leaves of the subtree (usually boxes), so a rack
+	does not count its own capacity on top of its boxes'.
+	"""
+	bounds = frappe.db.get_value("Storage Location", location, ["lft", "rgt"], as_dict=True)
+	if not bounds:
+		frappe.throw(_("Storage Location {0} not found").format(location))
+
+	totals = frappe.db.sql(
+		"""
+		select
+			sum(case when rgt = lft + 1 then ifnull(capacity, 0) else 0 end) as capacity,
+			sum(current_occupancy) as occupancy,
+			sum(case when rgt = lft + 1 and location_type = %(box)s then 1 else 0 end) as boxes
+		from `tabStorage Location`
+		where lft >= %(lft)s and rgt <= %(rgt)s
+		""",
+		{"lft": bounds.lft, "rgt": bounds.rgt, "box": BOX},
+		as_dict=True,
+	)[0]
+	capacity, occupancy = int(totals.capacity or 0), int(totals.occupancy or 0)
+	return {
+		"location": location,
+		"capacity": capacity,
+		"occupancy": occupancy,
+		"free": max(capacity - occupancy, 0),
+		"boxes": int(totals.boxes or 0),
+	}
+
+
+def get_free_boxes(location=None, near=None, page_len=FREE_BOX_PAGE_LENGTH):
+	"""Boxes with free space, closest in tree order to `near` first; a lazy iterator.
+
+	Boxes are searched inside `location` (default: the whole tree). Tree order
+	follows Freezer -> Rack -> Box, so the closest boxes share a rack or freezer
+	with `near`. The tree is walked outwards from `near` on the lft index, one
+	page of `page_len` boxes per side at a time, so only the boxes the caller
+	actually consumes are read and locked for update.
+	"""
+	conditions = ["location_type = %(box)s", "(ifnull(capacity, 0) = 0 or current_occupancy < capacity)"]
+	values = {"box": BOX}
+	if location:
+		bounds = frappe.db.get_value("Storage Location", location, ["lft", "rgt"], as_dict=True)
+		if not bounds:
+			frappe.throw(_("Storage Location {0} not found").format(location))
+		conditions.append("lft >= %(lft)s and rgt <= %(rgt)s")
+		values.update(bounds)
+
+	values["anchor"] = 0
+	if near:
+		values["anchor"] = frappe.db.get_value("Storage Location", near, "lft") or 0
+
+	# on equal distance the box before the anchor comes first, as the merge prefers earlier iterables
+	return heapq.merge(
+		_walk_boxes(conditions, values, forward=False, page_len=page_len),
+		_walk_boxes(conditions, values, forward=True, page_len=page_len),
+		key=lambda box: abs(box.lft - values["anchor"]),
+	)
+
+
+def _walk_boxes(conditions, values, forward, page_len):
+	"""Boxes matching `conditions` from the anchor towards one end of the tree, keyset-paged by lft."""
+	operator, order = (">=", "asc") if forward else ("<", "desc")
+	last = values["anchor"]
+	while True:
+		boxes = frappe.db.sql(
+			f"""
+			select name, lft, capacity, current_occupancy
+			from `tabStorage Location`
+			where {" and ".join(conditions)} and lft {operator} %(last)s
+			order by lft {order}
+			limit %(page_len)s
+			for update
+			""",
+			{**values, "last": last, "page_len": page_len},
+			as_dict=True,
+		)
+		yield from boxes
+		if len(boxes) < page_len:
+			return
+		last = boxes[-1].lft
+		operator = ">" if forward else "<"
+
+
+def allocate_samples(samples, location=None, near=None):
+	"""Place `samples` into the nearest boxes with free space, filling each box in turn.
+
+	Returns {sample: box}. Samples keep their order, so consecutive samples end
+	up in the same box. Raises if the boxes cannot hold all of them.
+	"""
+	frappe.has_permission("Sample", "write", throw=True)
+	samples = list(dict.fromkeys(samples))
+	if not samples:
+		return {}
+
+	current = {
+		row.name: row
+		for row in frappe.get_all(
+			"Sample", filters={"name": ("in", samples)}, fields=["name", "storage_location", "status"]
+		)
+	}
+	errors = []
+	for name in samples:
+		if name not in current:
+			errors.append(_("Sample {0} not found").format(name))
+		elif current[name].status == DISPOSED:
+			errors.append(_("Sample {0} is disposed").format(name))
+	if errors:
+		frappe.throw("<br>".join(errors), title=_("Allocation failed"))
+
+	allocation, pending = {}, iter(samples)
+	for box in get_free_boxes(location, near):
+		free = (box.capacity - box.current_occupancy) if box.capacity else len(samples)
+		for _i in range(free):
+			name = next(pending, None)
+			if name is None:
+				break
+			allocation[name] = box.name
+		if len(allocation) == len(samples):
+			break
+	if len(allocation) < len(samples):
+		frappe.throw(
+			_("Only {0} of {1} samples fit in the free boxes").format(len(allocation), len(samples)),
+			title=_("Storage full"),
+		)
+
+	deltas = {}
+	for name, box in allocation.items():
+		for key, delta in _move_delta(_counted_location(current[name]), box).items():
+			deltas[key] = deltas.get(key, 0) + delta
+	apply_occupancy_deltas(deltas)
+	_set_sample_locations(allocation)
+	return allocation
+
+
+def _set_sample_locations(allocation, chunk_size=1000):
+	now, user = frappe.utils.now(), frappe.session.user
+	items = list(allocation.items())
+	for start in range(0, len(items), chunk_size):
+		chunk = items[start : start + chunk_size]
+		values = [v for name, box in chunk for v in (name, box)]
+		values += [now, user]
+		values += [name for name, _box in chunk]
+		frappe.db.sql(
+			f"""
+			update `tabSample`
+			set storage_location = case name {" ".join(["when %s then %s"] * len(chunk))} end,
+				modified = %s, modified_by = %s
+			where name in ({", ".join(["%s"] * len(chunk))})
+			""",
+			values,
+		)
+
+
+def recount_occupancy():
+	"""Rebuild every current_occupancy from the Sample table (used by the patch)."""
+	frappe.db.sql(
+		"""
+		update `tabStorage Location` location
+		left join (
+			select storage_location, count(*) as occupancy
+			from `tabSample`
+			where ifnull(storage_location, '') != '' and status != %s
+			group by storage_location
+		) stored on stored.storage_location = location.name
+		set location.current_occupancy = ifnull(stored.occupancy, 0)
+		""",
+		DISPOSED,
+	)
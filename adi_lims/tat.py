@@ -0,0 +1,319 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Turnaround time (TAT) rollups.
+
+Lab TAT Rollup holds one row per (day, department, lab test, stage) with the
+result count, total and max minutes and a histogram over fixed TAT bins.
+Histograms merge by adding bins, so percentiles for any date range and
+department are computed from a few hundred rollup rows instead of scanning
+Sample and Lab Test Result.
+
+Stages run from Sample.collection_date -> Sample.received_date -> result
+completed_on -> result verified_on; a result is bucketed on the day it was
+completed. The scheduler refreshes incrementally: results modified since the
+stored watermark name the (day, lab test) buckets that changed, and only those
+are recomputed. `bench --site <site> lims-tat-backfill` rebuilds history a
+few days at a time.
+"""
+
+import bisect
+import hashlib
+import json
+from datetime import datetime, timedelta
+
+import frappe
+from frappe.utils import add_days, get_datetime, getdate, now_datetime
+
+from adi_lims.catalog import get_catalog
+
+ROLLUP_DOCTYPE = "Lab TAT Rollup"
+WATERMARK_KEY = "adi_lims_tat_watermark"
+# rows committed late can carry an older `modified`; recomputing a bucket twice is harmless
+WATERMARK_OVERLAP = timedelta(minutes=10)
+BACKFILL_CHUNK_DAYS = 7
+INSERT_CHUNK_SIZE = 5000
+
+COLLECTION_TO_RECEIPT = "Collection to Receipt"
+RECEIPT_TO_RESULT = "Receipt to Result"
+RESULT_TO_VERIFICATION = "Result to Verification"
+TOTAL = "Total"
+STAGES = (COLLECTION_TO_RECEIPT, RECEIPT_TO_RESULT, RESULT_TO_VERIFICATION, TOTAL)
+
+# upper bounds of the histogram bins in minutes; the last bin is open-ended
+HISTOGRAM_BINS = (
+	5,
+	10,
+	15,
+	30,
+	45,
+	60,
+	90,
+	120,
+	180,
+	240,
+	360,
+	480,
+	720,
+	1080,
+	1440,
+	2160,
+	2880,
+	4320,
+	5760,
+	7200,
+	10080,
+	20160,
+)
+
+ROLLUP_FIELDS = (
+	"name",
+	"tat_date",
+	"department",
+	"lab_test",
+	"stage",
+	"result_count",
+	"total_minutes",
+	"max_minutes",
+	"histogram",
+	"owner",
+	"modified_by",
+	"creation",
+	"modified",
+)
+
+
+def set_result_timestamps(doc, method=None):
+	"""doc_events validate hook on Lab Test Result: stamp completion and verification."""
+	if doc.status in ("Completed", "Verified") and not doc.completed_on:
+		doc.completed_on = now_datetime()
+	if (doc.status == "Verified" or doc.verification_status == "Verified") and not doc.verified_on:
+		doc.verified_on = now_datetime()
+
+
+def set_sample_result_timestamps(sample):
+	"""Called from Sample.validate: doc_events do not run for results saved through their Sample."""
+	for row in sample.get("sample_test_results"):
+		set_result_timestamps(row)
+
+
+def _minutes(start, end):
+	if not start or not end:
+		return None
+	minutes = (get_datetime(end) - get_datetime(start)).total_seconds() / 60
+	return minutes if minutes >= 0 else None
+
+
+def get_stage_minutes(row):
+	"""stage -> minutes for one source row; stages with a missing or negative span are left out."""
+	spans = {
+		COLLECTION_TO_RECEIPT: _minutes(row.collection_date, row.received_date),
+		RECEIPT_TO_RESULT: _minutes(row.received_date, row.completed_on),
+		RESULT_TO_VERIFICATION: _minutes(row.completed_on, row.verified_on),
+		TOTAL: _minutes(row.collection_date, row.verified_on),
+	}
+	return {stage: minutes for stage, minutes in spans.items() if minutes is not None}
+
+
+class Bucket:
+	__slots__ = ("count", "histogram", "max", "total")
+
+	def __init__(self):
+		self.count = 0
+		self.total = 0.0
+		self.max = 0.0
+		self.histogram = [0] * (len(HISTOGRAM_BINS) + 1)
+
+	def add(self, minutes):
+		self.count += 1
+		self.total += minutes
+		self.max = max(self.max, minutes)
+		self.histogram[bisect.bisect_left(HISTOGRAM_BINS, minutes)] += 1
+
+	def merge(self, count, total, max_minutes, histogram):
+		self.count += count
+		self.total += total
+		self.max = max(self.max, max_minutes)
+		for i, value in enumerate(histogram):
+			self.histogram[i] += value
+
+	def percentile(self, p):
+		"""Estimate by linear interpolation inside the bin that holds the p-th result."""
+		if not self.count:
+			return None
+		rank = p / 100 * self.count
+		seen = 0
+		for i, value in enumerate(self.histogram):
+			if value and seen + value >= rank:
+				lower = HISTOGRAM_BINS[i - 1] if i else 0
+				upper = HISTOGRAM_BINS[i] if i < len(HISTOGRAM_BINS) else self.max
+				return min(lower + (upper - lower) * (rank - seen) / value, self.max)
+			seen += value
+		return self.max
+
+
+def _iter_source_rows(start, end, lab_tests=None):
+	"""Results completed in [start, end), with their sample dates."""
+	conditions = ["r.parenttype = 'Sample'", "r.completed_on >= %(start)s", "r.completed_on < %(end)s"]
+	values = {"start": start, "end": end}
+	if lab_tests:
+		conditions.append("r.lab_test in %(lab_tests)s")
+		values["lab_tests"] = list(lab_tests)
+
+	return frappe.db.sql(
+		f"""
+		select r.lab_test, r.completed_on, r.verified_on, s.collection_date, s.received_date
+		from `tabLab Test Result` r
+		inner join `tabSample` s on s.name = r.parent
+		where {" and ".join(conditions)}
+		""",
+		values,
+		as_dict=True,
+	)
+
+
+def rebuild_buckets(start_date, end_date, lab_tests=None):
+	"""Recompute the rollup rows for days in [start_date, end_date), optionally for some tests only."""
+	start = get_datetime(getdate(start_date))
+	end = get_datetime(getdate(end_date))
+	catalog = get_catalog()
+
+	buckets = {}
+	for row in _iter_source_rows(start, end, lab_tests):
+		test = catalog.get_test(row.lab_test)
+		key = (getdate(row.completed_on), test.department if test else None, row.lab_test)
+		for stage, minutes in get_stage_minutes(row).items():
+			bucket = buckets.get((*key, stage))
+			if bucket is None:
+				bucket = buckets[(*key, stage)] = Bucket()
+			bucket.add(minutes)
+
+	filters = {"tat_date": ("between", [start.date(), add_days(end.date(), -1)])}
+	if lab_tests:
+		filters["lab_test"] = ("in", list(lab_tests))
+	frappe.db.delete(ROLLUP_DOCTYPE, filters)
+
+	timestamp, user = frappe.utils.now(), frappe.session.user
+	rows = [
+		(
+			_bucket_name(tat_date, lab_test, stage),
+			tat_date,
+			department,
+			lab_test,
+			stage,
+			bucket.count,
+			bucket.total,
+			bucket.max,
+			json.dumps(bucket.histogram),
+			user,
+			user,
+			timestamp,
+			timestamp,
+		)
+		for (tat_date, department, lab_test, stage), bucket in buckets.items()
+	]
+	if rows:
+		frappe.db.bulk_insert(ROLLUP_DOCTYPE, ROLLUP_FIELDS, rows, chunk_size=INSERT_CHUNK_SIZE)
+	return len(rows)
+
+
+def _bucket_name(tat_date, lab_test, stage):
+	return hashlib.md5(f"{tat_date}|{lab_test}|{stage}".encode()).hexdigest()
+
+
+def refresh_tat_rollups():
+	"""Scheduler job: recompute the buckets touched by results modified since the last run."""
+	started = now_datetime()
+	watermark = frappe.db.get_global(WATERMARK_KEY)
+	if not watermark:
+		# nothing rolled up yet: `lims-tat-backfill` builds history, start from today
+		watermark = datetime.combine(getdate(), datetime.min.time())
+	since = get_datetime(watermark) - WATERMARK_OVERLAP
+
+	changed = frappe.db.sql(
+		"""
+		select date(completed_on) as tat_date, lab_test
+		from `tabLab Test Result`
+		where parenttype = 'Sample' and modified >= %s and completed_on is not null
+		group by date(completed_on), lab_test
+		""",
+		since,
+		as_dict=True,
+	)
+
+	tests_by_day = {}
+	for row in changed:
+		tests_by_day.setdefault(row.tat_date, set()).add(row.lab_test)
+	for tat_date, lab_tests in sorted(tests_by_day.items()):
+		rebuild_buckets(tat_date, add_days(tat_date, 1), lab_tests)
+
+	frappe.db.set_global(WATERMARK_KEY, str(started))
+	frappe.db.commit()
+	return len(changed)
+
+
+def backfill_tat_rollups(from_date, to_date=None, chunk_days=BACKFILL_CHUNK_DAYS, progress=None):
+	"""Rebuild rollups for [from_date, to_date] a few days at a time, committing each chunk."""
+	start, last = getdate(from_date), getdate(to_date or getdate())
+	started, rows = now_datetime(), 0
+	while start <= last:
+		end = min(getdate(add_days(start, chunk_days)), getdate(add_days(last, 1)))
+		rows += rebuild_buckets(start, end)
+		frappe.db.commit()
+		if progress:
+			progress(start, end, rows)
+		start = end
+
+	if not frappe.db.get_global(WATERMARK_KEY):
+		frappe.db.set_global(WATERMARK_KEY, str(started))
+		frappe.db.commit()
+	return rows
+
+
+def get_tat_percentiles(
+	from_date, to_date, stage=TOTAL, department=None, lab_test=None, group_by=None, percentiles=(50, 90, 95)
+):
+	"""Count, mean, max and percentile TAT in minutes over a date range.
+
+	`group_by` is None, "department" or "lab_test"; grouped results are keyed by
+	that field.
+	"""
+	if stage not in STAGES:
+		frappe.throw(frappe._("Unknown TAT stage: {0}").format(stage))
+	if group_by not in (None, "department", "lab_test"):
+		frappe.throw(frappe._("TAT can only be grouped by department or lab_test"))
+
+	filters = {"tat_date": ("between", [getdate(from_date), getdate(to_date)]), "stage": stage}
+	if department:
+		filters["department"] = department
+	if lab_test:
+		filters["lab_test"] = lab_test
+
+	groups = {}
+	for row in frappe.get_all(
+		ROLLUP_DOCTYPE,
+		filters=filters,
+		fields=["department", "lab_test", "result_count", "total_minutes", "max_minutes", "histogram"],
+	):
+		key = row.get(group_by) if group_by else None
+		bucket = groups.get(key)
+		if bucket is None:
+			bucket = groups[key] = Bucket()
+		histogram = json.loads(row.histogram) if isinstance(row.histogram, str) else row.histogram
+		bucket.merge(row.result_count, row.total_minutes, row.max_minutes, histogram)
+
+	summaries = {key: _summarize(bucket, percentiles) for key, bucket in groups.items()}
+	if group_by:
+		return summaries
+	return summaries.get(None) or _summarize(Bucket(), percentiles)
+
+
+def _summarize(bucket, percentiles):
+	summary = {
+		"count": bucket.count,
+		"mean_minutes": bucket.total / bucket.count if bucket.count else None,
+		"max_minutes": bucket.max if bucket.count else None,
+	}
+	for p in percentiles:
+		summary[f"p{p:g}"] = bucket.percentile(float(p))
+	return summary
@@ -0,0 +1,73 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from adi_lims.accessioning import accession_samples
+from adi_lims.tests.utils import make_lab_test, make_sample_type
+
+
+def make_box(name="_Test LIMS Box", capacity=10):
+	if not frappe.db.exists("Storage Location", name):
+		frappe.get_doc(
+			{
+				"doctype": "Storage Location",
+				"location_name": name,
+				"location_type": "Box",
+				"capacity": capacity,
+			}
+		).insert()
+	return name
+
+
+class TestAccessioning(FrappeTestCase):
+	def make_batch(self, count, **fields):
+		return [
+			{"sample_name": f"_Test Accession {i}", "sample_type": make_sample_type(), **fields}
+			for i in range(count)
+		]
+
+	def test_samples_and_results_are_created(self):
+		lab_test = make_lab_test("_Test LIMS Glucose")
+		names = accession_samples(self.make_batch(3, lab_tests=[lab_test, lab_test]))
+
+		self.assertEqual(len(names), 3)
+		self.assertEqual(set(frappe.get_all("Sample", {"name": ("in", names)}, pluck="status")), {"Received"})
+		results = frappe.get_all(
+			"Lab Test Result", {"parenttype": "Sample", "parent": ("in", names)}, pluck="lab_test"
+		)
+		# the duplicate order is only run once
+		self.assertEqual(results, [lab_test] * 3)
+
+	def test_sample_validation_runs_for_every_row(self):
+		def validate(doc):
+			if doc.sample_name.endswith(("1", "2")):
+				frappe.throw("rejected by validate")
+
+		with patch("adi_lims.adi_lims.doctype.sample.sample.Sample.validate", validate):
+			with self.assertRaises(frappe.ValidationError) as error:
+				accession_samples(self.make_batch(3))
+
+		self.assertIn("Row 2: rejected by validate", str(error.exception))
+		self.assertIn("Row 3: rejected by validate", str(error.exception))
+		self.assertFalse(frappe.db.exists("Sample", {"sample_name": "_Test Accession 0"}))
+
+	def test_batch_insert_hooks_run_once(self):
+		box = make_box()
+		before = frappe.db.get_value("Storage Location", box, "current_occupancy") or 0
+		with patch("frappe.publish_realtime") as publish:
+			names = accession_samples(self.make_batch(4, storage_location=box))
+
+		self.assertEqual(frappe.db.get_value("Storage Location", box, "current_occupancy"), before + 4)
+		self.assertEqual(publish.call_count, 1)
+		message = publish.call_args.args[1]
+		self.assertEqual(message["names"], names)
+		self.assertEqual(message["counters"], {"samples": {"total": 4, "Received": 4}})
+
+	def test_storage_capacity_is_enforced(self):
+		box = make_box("_Test LIMS Small Box", capacity=2)
+		with self.assertRaises(frappe.ValidationError):
+			accession_samples(self.make_batch(3, storage_location=box))
@@ -0,0 +1,39 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import now_datetime
+
+from adi_lims.bootstrap import BOOTSTRAP_SECTIONS, get_bootstrap, get_pending_reports
+from adi_lims.tests.utils import add_result, make_sample
+
+
+class TestBootstrap(FrappeTestCase):
+	def test_pending_reports_are_fully_verified_samples(self):
+		verified_on = now_datetime()
+		ready = make_sample(status="Analyzed").name
+		add_result(ready, "_Test LIMS Glucose", idx=1, status="Verified", verified_on=verified_on)
+		add_result(ready, "_Test LIMS Urea", idx=2, status="Verified", verified_on=verified_on)
+		partial = make_sample(status="In-Progress").name
+		add_result(partial, "_Test LIMS Glucose", idx=1, status="Verified", verified_on=verified_on)
+		add_result(partial, "_Test LIMS Urea", idx=2, status="Completed")
+
+		reports = {row.name: row for row in get_pending_reports()}
+		self.assertIn(ready, reports)
+		self.assertNotIn(partial, reports)
+		self.assertEqual(reports[ready].test_name, "_Test LIMS Glucose, _Test LIMS Urea")
+
+	def test_failing_section_is_left_out(self):
+		def get_recent_activity():
+			raise frappe.PermissionError
+
+		with patch.dict(BOOTSTRAP_SECTIONS, {"recent_activity": get_recent_activity}):
+			payload = get_bootstrap()
+
+		self.assertNotIn("recent_activity", payload)
+		self.assertEqual(payload["failed"], ["get_recent_activity"])
+		self.assertIn("pending_reports", payload)
+		self.assertIn("appointments", payload)
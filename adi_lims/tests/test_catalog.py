@@ -0,0 +1,48 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_years, getdate
+
+from adi_lims.catalog import get_age_group, get_catalog
+from adi_lims.tests.utils import make_lab_test
+
+
+class TestCatalog(FrappeTestCase):
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		make_lab_test(
+			"_Test LIMS Hemoglobin",
+			normal_ranges=[
+				{"gender": "Both", "min_value": 11, "max_value": 16, "unit": "g/dL"},
+				{"gender": "Male", "age_group": "Adult", "min_value": 13, "max_value": 17, "unit": "g/dL"},
+			],
+		)
+		make_lab_test("_Test LIMS Culture", normal_ranges=[{"gender": "Both", "normal_text": "No growth"}])
+
+	def test_most_specific_range_wins(self):
+		catalog = get_catalog()
+		self.assertEqual(
+			catalog.get_reference_range("_Test LIMS Hemoglobin", "Male", "Adult"), "13.0 - 17.0 g/dL"
+		)
+		self.assertEqual(
+			catalog.get_reference_range("_Test LIMS Hemoglobin", "Female", "Adult"), "11.0 - 16.0 g/dL"
+		)
+
+	def test_text_only_range_shows_text(self):
+		self.assertEqual(get_catalog().get_reference_range("_Test LIMS Culture"), "No growth")
+
+	def test_saving_a_lab_test_reloads_the_catalog(self):
+		doc = frappe.get_doc("Lab Test", "_Test LIMS Culture")
+		doc.normal_ranges[0].normal_text = "Sterile"
+		doc.save()
+		self.assertEqual(get_catalog().get_reference_range("_Test LIMS Culture"), "Sterile")
+
+	def test_age_group(self):
+		today = getdate()
+		self.assertEqual(get_age_group(add_years(today, -5), today), "Child")
+		self.assertEqual(get_age_group(add_years(today, -40), today), "Adult")
+		self.assertEqual(get_age_group(add_years(today, -70), today), "Elderly")
+		self.assertIsNone(get_age_group(None))
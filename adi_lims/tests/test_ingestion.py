@@ -0,0 +1,91 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+import os
+import tempfile
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from adi_lims.ingestion import (
+	detect_format,
+	ingest_file,
+	iter_astm_records,
+	iter_csv_records,
+	iter_hl7_records,
+)
+from adi_lims.results import MAX_RESULT_LENGTH
+from adi_lims.tests.utils import add_result, make_lab_test, make_sample
+
+
+class TestIngestion(FrappeTestCase):
+	def test_csv_records(self):
+		lines = ["Sample_ID,Assay,Result\n", "S-1,GLU,5.4\n", "S-1,UREA, 30 \n", "short\n"]
+		self.assertEqual(list(iter_csv_records(lines)), [("S-1", "GLU", "5.4"), ("S-1", "UREA", "30")])
+
+	def test_astm_records(self):
+		lines = [
+			"1H|\\^&|||ANALYZER\n",
+			"2P|1\n",
+			"3O|1|S-1||^^^ALL\n",
+			"4R|1|^^^GLU|5.4|mmol/L||N||F\n",
+			"5R|2|^^^UREA^1|30|mg/dL||N||F\n",
+			"6L|1|N\n",
+		]
+		self.assertEqual(list(iter_astm_records(lines)), [("S-1", "GLU", "5.4"), ("S-1", "UREA", "30")])
+
+	def test_hl7_records(self):
+		lines = [
+			"MSH|^~\\&|LIS|LAB|||20250101000000||ORU^R01|1|P|2.5\n",
+			"OBR|1||S-1\n",
+			"OBX|1|NM|GLU^Glucose||5.4|mmol/L|||||F\n",
+			"MSH|^~\\&|LIS|LAB|||20250101000000||ORU^R01|2|P|2.5\n",
+			"OBX|1|NM|GLU||6.1|mmol/L|||||F\n",
+		]
+		# the second message has no OBR, so its OBX is not attributed to S-1
+		self.assertEqual(list(iter_hl7_records(lines)), [("S-1", "GLU", "5.4")])
+
+	def test_detect_format(self):
+		for content, expected in (
+			("MSH|^~\\&|\r", "hl7"),
+			("H|\\^&|||\n", "astm"),
+			("sample_id,test\n", "csv"),
+		):
+			with self.subTest(expected=expected):
+				path = self._write(content, suffix=".txt")
+				self.assertEqual(detect_format(path), expected)
+
+	def test_ingest_file_writes_and_reports(self):
+		make_lab_test("_Test LIMS Glucose", test_code="_TGLU")
+		make_lab_test("_Test LIMS Urea", test_code="_TUREA")
+		sample = make_sample(status="In-Progress").name
+		glucose = add_result(sample, "_Test LIMS Glucose", idx=1)
+		urea = add_result(sample, "_Test LIMS Urea", idx=2)
+		path = self._write(
+			"sample_id,test_code,result_value\n"
+			f"{sample},_TGLU,5.0\n"
+			f"{sample},_TGLU,5.4\n"
+			f"{sample},_TUREA,{'9' * (MAX_RESULT_LENGTH + 1)}\n"
+			f"{sample},_TUNKNOWN,1\n",
+			suffix=".csv",
+		)
+
+		with patch.object(frappe.db, "commit"), patch("adi_lims.results.publish_result_batch") as publish:
+			stats = ingest_file(path)
+
+		self.assertEqual(
+			(stats["records"], stats["updated"], stats["unmatched"], stats["invalid"]), (4, 1, 1, 1)
+		)
+		self.assertEqual(len(stats["errors"]), 2)
+		# the rerun overrides the first value, and the batch is published like bulk entry's
+		self.assertEqual(frappe.db.get_value("Lab Test Result", glucose, "result_value"), "5.4")
+		self.assertEqual(frappe.db.get_value("Lab Test Result", urea, "status"), "Pending")
+		self.assertEqual([row[0] for row in publish.call_args.args[0]], [glucose])
+
+	def _write(self, content, suffix):
+		fd, path = tempfile.mkstemp(suffix=suffix)
+		with os.fdopen(fd, "w") as f:
+			f.write(content)
+		self.addCleanup(os.remove, path)
+		return path
@@ -0,0 +1,63 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.permissions import add_user_permission
+from frappe.tests.utils import FrappeTestCase
+
+from adi_lims.listing import get_listing
+from adi_lims.tests.utils import make_sample, make_sample_type, make_user
+
+FIELDS = ["name", "status"]
+
+
+class TestListing(FrappeTestCase):
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		cls.filters = {"sample_type": make_sample_type()}
+		cls.samples = [make_sample().name for _i in range(5)]
+
+	def tearDown(self):
+		frappe.set_user("Administrator")
+
+	def test_cursor_pages_match_offset_pages(self):
+		by_cursor, cursor = [], None
+		while True:
+			page = get_listing("Sample", FIELDS, filters=self.filters, cursor=cursor, page_len=2, count=None)
+			by_cursor.extend(row.name for row in page["data"])
+			cursor = page["next_cursor"]
+			if not cursor:
+				break
+
+		by_offset = [
+			row.name
+			for start in range(0, len(by_cursor), 2)
+			for row in get_listing(
+				"Sample", FIELDS, filters=self.filters, start=start, page_len=2, count=None
+			)["data"]
+		]
+		self.assertEqual(by_cursor, by_offset)
+		self.assertLessEqual(set(self.samples), set(by_cursor))
+
+	def test_status_change_invalidates_the_cached_count(self):
+		filters = {**self.filters, "status": "In-Progress"}
+		before = get_listing("Sample", FIELDS, filters=filters, page_len=1)["total_count"]
+
+		doc = frappe.get_doc("Sample", self.samples[0])
+		doc.status = "In-Progress"
+		doc.save()
+
+		self.assertEqual(
+			get_listing("Sample", FIELDS, filters=filters, page_len=1)["total_count"], before + 1
+		)
+
+	def test_user_permissions_apply_to_rows_and_count(self):
+		get_listing("Sample", FIELDS, filters=self.filters)  # cache the unrestricted count
+		user = make_user("lims-listing@example.com")
+		add_user_permission("Sample", self.samples[1], user)
+
+		frappe.set_user(user)
+		response = get_listing("Sample", FIELDS, filters=self.filters)
+		self.assertEqual([row.name for row in response["data"]], [self.samples[1]])
+		self.assertEqual(response["total_count"], 1)
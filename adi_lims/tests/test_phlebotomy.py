@@ -0,0 +1,49 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, nowdate
+
+from adi_lims.phlebotomy import _slot_key, get_booked, validate_slot
+
+
+def new_appointment(date, time="09:10:00"):
+	return frappe.get_doc(
+		{
+			"doctype": "Collection Appointment",
+			"collection_type": "Home Collection",
+			"appointment_date": date,
+			"appointment_time": time,
+			"status": "Scheduled",
+		}
+	)
+
+
+@patch("adi_lims.phlebotomy.get_slot_capacity", new=lambda: 2)
+class TestSlotReservation(FrappeTestCase):
+	def setUp(self):
+		# a date far enough out to have no real bookings
+		self.date = add_days(nowdate(), 400)
+		frappe.cache().delete(_slot_key(self.date))
+		frappe.db.after_rollback.reset()
+
+	def tearDown(self):
+		frappe.db.after_rollback.reset()
+		frappe.cache().delete(_slot_key(self.date))
+
+	def test_reservation_is_the_capacity_check(self):
+		validate_slot(new_appointment(self.date))
+		validate_slot(new_appointment(self.date))
+		with self.assertRaises(frappe.ValidationError):
+			validate_slot(new_appointment(self.date))
+		# the refused booking took no place
+		self.assertEqual(get_booked(self.date, "09:00"), 2)
+
+	def test_rollback_releases_the_reservation(self):
+		validate_slot(new_appointment(self.date))
+		self.assertEqual(get_booked(self.date, "09:00"), 1)
+		frappe.db.after_rollback.run()
+		self.assertEqual(get_booked(self.date, "09:00"), 0)
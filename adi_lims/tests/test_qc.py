@@ -0,0 +1,117 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from adi_lims.qc import (
+	MIN_POINTS,
+	SERIES_TABLE,
+	ControlSeries,
+	check_rules,
+	record_control_results,
+	reset_control_series,
+	set_control_target,
+)
+from adi_lims.results import bulk_update_results
+from adi_lims.tests.utils import add_result, make_lab_test, make_sample
+from adi_lims.verification import verify_batch
+
+INSTRUMENT = "_Test LIMS Analyzer"
+LEVEL = "Level 1"
+
+
+class TestRules(FrappeTestCase):
+	def test_rules(self):
+		self.assertEqual(check_rules([2.5]), ["1_2s"])
+		self.assertEqual(check_rules([3.5]), ["1_3s"])
+		self.assertIn("2_2s", check_rules([2.1, 2.2]))
+		self.assertIn("R_4s", check_rules([-2.1, 2.2]))
+		self.assertIn("4_1s", check_rules([1.1, 1.2, 1.3, 1.4]))
+		self.assertIn("10_x", check_rules([0.1] * 10))
+		self.assertEqual(check_rules([0.5, -0.5]), [])
+
+	def test_series_is_established_before_scoring(self):
+		series = ControlSeries(("T", INSTRUMENT, LEVEL), window_size=20)
+		for value in [10.0, 10.2, 9.8] * MIN_POINTS:
+			series.add(value)
+		_mean, _sd, z, rules, rejected = series.add(30.0)
+		self.assertGreater(z, 3)
+		self.assertEqual((rules[0], rejected), ("1_3s", True))
+
+
+class TestControlSeries(FrappeTestCase):
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		cls.lab_test = make_lab_test("_Test LIMS Glucose")
+
+	def get_series(self):
+		return frappe.db.sql(
+			f"""
+			select target_mean, target_sd, window_values, recent_z
+			from `{SERIES_TABLE}`
+			where lab_test = %s and instrument = %s and control_level = %s
+			""",
+			(self.lab_test, INSTRUMENT, LEVEL),
+			as_dict=True,
+		)[0]
+
+	def record(self, values, qc_run="RUN-1"):
+		return record_control_results(
+			[
+				{
+					"lab_test": self.lab_test,
+					"instrument": INSTRUMENT,
+					"control_level": LEVEL,
+					"qc_run": qc_run,
+					"value": value,
+				}
+				for value in values
+			]
+		)
+
+	def test_new_target_clears_recent_z(self):
+		set_control_target(self.lab_test, INSTRUMENT, LEVEL, mean=10, sd=1)
+		self.record([10.5, 11.2])
+		self.assertTrue(frappe.parse_json(self.get_series().recent_z))
+
+		set_control_target(self.lab_test, INSTRUMENT, LEVEL, mean=20, sd=2)
+		series = self.get_series()
+		self.assertEqual((series.target_mean, series.target_sd, series.recent_z), (20, 2, None))
+		self.assertTrue(frappe.parse_json(series.window_values))
+
+	def test_reset_starts_a_new_lot(self):
+		set_control_target(self.lab_test, INSTRUMENT, LEVEL, mean=10, sd=1)
+		self.record([10.5, 9.5])
+
+		reset_control_series(self.lab_test, INSTRUMENT, LEVEL)
+		series = self.get_series()
+		self.assertEqual(
+			(series.target_mean, series.target_sd, series.window_values, series.recent_z),
+			(None, None, None, None),
+		)
+
+	def test_results_are_held_until_their_run_is_accepted(self):
+		sample = make_sample(status="In-Progress").name
+		name = add_result(sample, self.lab_test)
+		bulk_update_results([[name, "5.4"]], instrument=INSTRUMENT, qc_run="RUN-HELD")
+		self.assertEqual(
+			frappe.db.get_value("Lab Test Result", name, ["instrument", "qc_run"]), (INSTRUMENT, "RUN-HELD")
+		)
+		self.assertEqual(verify_batch([name])["skipped"], [name])
+
+		set_control_target(self.lab_test, INSTRUMENT, LEVEL, mean=10, sd=1)
+		self.record([10.1], qc_run="RUN-HELD")
+		self.assertEqual(verify_batch([name])["processed"], [name])
+
+	def test_run_without_instrument_is_refused(self):
+		sample = make_sample(status="In-Progress").name
+		name = add_result(sample, self.lab_test)
+		with self.assertRaises(frappe.ValidationError):
+			bulk_update_results([[name, "5.4"]], qc_run="RUN-2")
+
+		doc = frappe.get_doc("Lab Test Result", name)
+		doc.qc_run = "RUN-2"
+		with self.assertRaises(frappe.ValidationError):
+			doc.save()
@@ -0,0 +1,57 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.permissions import add_user_permission
+from frappe.realtime import get_doctype_room
+from frappe.tests.utils import FrappeTestCase
+
+from adi_lims.realtime import DELTA_EVENT, MAX_DELTA_ROWS, UPSERT, get_delta_rows, publish_delta
+from adi_lims.tests.utils import add_result, make_sample, make_user
+
+
+class TestRealtime(FrappeTestCase):
+	def tearDown(self):
+		frappe.set_user("Administrator")
+
+	def test_deltas_carry_names_only_to_the_doctype_room(self):
+		sample = make_sample()
+		with patch("frappe.publish_realtime") as publish:
+			sample.status = "In-Progress"
+			sample.save()
+
+		deltas = [call for call in publish.call_args_list if call.args[0] == DELTA_EVENT]
+		self.assertEqual(len(deltas), 1)
+		message = deltas[0].args[1]
+		self.assertEqual(set(message), {"doctype", "op", "names", "counters"})
+		self.assertEqual(message["names"], [sample.name])
+		self.assertEqual(message["counters"], {"samples": {"Received": -1, "In-Progress": 1}})
+		self.assertEqual(deltas[0].kwargs["room"], get_doctype_room("Sample"))
+
+	def test_result_deltas_go_to_the_sample_room(self):
+		with patch("frappe.publish_realtime") as publish:
+			publish_delta("Lab Test Result", UPSERT, ["R-1"])
+		self.assertEqual(publish.call_args.kwargs["room"], get_doctype_room("Sample"))
+
+	def test_large_batches_are_split(self):
+		names = [f"S-{i}" for i in range(MAX_DELTA_ROWS * 2 + 1)]
+		with patch("frappe.publish_realtime") as publish:
+			publish_delta("Sample", UPSERT, names, {"samples": {"Received": len(names)}})
+
+		messages = [call.args[1] for call in publish.call_args_list]
+		self.assertEqual([len(message["names"]) for message in messages], [MAX_DELTA_ROWS, MAX_DELTA_ROWS, 1])
+		# counters are applied once
+		self.assertEqual([bool(message["counters"]) for message in messages], [True, False, False])
+
+	def test_rows_are_read_with_the_users_permissions(self):
+		visible, hidden = make_sample().name, make_sample().name
+		result = add_result(visible, "_Test LIMS Glucose", result_value="5.4")
+		user = make_user("lims-realtime@example.com")
+		add_user_permission("Sample", visible, user)
+
+		frappe.set_user(user)
+		self.assertEqual([row.name for row in get_delta_rows("Sample", [visible, hidden])], [visible])
+		rows = get_delta_rows("Lab Test Result", [result])
+		self.assertEqual([(row.name, row.result_value) for row in rows], [(result, "5.4")])
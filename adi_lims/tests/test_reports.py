@@ -0,0 +1,42 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.permissions import add_user_permission
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, now_datetime
+
+from adi_lims.reports import BATCH_KEY, get_batch_status, get_verified_samples
+from adi_lims.tests.utils import add_result, make_sample, make_user
+
+
+class TestReportBatch(FrappeTestCase):
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		# a day far enough back to have no real results
+		cls.verified_on = add_days(now_datetime(), -400)
+		cls.samples = [make_sample(status="Analyzed").name for _i in range(2)]
+		for name in cls.samples:
+			add_result(name, "_Test LIMS Glucose", status="Verified", verified_on=cls.verified_on)
+
+	def tearDown(self):
+		frappe.set_user("Administrator")
+
+	def test_user_permissions_apply(self):
+		self.assertEqual(get_verified_samples(self.verified_on), sorted(self.samples))
+
+		user = make_user("lims-reports@example.com")
+		add_user_permission("Sample", self.samples[0], user)
+		frappe.set_user(user)
+		self.assertEqual(get_verified_samples(self.verified_on), [self.samples[0]])
+
+	def test_batch_of_another_user_is_refused(self):
+		batch_id = f"_Test-{frappe.generate_hash(length=8)}"
+		frappe.cache().set_value(BATCH_KEY.format(batch_id), {"user": "Administrator", "samples": []})
+		self.addCleanup(frappe.cache().delete_value, BATCH_KEY.format(batch_id))
+		self.assertEqual(get_batch_status(batch_id), {"user": "Administrator"})
+
+		frappe.set_user(make_user("lims-reports@example.com"))
+		with self.assertRaises(frappe.PermissionError):
+			get_batch_status(batch_id)
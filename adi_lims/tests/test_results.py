@@ -0,0 +1,66 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from adi_lims.results import MAX_RESULT_LENGTH, bulk_update_results, parse_results_payload, to_numeric
+from adi_lims.tests.utils import add_result, make_sample
+
+
+class TestResults(FrappeTestCase):
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		cls.sample = make_sample(status="In-Progress").name
+
+	def test_payload_shapes(self):
+		expected = [("R-1", "5.2"), ("R-2", "Positive")]
+		self.assertEqual(parse_results_payload([["R-1", "5.2"], ["R-2", "Positive"]]), expected)
+		self.assertEqual(
+			parse_results_payload(
+				'[{"test_result_name": "R-1", "result_value": "5.2"}, ["R-2", "Positive"]]'
+			),
+			expected,
+		)
+		self.assertEqual(
+			parse_results_payload("test_result_name,result_value\nR-1,5.2\nR-2,Positive\n"), expected
+		)
+
+	def test_to_numeric(self):
+		self.assertEqual(to_numeric("5.20"), 5.2)
+		self.assertIsNone(to_numeric("Positive"))
+		self.assertIsNone(to_numeric("nan"))
+		self.assertIsNone(to_numeric(True))
+
+	def test_batch_saves_valid_rows_and_reports_the_rest(self):
+		glucose = add_result(self.sample, "_Test LIMS Glucose", idx=1)
+		urea = add_result(self.sample, "_Test LIMS Urea", idx=2)
+
+		response = bulk_update_results(
+			[
+				[glucose, "5.4"],
+				[urea, "x" * (MAX_RESULT_LENGTH + 1)],
+				[glucose, "5.5"],
+				["_Test LIMS missing", "1"],
+			]
+		)
+
+		self.assertEqual(response["updated"], 1)
+		self.assertEqual([error["row"] for error in response["errors"]], [1, 2, 3])
+		row = frappe.db.get_value(
+			"Lab Test Result", glucose, ["result_value", "numeric_result_value", "status"], as_dict=True
+		)
+		self.assertEqual((row.result_value, row.numeric_result_value, row.status), ("5.4", 5.4, "Completed"))
+		self.assertEqual(frappe.db.get_value("Lab Test Result", urea, "status"), "Pending")
+
+	def test_verified_results_are_not_overwritten(self):
+		name = add_result(self.sample, "_Test LIMS Glucose", idx=3, result_value="5.0", status="Verified")
+
+		response = bulk_update_results([[name, "9.9"]])
+
+		self.assertEqual(response["updated"], 0)
+		self.assertEqual(len(response["errors"]), 1)
+		self.assertEqual(
+			frappe.db.get_value("Lab Test Result", name, ["result_value", "status"]), ("5.0", "Verified")
+		)
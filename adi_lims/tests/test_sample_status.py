@@ -0,0 +1,154 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+import json
+import random
+import threading
+
+import frappe
+from frappe.permissions import add_user_permission
+from frappe.tests.utils import FrappeTestCase
+
+from adi_lims.sample_status import TRANSITIONS, transition_samples
+from adi_lims.tests.utils import make_sample, make_user
+
+
+def get_status_changes(names):
+	"""(sample, from, to) of every recorded status change of `names`, oldest first."""
+	changes = []
+	for version in frappe.get_all(
+		"Version",
+		filters={"ref_doctype": "Sample", "docname": ("in", names)},
+		fields=["docname", "data"],
+		order_by="creation asc",
+	):
+		for field, before, after in json.loads(version.data).get("changed", []):
+			if field == "status":
+				changes.append((version.docname, before, after))
+	return changes
+
+
+class TestSampleStatus(FrappeTestCase):
+	def tearDown(self):
+		frappe.set_user("Administrator")
+
+	def test_batch_moves_allowed_samples_and_reports_the_rest(self):
+		received = make_sample().name
+		analyzed = make_sample(status="Analyzed").name
+		started = make_sample(status="In-Progress").name
+
+		response = transition_samples("In-Progress", samples=[received, analyzed, started, "_Test missing"])
+
+		self.assertEqual(response["transitioned"], [received])
+		self.assertEqual(response["invalid"], [analyzed])
+		self.assertEqual(response["unchanged"], [started])
+		self.assertEqual(response["not_found"], ["_Test missing"])
+		self.assertEqual(frappe.db.get_value("Sample", received, "status"), "In-Progress")
+
+	def test_samples_the_user_cannot_read_are_not_found(self):
+		visible, hidden = make_sample().name, make_sample().name
+		user = make_user("lims-status@example.com")
+		add_user_permission("Sample", visible, user)
+
+		frappe.set_user(user)
+		response = transition_samples("In-Progress", samples=[visible, hidden])
+
+		self.assertEqual(response["transitioned"], [visible])
+		self.assertEqual(response["not_found"], [hidden])
+		self.assertEqual(frappe.db.get_value("Sample", hidden, "status"), "Received")
+
+	def test_stale_version_is_a_conflict(self):
+		sample = make_sample()
+		stale = sample.modified
+		frappe.db.set_value("Sample", sample.name, "sample_name", "_Test edited", update_modified=True)
+
+		response = transition_samples("In-Progress", samples=[sample.name], expected={sample.name: stale})
+
+		self.assertEqual(response["conflicts"], [sample.name])
+		self.assertEqual(frappe.db.get_value("Sample", sample.name, "status"), "Received")
+
+	def test_each_move_is_versioned(self):
+		names = [make_sample().name for _i in range(3)]
+		transition_samples("In-Progress", samples=names)
+		self.assertEqual(
+			sorted(get_status_changes(names)), sorted((name, "Received", "In-Progress") for name in names)
+		)
+
+	def test_form_save_checks_the_transition(self):
+		sample = make_sample(status="Disposed")
+		sample.status = "Received"
+		with self.assertRaises(frappe.ValidationError):
+			sample.save()
+
+
+def _worker(site, sites_path, names, batches, seed, errors):
+	frappe.init(site=site, sites_path=sites_path)
+	frappe.connect()
+	frappe.set_user("Administrator")
+	rng = random.Random(seed)
+	try:
+		for _i in range(batches):
+			try:
+				transition_samples(rng.choice(list(TRANSITIONS)), samples=rng.sample(names, len(names) // 4))
+				frappe.db.commit()
+			except Exception:
+				frappe.db.rollback()
+				errors.append(frappe.get_traceback())
+	finally:
+		frappe.destroy()
+
+
+class TestConcurrentTransitions(FrappeTestCase):
+	"""Workers on their own connections race over one pool of committed samples."""
+
+	SAMPLES = 100
+	WORKERS = 4
+	BATCHES = 10
+
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		cls.names = [make_sample().name for _i in range(cls.SAMPLES)]
+		# the workers only see committed rows
+		frappe.db.commit()
+
+	@classmethod
+	def tearDownClass(cls):
+		frappe.db.delete("Version", {"ref_doctype": "Sample", "docname": ("in", cls.names)})
+		frappe.db.delete("Sample", {"name": ("in", cls.names)})
+		frappe.db.commit()
+		super().tearDownClass()
+
+	def test_every_move_is_won_once(self):
+		errors = []
+		threads = [
+			threading.Thread(
+				target=_worker,
+				args=(frappe.local.site, frappe.local.sites_path, self.names, self.BATCHES, seed, errors),
+			)
+			for seed in range(self.WORKERS)
+		]
+		for thread in threads:
+			thread.start()
+		for thread in threads:
+			thread.join()
+		self.assertEqual(errors, [])
+
+		# start a new snapshot to read what the workers committed
+		frappe.db.commit()
+		following = {}
+		for name, before, after in get_status_changes(self.names):
+			# a status left twice means two workers won the same move
+			self.assertNotIn((name, before), following)
+			following[(name, before)] = after
+
+		final = dict(
+			frappe.get_all(
+				"Sample", filters={"name": ("in", self.names)}, fields=["name", "status"], as_list=True
+			)
+		)
+		for name in self.names:
+			status = "Received"
+			while (name, status) in following:
+				status = following[(name, status)]
+			self.assertEqual(status, final[name])
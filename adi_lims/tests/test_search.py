@@ -0,0 +1,33 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.permissions import add_user_permission
+from frappe.tests.utils import FrappeTestCase
+
+from adi_lims.search import search
+from adi_lims.tests.utils import make_sample, make_user
+
+
+class TestSearch(FrappeTestCase):
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		tag = frappe.generate_hash(length=8)
+		cls.query = f"_Test Search {tag}"
+		cls.samples = [make_sample(sample_name=f"{cls.query} {i}").name for i in range(3)]
+
+	def tearDown(self):
+		frappe.set_user("Administrator")
+
+	def test_every_word_must_match(self):
+		names = [row["name"] for row in search(self.query, doctypes=["Sample"])]
+		self.assertEqual(sorted(names), sorted(self.samples))
+
+	def test_user_permissions_apply(self):
+		user = make_user("lims-search@example.com")
+		add_user_permission("Sample", self.samples[0], user)
+
+		frappe.set_user(user)
+		names = [row["name"] for row in search(self.query, doctypes=["Sample"])]
+		self.assertEqual(names, [self.samples[0]])
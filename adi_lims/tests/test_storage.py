@@ -0,0 +1,59 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from adi_lims.storage import allocate_samples, apply_occupancy_deltas, get_free_boxes
+from adi_lims.tests.utils import make_sample
+
+
+def make_location(name, parent=None, location_type="Box", capacity=0):
+	return (
+		frappe.get_doc(
+			{
+				"doctype": "Storage Location",
+				"location_name": name,
+				"parent_location": parent,
+				"location_type": location_type,
+				"capacity": capacity,
+			}
+		)
+		.insert()
+		.name
+	)
+
+
+class TestStorage(FrappeTestCase):
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		cls.freezer = make_location("_Test LIMS Freezer", location_type="Freezer")
+		cls.rack = make_location("_Test LIMS Rack", cls.freezer, location_type="Rack")
+		cls.boxes = [make_location(f"_Test LIMS Rack Box {i}", cls.rack, capacity=2) for i in range(5)]
+
+	def test_free_boxes_are_walked_outwards_from_near(self):
+		anchor = frappe.db.get_value("Storage Location", self.boxes[2], "lft")
+		boxes = list(get_free_boxes(self.freezer, near=self.boxes[2], page_len=1))
+		self.assertEqual(boxes[0].name, self.boxes[2])
+		# the first box may already be full from the allocation test
+		self.assertLessEqual(set(self.boxes[1:]), {box.name for box in boxes})
+		distances = [abs(box.lft - anchor) for box in boxes]
+		self.assertEqual(distances, sorted(distances))
+
+	def test_allocation_fills_the_nearest_boxes(self):
+		samples = [make_sample().name for _i in range(3)]
+		allocation = allocate_samples(samples, location=self.freezer, near=self.boxes[0])
+		self.assertEqual(list(allocation.values()), [self.boxes[0], self.boxes[0], self.boxes[1]])
+
+	def test_full_location_raises(self):
+		box = make_location("_Test LIMS Full Box", capacity=1)
+		apply_occupancy_deltas({box: 1})
+		with self.assertRaises(frappe.ValidationError):
+			apply_occupancy_deltas({box: 1})
+		self.assertEqual(frappe.db.get_value("Storage Location", box, "current_occupancy"), 1)
+
+	def test_top_level_location_can_be_deleted(self):
+		room = make_location("_Test LIMS Room", location_type="Room")
+		frappe.delete_doc("Storage Location", room)
+		self.assertFalse(frappe.db.exists("Storage Location", room))
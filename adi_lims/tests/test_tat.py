@@ -0,0 +1,33 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from adi_lims.tests.utils import add_result, make_sample
+
+
+class TestResultTimestamps(FrappeTestCase):
+	def test_results_saved_through_the_sample_are_stamped(self):
+		sample = make_sample(status="In-Progress")
+		add_result(sample.name, "_Test LIMS Glucose", idx=1)
+		add_result(sample.name, "_Test LIMS Urea", idx=2)
+
+		sample.reload()
+		glucose, urea = sample.sample_test_results
+		glucose.update({"result_value": "5.4", "status": "Completed"})
+		urea.update({"result_value": "30", "status": "Verified", "verification_status": "Verified"})
+		sample.save()
+
+		rows = {
+			row.lab_test: row
+			for row in frappe.get_all(
+				"Lab Test Result",
+				filters={"parent": sample.name},
+				fields=["lab_test", "completed_on", "verified_on"],
+			)
+		}
+		self.assertTrue(rows["_Test LIMS Glucose"].completed_on)
+		self.assertIsNone(rows["_Test LIMS Glucose"].verified_on)
+		self.assertTrue(rows["_Test LIMS Urea"].completed_on)
+		self.assertTrue(rows["_Test LIMS Urea"].verified_on)
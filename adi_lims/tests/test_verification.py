@@ -0,0 +1,54 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from adi_lims.results import bulk_update_results
+from adi_lims.tests.utils import add_result, make_sample
+from adi_lims.verification import REJECT, VERIFY, claim_next_batch, verify_batch
+
+
+class TestVerification(FrappeTestCase):
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		cls.sample = make_sample(status="In-Progress").name
+
+	def get_result(self, name):
+		return frappe.db.get_value(
+			"Lab Test Result",
+			name,
+			["result_value", "status", "verification_status", "verifier", "notes"],
+			as_dict=True,
+		)
+
+	def test_rejected_result_can_be_reentered_and_verified(self):
+		name = add_result(self.sample, "_Test LIMS Glucose", idx=1)
+		bulk_update_results([[name, "5.4"]])
+
+		self.assertEqual(verify_batch([name], REJECT, notes="haemolysed")["processed"], [name])
+		row = self.get_result(name)
+		self.assertEqual(
+			(row.status, row.verification_status, row.notes), ("Pending", "Rejected", "haemolysed")
+		)
+
+		bulk_update_results([[name, "5.6"]])
+		row = self.get_result(name)
+		self.assertEqual((row.status, row.verification_status, row.verifier), ("Completed", "Pending", None))
+		self.assertIn(name, [claimed.name for claimed in claim_next_batch(limit=1000)])
+
+		self.assertEqual(verify_batch([name], VERIFY)["processed"], [name])
+		row = self.get_result(name)
+		self.assertEqual(
+			(row.result_value, row.status, row.verification_status), ("5.6", "Verified", "Verified")
+		)
+
+	def test_results_claimed_by_another_verifier_are_skipped(self):
+		name = add_result(self.sample, "_Test LIMS Urea", idx=2)
+		bulk_update_results([[name, "30"]])
+		frappe.db.set_value(
+			"Lab Test Result", name, {"claimed_by": "Guest", "claimed_at": frappe.utils.now_datetime()}
+		)
+
+		self.assertEqual(verify_batch([name], VERIFY), {"processed": [], "skipped": [name]})
@@ -0,0 +1,48 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.permissions import add_user_permission
+from frappe.tests.utils import FrappeTestCase
+
+from adi_lims.tests.utils import add_result, make_sample, make_user
+from adi_lims.worklist import get_worklist_page
+
+
+class TestWorklist(FrappeTestCase):
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		cls.samples = [make_sample().name for _i in range(5)]
+		for name in cls.samples:
+			add_result(name, "_Test LIMS Glucose", idx=1)
+			add_result(name, "_Test LIMS Urea", idx=2)
+
+	def tearDown(self):
+		frappe.set_user("Administrator")
+
+	def test_cursor_walks_every_row_once(self):
+		seen, cursor = [], None
+		while True:
+			page = get_worklist_page(status="Pending", cursor=cursor, page_len=2)
+			seen.extend(row.name for row in page["data"])
+			cursor = page["next_cursor"]
+			if not cursor:
+				break
+
+		self.assertEqual(len(seen), len(set(seen)))
+		self.assertLessEqual(set(self.samples), set(seen))
+
+	def test_rows_are_aggregated(self):
+		rows = {row.name: row for row in get_worklist_page(status="Received", page_len=500)["data"]}
+		row = rows[self.samples[0]]
+		self.assertEqual(row.test_info, "_Test LIMS Glucose, _Test LIMS Urea")
+		self.assertEqual((row.ui_status, row.status_color), ("Pending", "orange"))
+
+	def test_user_permissions_apply(self):
+		user = make_user("lims-worklist@example.com")
+		add_user_permission("Sample", self.samples[0], user)
+
+		frappe.set_user(user)
+		names = [row.name for row in get_worklist_page(page_len=500)["data"]]
+		self.assertEqual(names, [self.samples[0]])
@@ -0,0 +1,82 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Records shared by the adi_lims test cases.
+
+Everything is created inside the test's transaction, which FrappeTestCase
+rolls back when the class finishes.
+"""
+
+import frappe
+from frappe.utils import nowdate
+
+TEST_DEPARTMENT = "_Test LIMS Department"
+TEST_SAMPLE_TYPE = "_Test LIMS Blood"
+
+
+def make_department(name=TEST_DEPARTMENT):
+	if not frappe.db.exists("Lab Department", name):
+		frappe.get_doc({"doctype": "Lab Department", "department_name": name}).insert()
+	return name
+
+
+def make_lab_test(name, normal_ranges=None, **fields):
+	if not frappe.db.exists("Lab Test", name):
+		frappe.get_doc(
+			{
+				"doctype": "Lab Test",
+				"test_name": name,
+				"department": make_department(),
+				"normal_ranges": normal_ranges or [],
+				**fields,
+			}
+		).insert()
+	return name
+
+
+def make_sample_type(name=TEST_SAMPLE_TYPE):
+	return (
+		frappe.db.get_value("Sample Type", {"sample_type_name": name})
+		or frappe.get_doc({"doctype": "Sample Type", "sample_type_name": name}).insert().name
+	)
+
+
+def make_sample(status="Received", **fields):
+	return frappe.get_doc(
+		{
+			"doctype": "Sample",
+			"sample_name": f"_Test Sample {frappe.generate_hash(length=8)}",
+			"sample_type": make_sample_type(),
+			"collection_date": nowdate(),
+			"received_date": nowdate(),
+			"status": status,
+			**fields,
+		}
+	).insert()
+
+
+def add_result(sample, lab_test, idx=1, **fields):
+	"""Add a Lab Test Result row under `sample` and return its name."""
+	doc = frappe.get_doc(
+		{
+			"doctype": "Lab Test Result",
+			"parent": sample,
+			"parenttype": "Sample",
+			"parentfield": "sample_test_results",
+			"idx": idx,
+			"lab_test": make_lab_test(lab_test),
+			"status": "Pending",
+			**fields,
+		}
+	)
+	doc.db_insert()
+	return doc.name
+
+
+def make_user(email, roles=("System Manager",)):
+	if not frappe.db.exists("User", email):
+		user = frappe.get_doc(
+			{"doctype": "User", "email": email, "first_name": email.split("@")[0], "send_welcome_email": 0}
+		).insert(ignore_permissions=True)
+		user.add_roles(*roles)
+	return email
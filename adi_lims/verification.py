@@ -0,0 +1,208 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Result verification.
+
+Completed results waiting for verification form a shared queue. A verifier
+claims the next batch with SELECT ... FOR UPDATE SKIP LOCKED, so concurrent
+verifiers never wait on each other's rows and never get the same row; the
+claim (claimed_by / claimed_at) outlives the request and lapses after
+CLAIM_MINUTES if the batch is abandoned. Verify and reject lock the chosen
+rows the same way, write them with one UPDATE per chunk, and publish one
+realtime message for the whole batch. Results whose QC run has not been
+accepted (see adi_lims.qc) are neither claimed nor verified.
+"""
+
+from datetime import timedelta
+
+import frappe
+from frappe import _
+from frappe.utils import cint, now_datetime
+
+from adi_lims.catalog import get_catalog
+from adi_lims.cumulative import touch_results
+from adi_lims.lookup import get_many
+from adi_lims.qc import qc_release_condition
+from adi_lims.realtime import UPSERT, publish_delta
+
+VERIFY = "Verify"
+REJECT = "Reject"
+CLAIM_MINUTES = 15
+DEFAULT_BATCH_SIZE = 50
+MAX_BATCH_SIZE = 1000
+UPDATE_CHUNK_SIZE = 1000
+
+QUEUE_FIELDS = (
+	"name",
+	"parent",
+	"lab_test",
+	"result_value",
+	"unit",
+	"reference_range",
+	"result_flag",
+	"delta_flag",
+	"delta_percent",
+	"completed_on",
+)
+
+
+def _claim_condition():
+	"""Rows nobody holds, rows the current user holds, or claims that have lapsed."""
+	return (
+		"(r.claimed_by is null or r.claimed_by = '' or r.claimed_by = %(user)s or r.claimed_at < %(expired)s)"
+	)
+
+
+def _claim_values():
+	return {"user": frappe.session.user, "expired": now_datetime() - timedelta(minutes=CLAIM_MINUTES)}
+
+
+def claim_next_batch(limit=DEFAULT_BATCH_SIZE, department=None, lab_test=None):
+	"""Claim up to `limit` results awaiting verification for the current user, oldest first."""
+	frappe.has_permission("Sample", "write", throw=True)
+	limit = min(max(cint(limit) or DEFAULT_BATCH_SIZE, 1), MAX_BATCH_SIZE)
+
+	conditions = [
+		"r.parenttype = 'Sample'",
+		"r.status = 'Completed'",
+		"ifnull(r.verification_status, 'Pending') = 'Pending'",
+		_claim_condition(),
+		qc_release_condition(),
+	]
+	values = _claim_values()
+	lab_tests = _filter_tests(department, lab_test)
+	if lab_tests is not None:
+		if not lab_tests:
+			return []
+		conditions.append("r.lab_test in %(lab_tests)s")
+		values["lab_tests"] = lab_tests
+	values["limit"] = limit
+
+	# no join here: FOR UPDATE would lock the Sample rows as well and make
+	# verifiers skip each other's samples
+	rows = frappe.db.sql(
+		f"""
+		select {", ".join(QUEUE_FIELDS)}
+		from `tabLab Test Result` r
+		where {" and ".join(conditions)}
+		order by r.completed_on, r.name
+		limit %(limit)s
+		for update skip locked
+		""",
+		values,
+		as_dict=True,
+	)
+	if rows:
+		_set_claim([row.name for row in rows], frappe.session.user, now_datetime())
+		samples = get_many("Sample", [row.parent for row in rows], ["patient"])
+		for row in rows:
+			row.patient = samples[row.parent].patient if row.parent in samples else None
+	return rows
+
+
+def _filter_tests(department=None, lab_test=None):
+	if lab_test:
+		return [lab_test]
+	if department:
+		return [test.name for test in get_catalog().tests.values() if test.department == department]
+	return None
+
+
+def _set_claim(names, user, claimed_at):
+	frappe.db.sql(
+		f"""
+		update `tabLab Test Result`
+		set claimed_by = %s, claimed_at = %s
+		where name in ({", ".join(["%s"] * len(names))})
+		""",
+		[user, claimed_at, *names],
+	)
+
+
+def lock_for_verification(names, action=VERIFY):
+	"""Lock the rows of `names` that can be verified by the current user right now.
+
+	Rows locked by another transaction, claimed by another verifier or no
+	longer awaiting verification are left out and reported as skipped, as
+	are, when verifying, rows whose QC run has not been accepted.
+	"""
+	values = _claim_values()
+	values["names"] = names
+	qc_condition = f"and {qc_release_condition()}" if action == VERIFY else ""
+	return frappe.db.sql_list(
+		f"""
+		select r.name
+		from `tabLab Test Result` r
+		where r.name in %(names)s
+			and r.parenttype = 'Sample'
+			and r.status = 'Completed'
+			and ifnull(r.verification_status, 'Pending') = 'Pending'
+			and {_claim_condition()}
+			{qc_condition}
+		for update skip locked
+		""",
+		values,
+	)
+
+
+def verify_batch(names, action=VERIFY, notes=None):
+	"""Verify or reject a batch of results; returns the processed and skipped names.
+
+	Rejected results go back to Pending for a rerun, with the verifier's notes.
+	"""
+	frappe.has_permission("Sample", "write", throw=True)
+	if action not in (VERIFY, REJECT):
+		frappe.throw(_("Action must be {0} or {1}").format(VERIFY, REJECT))
+	names = list(dict.fromkeys(names or []))
+	if len(names) > MAX_BATCH_SIZE:
+		frappe.throw(_("At most {0} results can be verified in one batch").format(MAX_BATCH_SIZE))
+	if not names:
+		return {"processed": [], "skipped": []}
+
+	locked = lock_for_verification(names, action)
+	locked_set = set(locked)
+	skipped = [name for name in names if name not in locked_set]
+	if locked:
+		write_verification(locked, action, notes)
+		publish_delta("Lab Test Result", UPSERT, locked)
+	return {"processed": locked, "skipped": skipped}
+
+
+def write_verification(names, action, notes=None):
+	now, user = now_datetime(), frappe.session.user
+	if action == VERIFY:
+		assignments = "status = 'Verified', verification_status = 'Verified', verified_on = %(now)s"
+	else:
+		assignments = (
+			"status = 'Pending', verification_status = 'Rejected', verified_on = null,"
+			" notes = if(%(notes)s is null, notes, %(notes)s)"
+		)
+
+	for start in range(0, len(names), UPDATE_CHUNK_SIZE):
+		frappe.db.sql(
+			f"""
+			update `tabLab Test Result`
+			set {assignments},
+				verifier = %(user)s, claimed_by = null, claimed_at = null,
+				modified = %(now)s, modified_by = %(user)s
+			where name in %(names)s
+			""",
+			{"names": names[start : start + UPDATE_CHUNK_SIZE], "now": now, "user": user, "notes": notes},
+		)
+	touch_results(names)
+
+
+def release_claims(names=None):
+	"""Give back the current user's claimed results (all of them, or `names`)."""
+	conditions, values = ["claimed_by = %(user)s"], {"user": frappe.session.user}
+	if names:
+		conditions.append("name in %(names)s")
+		values["names"] = list(names)
+	frappe.db.sql(
+		f"""
+		update `tabLab Test Result`
+		set claimed_by = null, claimed_at = null
+		where {" and ".join(conditions)}
+		""",
+		values,
+	)
@@ -0,0 +1,119 @@
+# Copyright (c) 2025, Adimyra Systems and contributors
+# For license information, please see license.txt
+
+"""Set-based sample worklist.
+
+Each page is built with a single SQL statement: the page of Samples is picked
+in a derived table using a keyset cursor on (creation, name), then joined to
+Patient and grouped against Lab Test Result so patient names and test lists
+come back aggregated. The derived table carries the same User Permission and
+permission query conditions `frappe.get_list("Sample")` would apply.
+"""
+
+import frappe
+
+from adi_lims.listing import decode_cursor, encode_cursor, get_page_length, get_permission_condition
+
+DEFAULT_PAGE_LENGTH = 50
+
+# Sample.status -> (ui_status, status_color)
+STATUS_UI_MAP = {
+	"Received": ("Pending", "orange"),
+	"In-Progress": ("Accessioned", "blue"),
+	"Analyzed": ("Processing", "purple"),
+	"Rejected": ("Rejected", "red"),
+	"Disposed": ("Disposed", "gray"),
+}
+DEFAULT_STATUS_COLOR = "gray"
+
+# Worklist tab -> Sample.status
+UI_STATUS_FILTER_MAP = {ui_status: status for status, (ui_status, _color) in STATUS_UI_MAP.items()}
+
+
+def resolve_status_filter(status):
+	"""Map a worklist tab (or a raw Sample status) to the Sample.status to filter on."""
+	if not status or status == "All":
+		return None
+	return UI_STATUS_FILTER_MAP.get(status, status)
+
+
+def get_worklist_page(status=None, cursor=None, page_len=DEFAULT_PAGE_LENGTH):
+	"""Return one page of the sample worklist.
+
+	:param status: worklist tab ("All", "Pending", ...) or a Sample status.
+	:param cursor: value of `next_cursor` from the previous page.
+	:param page_len: number of rows per page.
+	"""
+	frappe.has_permission("Sample", "read", throw=True)
+
+	page_len = get_page_length(page_len, DEFAULT_PAGE_LENGTH)
+	conditions = []
+	values = {"limit": page_len + 1}
+
+	sample_status = resolve_status_filter(status)
+	if sample_status:
+		conditions.append("status = %(status)s")
+		values["status"] = sample_status
+
+	if cursor:
+		values["cursor_creation"], values["cursor_name"] = decode_cursor(cursor)
+		conditions.append(
+			"(creation < %(cursor_creation)s or (creation = %(cursor_creation)s and name < %(cursor_name)s))"
+		)
+
+	rows = _get_rows(conditions, values)
+	next_cursor = None
+	if len(rows) > page_len:
+		rows = rows[:page_len]
+		next_cursor = encode_cursor(rows[-1].creation, rows[-1].name)
+
+	return {"data": rows, "next_cursor": next_cursor}
+
+
+def get_worklist_rows(names):
+	"""Worklist rows of the samples in `names` the current user can read, newest first."""
+	frappe.has_permission("Sample", "read", throw=True)
+	if not names:
+		return []
+	return _get_rows(["name in %(names)s"], {"names": list(names), "limit": len(names)})
+
+
+def _get_rows(conditions, values):
+	"""Up to values["limit"] worklist rows of the samples matching `conditions`."""
+	permission_condition = get_permission_condition("Sample")
+	if permission_condition:
+		conditions = [*conditions, permission_condition.replace("%", "%%")]
+
+	where = f"where {' and '.join(conditions)}" if conditions else ""
+	rows = frappe.db.sql(
+		f"""
+		select
+			s.name, s.sample_name, s.patient, s.collection_date, s.status, s.creation,
+			p.first_name, p.last_name,
+			group_concat(r.lab_test order by r.idx separator ', ') as test_info
+		from (
+			select name, sample_name, patient, collection_date, status, creation
+			from `tabSample`
+			{where}
+			order by creation desc, name desc
+			limit %(limit)s
+		) s
+		left join `tabPatient` p on p.name = s.patient
+		left join `tabLab Test Result` r on r.parent = s.name and r.parenttype = 'Sample'
+		group by s.name, s.sample_name, s.patient, s.collection_date, s.status, s.creation,
+			p.first_name, p.last_name
+		order by s.creation desc, s.name desc
+		""",
+		values,
+		as_dict=True,
+	)
+
+	for row in rows:
+		first_name = row.pop("first_name")
+		last_name = row.pop("last_name")
+		if first_name is not None:
+			row.patient_name = f"{first_name} {last_name or ''}".strip()
+		row.patient_uhid = row.patient
+		row.test_info = row.test_info or ""
+		row.ui_status, row.status_color = STATUS_UI_MAP.get(row.status, (row.status, DEFAULT_STATUS_COLOR))
+	return rows
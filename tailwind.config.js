@@ -1,13 +1,18 @@
 /** @type {import('tailwindcss').Config} */
 module.exports = {
   prefix: 'adl-', // Custom prefix for all Tailwind classes
+  // Only the adilims page loads this build: scope every utility to its root element
+  // and leave out preflight, whose global resets would leak into the rest of desk.
+  important: '.adi-lims-dashboard',
+  corePlugins: {
+    preflight: false,
+  },
   content: [
-    "./**/*.html",
-    "./**/*.js",
-    "./**/*.py",
+    "./adi_lims/adi_lims/page/adilims/*.js",
+    "./adi_lims/public/js/adilims_*.bundle.js",
   ],
   theme: {
     extend: {},
   },
   plugins: [],
-}
\ No newline at end of file
+}